@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+All-in adjusted EV over hand-history files.
+
+Input is streamed one hand per line, either JSON:
+
+    {"hand": "1001", "session": "2024-06-01", "net": -100.0,
+     "hero": "AhKd", "villain": "QsQc", "board": "", "pot": 200.0, "invested": 100.0}
+
+or whitespace-separated text in the same order ("-" for an empty board):
+
+    1001 2024-06-01 -100.0 AhKd QsQc - 200.0 100.0
+
+hand, session and net (hero's actual result) are required; the remaining
+fields describe a heads-up all-in and are given only for hands where the
+money went in before the river was dealt out. board holds the cards out
+when it did, pot is the final pot and invested hero's share of it. A hand's
+all-in EV is equity * pot - invested; other hands count at their actual
+result.
+
+All-ins are collected in batches and keyed by their suit isomorphic
+(hero, villain, board), so identical matchups are computed once and kept
+in a bounded cache. Preflop matchups come from combo_table when it has
+been built; the rest are evaluated by worker processes that share the
+evaluator tables (see shared_runtime), with every runout enumerated up to
+--samples runouts and sampled above that. Per-hand rows are written as
+each batch resolves and sessions are running totals, so memory does not
+grow with the file.
+
+    python allin_ev.py hands.jsonl [--hands-out hands_ev.csv] [--sessions-out sessions_ev.csv]
+"""
+
+import os
+import sys
+import csv
+import json
+import math
+import argparse
+import itertools
+import multiprocessing as mp
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import fast_eval
+from evaluators import evaluate_batch
+from poker import parse_board
+from combos import combo_index
+from result_store import canonical_matchup
+
+# All-in hands per batch.
+BATCH_HANDS = 4096
+MAX_CACHED = 200000
+# Runouts enumerated up to this many, sampled above (preflop without combo_table).
+SAMPLES = 20000
+# Rows per evaluate_batch call when evaluating many matchups together.
+EVAL_ROWS = 1 << 17
+
+# -------------- Input --------------
+
+def parse_line(line):
+    """A hand dict from one JSON or text line, or None for a blank/comment line."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        hand = json.loads(line)
+    else:
+        parts = line.split()
+        if len(parts) not in (3, 8):
+            raise ValueError(f"Expected 3 or 8 fields, got {len(parts)}")
+        hand = {"hand": parts[0], "session": parts[1], "net": parts[2]}
+        if len(parts) == 8:
+            hand.update(hero=parts[3], villain=parts[4], board="" if parts[5] == "-" else parts[5],
+                        pot=parts[6], invested=parts[7])
+    if not isinstance(hand, dict):
+        raise ValueError("Expected a JSON object")
+    hand["net"] = float(hand["net"])
+    if hand.get("villain"):
+        hand["board"] = hand.get("board") or ""
+        for field in ("hero", "villain", "board"):
+            if not isinstance(hand.get(field), str):
+                raise ValueError(f"{field} must be a card string")
+        hand["pot"] = float(hand["pot"])
+        hand["invested"] = float(hand["invested"])
+    return hand
+
+def matchup_key(hero, villain, board):
+    """
+    Suit isomorphic key of an all-in given card strings: the smallest
+    relabelling of (hero, villain, board) as sorted integer card tuples.
+    """
+    cards = [[fast_eval.card_to_int(c) for c in parse_board(s)] for s in (hero, villain, board)]
+    if len(cards[0]) != 2 or len(cards[1]) != 2 or len(cards[2]) > 5:
+        raise ValueError("All-in needs two hole cards each and at most five board cards")
+    if len(set(cards[0] + cards[1] + cards[2])) != sum(len(c) for c in cards):
+        raise ValueError("Duplicate card in all-in")
+    return canonical_matchup(*cards)
+
+# -------------- Equity --------------
+
+def sample_subsets(n, k, count, rng):
+    """
+    (count, k) random k-subsets of range(n): rows are drawn with
+    replacement and the few with a repeated value are drawn again.
+    """
+    out = rng.integers(0, n, size=(count, k))
+    redo = np.arange(count)
+    while True:
+        rows = np.sort(out[redo], axis=1)
+        redo = redo[(rows[:, 1:] == rows[:, :-1]).any(axis=1)]
+        if len(redo) == 0:
+            return out
+        out[redo] = rng.integers(0, n, size=(len(redo), k))
+
+def _runouts(key, samples, rng):
+    hero, villain, board = key
+    used = set(hero + villain + board)
+    remaining = [c for c in range(52) if c not in used]
+    needed = 5 - len(board)
+    if needed == 0:
+        runouts = np.empty((1, 0), np.int64)
+    elif math.comb(len(remaining), needed) <= samples:
+        combos = list(itertools.combinations(remaining, needed))
+        runouts = np.array(combos, dtype=np.int64).reshape(len(combos), needed)
+    else:
+        runouts = np.array(remaining, dtype=np.int64)[sample_subsets(len(remaining), needed, samples, rng)]
+    return np.concatenate([np.tile(np.array(board, dtype=np.int64), (len(runouts), 1)), runouts], axis=1)
+
+def matchup_equities(keys, samples=SAMPLES, seed=None):
+    """
+    [(win, tie, equity)] of hero vs villain for each key, with the runouts
+    of many keys scored in shared evaluate_batch calls.
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    group, rows = [], 0
+    def flush():
+        boards = np.concatenate([b for _, b in group])
+        hero = np.concatenate([np.tile(np.array(k[0]), (len(b), 1)) for k, b in group])
+        vil = np.concatenate([np.tile(np.array(k[1]), (len(b), 1)) for k, b in group])
+        h = evaluate_batch(np.concatenate([hero, boards], axis=1))
+        v = evaluate_batch(np.concatenate([vil, boards], axis=1))
+        starts = np.cumsum([0] + [len(b) for _, b in group[:-1]])
+        sizes = np.array([len(b) for _, b in group])
+        wins = np.add.reduceat((h > v).astype(np.int64), starts) / sizes
+        ties = np.add.reduceat((h == v).astype(np.int64), starts) / sizes
+        results.extend((float(w), float(t), float(w + t / 2)) for w, t in zip(wins, ties))
+        group.clear()
+    for key in keys:
+        boards = _runouts(key, samples, rng)
+        if group and rows + len(boards) > EVAL_ROWS:
+            flush()
+            rows = 0
+        group.append((key, boards))
+        rows += len(boards)
+    if group:
+        flush()
+    return results
+
+_worker_tables = None
+
+def _init_worker(table_spec):
+    global _worker_tables
+    from shared_runtime import SharedArrays
+    _worker_tables = SharedArrays.attach(table_spec)
+    t = _worker_tables.arrays
+    fast_eval.install_tables(t["high"], t["straight"], t["top"])
+
+class EquityCache:
+    """Bounded LRU of key -> (win, tie, equity), filled a batch at a time."""
+    def __init__(self, executor=None, workers=1, samples=SAMPLES, max_size=MAX_CACHED):
+        self.executor = executor
+        self.workers = workers
+        self.samples = samples
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.computed = 0
+        from combo_table import load_combo_table
+        self.table = load_combo_table()
+
+    def fill(self, keys):
+        """Computes every key not cached yet."""
+        missing = [k for k in dict.fromkeys(keys) if k not in self.entries]
+        self.computed += len(missing)
+        found = {}
+        if self.table is not None:
+            for k in missing:
+                if not k[2]:
+                    found[k] = self.table.combo_lookup(combo_index(k[0]), combo_index(k[1]))
+            missing = [k for k in missing if k not in found]
+        if missing:
+            try:
+                if self.executor is None:
+                    found.update(zip(missing, matchup_equities(missing, self.samples)))
+                else:
+                    size = -(-len(missing) // self.workers)
+                    chunks = [missing[i:i + size] for i in range(0, len(missing), size)]
+                    seeds = np.random.SeedSequence().spawn(len(chunks))
+                    for chunk, result in zip(chunks, self.executor.map(matchup_equities, chunks,
+                                                                       itertools.repeat(self.samples), seeds)):
+                        found.update(zip(chunk, result))
+            except Exception as e:
+                # One bad matchup fails its whole batch; redo the rest one at a time
+                print(f"Batch equity failed ({e}), retrying matchups individually")
+                for k in missing:
+                    if k in found:
+                        continue
+                    try:
+                        found[k] = matchup_equities([k], self.samples)[0]
+                    except Exception as e:
+                        print(f"Skipping matchup {k}: {e}")
+        for k, value in found.items():
+            self.entries[k] = value
+        for k in keys:
+            if k in self.entries:
+                self.entries.move_to_end(k)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def get(self, key):
+        """(win, tie, equity) for key, or None if it could not be computed."""
+        return self.entries.get(key)
+
+# -------------- Analysis --------------
+
+class SessionSummary:
+    def __init__(self):
+        self.hands = 0
+        self.allins = 0
+        self.net = 0.0
+        self.ev_net = 0.0
+
+    @property
+    def luck(self):
+        return self.net - self.ev_net
+
+HAND_FIELDS = ["hand", "session", "net", "allin", "equity", "ev_net", "luck"]
+SESSION_FIELDS = ["session", "hands", "allins", "net", "ev_net", "luck"]
+
+def analyze(lines, hands_writer, cache, batch=BATCH_HANDS, on_batch=None):
+    """
+    Streams hands from lines, writes one row per hand to hands_writer (a
+    csv.writer, or None) and returns {session: SessionSummary}.
+    """
+    sessions = OrderedDict()
+    pending = []
+    allins = 0
+
+    def resolve():
+        cache.fill([key for _, key in pending if key is not None])
+        for hand, key in pending:
+            summary = sessions.setdefault(hand.get("session", ""), SessionSummary())
+            summary.hands += 1
+            summary.net += hand["net"]
+            equity = ev_net = None
+            entry = cache.get(key) if key is not None else None
+            if key is not None and entry is None:
+                print(f"No equity for hand {hand['hand']}, counting it at its result")
+                key = None
+            if key is not None:
+                equity = entry[2]
+                ev_net = equity * hand["pot"] - hand["invested"]
+                summary.allins += 1
+                summary.ev_net += ev_net
+            else:
+                summary.ev_net += hand["net"]
+            if hands_writer is not None:
+                ev = hand["net"] if ev_net is None else ev_net
+                hands_writer.writerow([hand["hand"], hand.get("session", ""), f"{hand['net']:.2f}",
+                                       int(key is not None), "" if equity is None else f"{equity:.5f}",
+                                       f"{ev:.2f}", f"{hand['net'] - ev:.2f}"])
+        pending.clear()
+        if on_batch is not None:
+            on_batch()
+
+    for line_no, line in enumerate(lines, 1):
+        try:
+            hand = parse_line(line)
+            if hand is None:
+                continue
+            key = matchup_key(hand["hero"], hand["villain"], hand.get("board", "")) if hand.get("villain") else None
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Skipping line {line_no}: {e}")
+            continue
+        pending.append((hand, key))
+        if key is not None:
+            allins += 1
+        if allins >= batch or len(pending) >= 8 * batch:
+            resolve()
+            allins = 0
+    if pending:
+        resolve()
+    return sessions
+
+def write_sessions(sessions, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SESSION_FIELDS)
+        for name, s in sessions.items():
+            writer.writerow([name, s.hands, s.allins, f"{s.net:.2f}", f"{s.ev_net:.2f}", f"{s.luck:.2f}"])
+
+# -------------- Command line --------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="All-in adjusted EV over hand histories.")
+    parser.add_argument("input", help="hand-history file (JSONL or text), or - for stdin")
+    parser.add_argument("--hands-out", default="hands_ev.csv")
+    parser.add_argument("--sessions-out", default="sessions_ev.csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="equity worker processes (0 = evaluate in this process)")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="runouts enumerated up to / sampled above")
+    parser.add_argument("--batch", type=int, default=BATCH_HANDS)
+    args = parser.parse_args(argv)
+
+    executor = tables = None
+    if args.workers > 0:
+        from shared_runtime import SharedArrays
+        high, straight, top = fast_eval.tables()
+        tables = SharedArrays.publish({"high": high, "straight": straight, "top": top})
+        executor = ProcessPoolExecutor(max_workers=args.workers, mp_context=mp.get_context("spawn"),
+                                       initializer=_init_worker, initargs=(tables.spec,))
+    cache = EquityCache(executor, max(args.workers, 1), args.samples)
+    source = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        with open(args.hands_out, "w", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(HAND_FIELDS)
+            sessions = analyze(source, writer, cache, batch=args.batch)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if executor is not None:
+            executor.shutdown()
+            tables.close()
+    write_sessions(sessions, args.sessions_out)
+    hands = sum(s.hands for s in sessions.values())
+    net = sum(s.net for s in sessions.values())
+    ev_net = sum(s.ev_net for s in sessions.values())
+    print(f"{hands} hands in {len(sessions)} sessions, {sum(s.allins for s in sessions.values())} all-ins "
+          f"({cache.computed} distinct matchups computed)")
+    print(f"Net {net:+.2f}, all-in EV {ev_net:+.2f}, luck {net - ev_net:+.2f}")
+    print(f"Wrote {args.hands_out} and {args.sessions_out}.")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
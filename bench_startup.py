@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: launches `main.py --benchmark` several times in fresh
+processes and reports the median time-to-first-frame, time-to-first-grid
+and time until the background tables are ready. Needs a display.
+"""
+
+import statistics
+import subprocess
+import sys
+
+RUNS = 5
+# Seconds before a run that never reports ready is abandoned.
+RUN_TIMEOUT = 120
+
+def run_once():
+    try:
+        out = subprocess.run([sys.executable, "main.py", "--benchmark"],
+                             capture_output=True, text=True, check=True, timeout=RUN_TIMEOUT).stdout
+    except subprocess.TimeoutExpired:
+        print(f"Run timed out after {RUN_TIMEOUT} s")
+        return {}
+    result = {}
+    for line in out.splitlines():
+        if line.startswith("time_to_"):
+            key, value = line.split(":")
+            result[key] = float(value.split()[0])
+    return result
+
+def main():
+    runs = [run_once() for _ in range(RUNS)]
+    for key in ("time_to_first_frame", "time_to_first_grid", "time_to_tables_ready"):
+        values = [r[key] for r in runs if key in r]
+        if values:
+            print(f"{key}: median {statistics.median(values):.1f} ms "
+                  f"(min {min(values):.1f}, max {max(values):.1f}, {len(values)} runs)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Expected value of calling a bet or shoving, swept over bet sizes.
+
+All amounts are in chips and relative to folding (EV 0 = fold). Equities
+are the per-cell equities the grid already holds, so a sweep over any
+number of bet sizes is a single broadcast over (sizes, cells) with no
+new simulation.
+
+    call:  villain bets b into pot, we call:
+           EV = eq * (pot + 2b) - b
+    shove: we bet s into pot; villain calls with the calling cells and
+           folds the rest:
+           EV = pot                       if villain folds
+              = eq * (pot + 2s) - s       if villain calls
+"""
+
+import numpy as np
+
+# Bet sizes swept, as fractions of the pot.
+SWEEP_FRACTIONS = np.round(np.arange(0.05, 5.0001, 0.05), 2)
+
+class EVSweep:
+    """
+    cell_ev: (sizes, cells) EV when villain holds each cell; range_ev:
+    (sizes,) EV against the whole weighted range.
+    """
+    def __init__(self, mode, pot, sizes, cell_ev, range_ev):
+        self.mode = mode
+        self.pot = pot
+        self.sizes = sizes
+        self.cell_ev = cell_ev
+        self.range_ev = range_ev
+
+    def size_index(self, size):
+        """Index of the swept size closest to size (in chips)."""
+        return int(np.abs(self.sizes - size).argmin())
+
+    def best(self):
+        """(size, EV) with the highest range EV."""
+        k = int(self.range_ev.argmax())
+        return float(self.sizes[k]), float(self.range_ev[k])
+
+    def break_even(self):
+        """Largest swept size whose range EV is not negative, or None."""
+        ok = np.flatnonzero(self.range_ev >= 0)
+        return float(self.sizes[ok[-1]]) if len(ok) else None
+
+def call_ev(equity, weights, pot, sizes):
+    """EVSweep of calling each bet size against cells with the given weights."""
+    eq = np.asarray(equity, dtype=float)
+    w = np.asarray(weights, dtype=float)
+    b = np.asarray(sizes, dtype=float)[:, None]
+    cell_ev = eq[None, :] * (pot + 2 * b) - b
+    total = w.sum()
+    range_ev = cell_ev @ w / total if total > 0 else np.zeros(len(b))
+    return EVSweep("call", pot, b[:, 0], cell_ev, range_ev)
+
+def shove_ev(equity, weights, calling, pot, sizes):
+    """
+    EVSweep of shoving each size against villain's whole range (weights),
+    who calls with the cells where calling is True.
+    """
+    eq = np.asarray(equity, dtype=float)
+    w = np.asarray(weights, dtype=float)
+    calls = np.asarray(calling, dtype=bool)
+    s = np.asarray(sizes, dtype=float)[:, None]
+    cell_ev = np.where(calls[None, :], eq[None, :] * (pot + 2 * s) - s, float(pot))
+    total = w.sum()
+    range_ev = cell_ev @ w / total if total > 0 else np.zeros(len(s))
+    return EVSweep("shove", pot, s[:, 0], cell_ev, range_ev)
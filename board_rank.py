@@ -0,0 +1,166 @@
+"""
+Board-aware hand rankings.
+
+For a flop, turn or river, board_ranking() computes every live combo's
+exact equity against a random hand on that board (all runouts enumerated,
+card removal included) with vectorized evaluation, and rolls it up into
+per-category equities and live combo counts. Results are cached per suit
+isomorphic board; category-level numbers are the same for every board in
+a class, so they need no remapping.
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+import numpy as np
+from fast_eval import card_to_int
+from evaluators import evaluate_batch
+from combos import COMBOS, COMBO_CAT_IDX, CATEGORIES, dead_combo_mask, canonical_board
+
+MAX_CACHED_BOARDS = 128
+# Runouts evaluated per evaluate_batch call; bounds the temporary arrays.
+RUNOUT_CHUNK = 64
+
+def vs_random_counts(combo_cards, scores):
+    """
+    Given the hole cards (M, 2) and showdown scores (M,) of every live combo
+    on a complete board, returns (wins, ties, opponents) per combo against a
+    uniformly random opposing combo that shares no card with it.
+    """
+    m = len(scores)
+    levels, inv = np.unique(scores, return_inverse=True)
+    n_levels = len(levels)
+    per_level = np.bincount(inv, minlength=n_levels)
+    below = np.cumsum(per_level) - per_level
+    less_total = below[inv]
+    eq_total = per_level[inv]
+    # Per card, the combos holding it, keyed by (card, score level).
+    keys = np.concatenate([combo_cards[:, 0] * n_levels + inv,
+                           combo_cards[:, 1] * n_levels + inv])
+    keys.sort()
+    holding = np.bincount(combo_cards.ravel(), minlength=52)
+    wins = less_total.copy()
+    ties = eq_total + 1
+    for side in (0, 1):
+        card_key = combo_cards[:, side] * n_levels
+        start = np.searchsorted(keys, card_key, side="left")
+        lo = np.searchsorted(keys, card_key + inv, side="left")
+        hi = np.searchsorted(keys, card_key + inv, side="right")
+        wins -= lo - start
+        ties -= hi - lo
+    opponents = m - holding[combo_cards[:, 0]] - holding[combo_cards[:, 1]] + 1
+    return wins, ties, opponents
+
+def runouts_for(board):
+    """All completions of the board to five cards, as integer tuples."""
+    remaining = [c for c in range(52) if c not in board]
+    return list(itertools.combinations(remaining, 5 - len(board)))
+
+def combo_equity_vs_random(board):
+    """
+    Exact equity of every combo vs a random hand on the integer board.
+    Returns a (1326,) float array with NaN for combos blocked by the board.
+    """
+    board = list(board)
+    live = np.flatnonzero(~dead_combo_mask(board))
+    eq_sum = np.zeros(len(live))
+    runs = np.zeros(len(live))
+    runouts = runouts_for(board)
+    hole = COMBOS[live]
+    for start in range(0, len(runouts), RUNOUT_CHUNK):
+        batch = runouts[start:start + RUNOUT_CHUNK]
+        chunk = np.array(batch, dtype=np.int64).reshape(len(batch), 5 - len(board))
+        full = np.concatenate([np.tile(board, (len(chunk), 1)), chunk], axis=1)
+        hands = np.concatenate([
+            np.repeat(hole[None, :, :], len(chunk), axis=0),
+            np.repeat(full[:, None, :], len(live), axis=1)], axis=2)
+        scores = evaluate_batch(hands.reshape(-1, 7)).reshape(len(chunk), len(live))
+        for r in range(len(chunk)):
+            ok = ~(np.isin(hole[:, 0], chunk[r]) | np.isin(hole[:, 1], chunk[r]))
+            wins, ties, opp = vs_random_counts(hole[ok], scores[r, ok])
+            eq_sum[ok] += (wins + 0.5 * ties) / opp
+            runs[ok] += 1
+    equity = np.full(len(COMBOS), np.nan)
+    equity[live] = eq_sum / np.maximum(runs, 1)
+    return equity
+
+class BoardRanking:
+    """
+    Per-category equity vs a random hand and live combo counts for one board.
+    combo_equity is indexed by combo on the canonical board (self.key).
+    """
+    def __init__(self, key, combo_equity):
+        self.key = key
+        self.combo_equity = combo_equity
+        live = ~np.isnan(combo_equity)
+        counts = np.bincount(COMBO_CAT_IDX[live], minlength=len(CATEGORIES))
+        sums = np.bincount(COMBO_CAT_IDX[live], weights=combo_equity[live], minlength=len(CATEGORIES))
+        self.equity = {}
+        self.weight = {}
+        for k, cat in enumerate(CATEGORIES):
+            self.weight[cat] = int(counts[k])
+            self.equity[cat] = float(sums[k] / counts[k]) if counts[k] else 0.0
+
+    def strength(self, hand_cat):
+        return self.equity.get(hand_cat, 0.0)
+
+    def live_weight(self, hand_cat):
+        return self.weight.get(hand_cat, 0)
+
+_rankings = OrderedDict()
+_lock = threading.Lock()
+
+def board_key(board):
+    """Canonical cache key for a board of (rank, suit) cards."""
+    return canonical_board([card_to_int(c) for c in board])[0]
+
+def cached_board_ranking(board):
+    """The ranking for a board if it is already cached, else None."""
+    key = board_key(board)
+    with _lock:
+        ranking = _rankings.get(key)
+        if ranking is not None:
+            _rankings.move_to_end(key)
+        return ranking
+
+def board_ranking(board):
+    """
+    Returns the BoardRanking for a board of (rank, suit) cards (3-5 cards),
+    computing it on first use of the isomorphic board.
+    """
+    ranking = cached_board_ranking(board)
+    if ranking is not None:
+        return ranking
+    key = board_key(board)
+    ranking = BoardRanking(key, combo_equity_vs_random(key))
+    with _lock:
+        _rankings[key] = ranking
+        while len(_rankings) > MAX_CACHED_BOARDS:
+            _rankings.popitem(last=False)
+    return ranking
+
+_pending = set()
+
+def request_board_ranking(board, on_ready):
+    """
+    Non-blocking variant for the GUI: returns the cached ranking, or None
+    after starting a background computation that calls on_ready() when the
+    ranking is available.
+    """
+    ranking = cached_board_ranking(board)
+    if ranking is not None:
+        return ranking
+    key = board_key(board)
+    with _lock:
+        if key in _pending:
+            return None
+        _pending.add(key)
+    def work():
+        try:
+            board_ranking(board)
+        finally:
+            with _lock:
+                _pending.discard(key)
+        on_ready()
+    threading.Thread(target=work, daemon=True).start()
+    return None
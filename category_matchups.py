@@ -0,0 +1,126 @@
+"""
+Per-category matchup sums for interactive range editing.
+
+For one board, win[a, b], tie[a, b] and total[a, b] hold the summed
+outcomes of every non-conflicting pair of a combo in category a against a
+combo in category b (each combo weighted 1), over all runouts. Any grid or
+range-vs-range equity for ranges whose combos have one weight per
+category is then a weighted sum over these 169x169 matrices, and adding or
+removing a category adds or subtracts one column: O(169) per toggle.
+
+Preflop sums come from the preflop equity table; postflop sums are built
+per runout from per-rank category counts, with pairs sharing a card taken
+back out.
+"""
+
+import numpy as np
+from fast_eval import card_to_int
+from evaluators import evaluate_batch
+from combos import COMBOS, NUM_COMBOS, COMBO_CAT_IDX, CATEGORIES, CAT_COMBOS, dead_combo_mask
+from range_equity import runouts
+
+NUM_CATS = len(CATEGORIES)
+
+def _conflicts():
+    """(1326, 101) combos sharing at least one card with each combo (itself included)."""
+    holding = [[] for _ in range(52)]
+    for k, (a, b) in enumerate(COMBOS):
+        holding[a].append(k)
+        holding[b].append(k)
+    rows = []
+    for k, (a, b) in enumerate(COMBOS):
+        rows.append(sorted(set(holding[a]) | set(holding[b])))
+    return np.array(rows, dtype=np.int64)
+
+CONFLICTS = _conflicts()
+# Category pair (row combo's, conflicting combo's) of each CONFLICTS entry.
+_PAIR_KEY = (COMBO_CAT_IDX[:, None] * NUM_CATS + COMBO_CAT_IDX[CONFLICTS]).ravel()
+
+def category_vector(weights):
+    """
+    The (169,) per-combo weight of each category if every combo of a
+    category has the same weight, else None.
+    """
+    weights = np.asarray(weights, dtype=float)
+    vec = np.zeros(NUM_CATS)
+    for k, cat in enumerate(CATEGORIES):
+        ws = weights[CAT_COMBOS[cat]]
+        if not (ws == ws[0]).all():
+            return None
+        vec[k] = ws[0]
+    return vec
+
+class CategoryMatchups:
+    def __init__(self, win, tie, total):
+        self.win = win
+        self.tie = tie
+        self.total = total
+        # Equity numerators (ties count half).
+        self.share = win + tie / 2
+
+    def sums(self, opp_vector):
+        """(share, total) per category against the weighted opposing categories."""
+        return self.share @ opp_vector, self.total @ opp_vector
+
+    def delta(self, k, weight_change):
+        """Change of sums() when opposing category k's weight changes."""
+        return self.share[:, k] * weight_change, self.total[:, k] * weight_change
+
+    def range_equity(self, vector, opp_vector):
+        """Equity of one category-weighted range against another."""
+        share, total = self.sums(opp_vector)
+        denom = vector @ total
+        return float(vector @ share / denom) if denom > 0 else 0.0
+
+def preflop_matchups(table):
+    """From {(cat, opp_cat): (win, tie, true)}, weighted by combo counts."""
+    win = np.zeros((NUM_CATS, NUM_CATS))
+    tie = np.zeros((NUM_CATS, NUM_CATS))
+    present = np.zeros((NUM_CATS, NUM_CATS))
+    counts = np.array([len(CAT_COMBOS[cat]) for cat in CATEGORIES], dtype=float)
+    for a, cat_a in enumerate(CATEGORIES):
+        for b, cat_b in enumerate(CATEGORIES):
+            row = table.get((cat_a, cat_b))
+            # Matchups missing from the table contribute nothing.
+            if row is not None:
+                win[a, b], tie[a, b] = row[0], row[1]
+                present[a, b] = 1.0
+    pairs = np.outer(counts, counts)
+    return CategoryMatchups(win * pairs, tie * pairs, present * pairs)
+
+def postflop_matchups(board, num_simulations=1000):
+    """Exact sums over the board's runouts (sampled above num_simulations)."""
+    board_ints = [card_to_int(c) for c in board]
+    win = np.zeros((NUM_CATS, NUM_CATS))
+    tie = np.zeros((NUM_CATS, NUM_CATS))
+    total = np.zeros((NUM_CATS, NUM_CATS))
+    board_dead = dead_combo_mask(board_ints)
+    for runout in runouts(board_ints, num_simulations):
+        live = ~(board_dead | dead_combo_mask(runout)) if runout else ~board_dead
+        idx = np.flatnonzero(live)
+        full = np.array(board_ints + list(runout), dtype=np.int64)
+        scores = evaluate_batch(np.concatenate([COMBOS[idx], np.tile(full, (len(idx), 1))], axis=1))
+        levels, rank = np.unique(scores, return_inverse=True)
+        rank = rank.ravel()
+        cats = COMBO_CAT_IDX[idx]
+        # per_rank[a, r]: live combos of category a at rank r.
+        per_rank = np.bincount(cats * len(levels) + rank,
+                               minlength=NUM_CATS * len(levels)).reshape(NUM_CATS, len(levels)).astype(float)
+        below = np.cumsum(per_rank, axis=1) - per_rank
+        win += per_rank @ below.T
+        tie += per_rank @ per_rank.T
+        counts = per_rank.sum(axis=1)
+        total += np.outer(counts, counts)
+        # Take back pairs that share a card (a combo with itself included).
+        full_rank = np.full(NUM_COMBOS, -1)
+        full_rank[idx] = rank
+        r_i = full_rank[:, None]
+        r_j = full_rank[CONFLICTS]
+        valid = ((r_i >= 0) & (r_j >= 0)).ravel()
+        outcome = (np.sign(r_i - r_j) + 1).ravel()  # 0 loss, 1 tie, 2 win
+        shared = np.bincount(_PAIR_KEY[valid] * 3 + outcome[valid],
+                             minlength=NUM_CATS * NUM_CATS * 3).reshape(NUM_CATS, NUM_CATS, 3)
+        win -= shared[:, :, 2]
+        tie -= shared[:, :, 1]
+        total -= shared.sum(axis=2)
+    return CategoryMatchups(win, tie, total)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Exact combo-vs-combo preflop equities, reduced by suit isomorphism.
+
+Ordered (hero, villain) pairs of specific hole cards fall into 93,769
+classes under suit relabelling; every pair in a class has the same
+equity, so only one representative pair per class is evaluated. All
+classes are scored together on each board (one evaluate_batch call for the
+1,326 combos), so a pass over every board gives exact equities for the
+whole table.
+
+Two memory-mapped files hold the result:
+
+    preflop_combo_index.npy   (1326, 1326) int32 class of each ordered pair,
+                              -1 where the hands share a card
+    preflop_combo_equity.npy  (classes, 2) uint16 win and tie probability
+                              in units of 1/FIXED_POINT
+
+Counts can be built locally (sampled or exact) or sharded over machines
+with precompute_queue's "combos" job and exported afterwards:
+
+    python combo_table.py build --boards 200000
+    python combo_table.py build --exact
+    python precompute_queue.py local --job combos --workers 8
+    python combo_table.py export
+"""
+
+import sys
+import math
+import sqlite3
+import argparse
+import itertools
+import threading
+import numpy as np
+from evaluators import evaluate_batch
+from combos import COMBOS, NUM_COMBOS, SUIT_PERMS, combo_perm_map
+
+INDEX_FILE = "preflop_combo_index.npy"
+EQUITY_FILE = "preflop_combo_equity.npy"
+FIXED_POINT = 65535
+TOTAL_BOARDS = math.comb(52, 5)
+# Boards scored per evaluate_batch call.
+BOARD_CHUNK = 32
+
+def build_index():
+    """
+    Returns (index, reps): the (1326, 1326) class of every ordered combo
+    pair (-1 for pairs sharing a card) and the (classes, 2) representative
+    pair of each class.
+    """
+    a = COMBOS[:, None, :]
+    b = COMBOS[None, :, :]
+    conflict = ((a[..., 0] == b[..., 0]) | (a[..., 0] == b[..., 1]) |
+                (a[..., 1] == b[..., 0]) | (a[..., 1] == b[..., 1]))
+    best = np.full((NUM_COMBOS, NUM_COMBOS), np.iinfo(np.int64).max)
+    for perm in SUIT_PERMS:
+        m = combo_perm_map(perm)
+        np.minimum(best, m[:, None] * NUM_COMBOS + m[None, :], out=best)
+    best[conflict] = -1
+    codes, inverse = np.unique(best, return_inverse=True)
+    index = (inverse.reshape(NUM_COMBOS, NUM_COMBOS) - 1).astype(np.int32)
+    rep_codes = codes[1:]
+    reps = np.stack([rep_codes // NUM_COMBOS, rep_codes % NUM_COMBOS], axis=1)
+    return index, reps
+
+def board_counts(boards, reps):
+    """(wins, ties, total) per class over an (N, 5) array of boards."""
+    n_classes = len(reps)
+    wins = np.zeros(n_classes, dtype=np.int64)
+    ties = np.zeros(n_classes, dtype=np.int64)
+    total = np.zeros(n_classes, dtype=np.int64)
+    hero, vil = reps[:, 0], reps[:, 1]
+    for start in range(0, len(boards), BOARD_CHUNK):
+        chunk = np.asarray(boards[start:start + BOARD_CHUNK], dtype=np.int64)
+        k = len(chunk)
+        hands = np.concatenate([np.broadcast_to(COMBOS, (k, NUM_COMBOS, 2)),
+                                np.broadcast_to(chunk[:, None, :], (k, NUM_COMBOS, 5))], axis=2)
+        scores = evaluate_batch(hands.reshape(-1, 7)).reshape(k, NUM_COMBOS)
+        on_board = np.zeros((k, 52), dtype=bool)
+        on_board[np.arange(k)[:, None], chunk] = True
+        live = ~(on_board[:, COMBOS[:, 0]] | on_board[:, COMBOS[:, 1]])
+        valid = live[:, hero] & live[:, vil]
+        h, v = scores[:, hero], scores[:, vil]
+        total += valid.sum(axis=0)
+        wins += (valid & (h > v)).sum(axis=0)
+        ties += (valid & (h == v)).sum(axis=0)
+    return wins, ties, total
+
+def board_block(start, count):
+    """Boards start .. start+count-1 of itertools.combinations(range(52), 5)."""
+    it = itertools.islice(itertools.combinations(range(52), 5), start, start + count)
+    return np.array(list(it), dtype=np.int64).reshape(-1, 5)
+
+def save_table(index, counts, index_file=INDEX_FILE, equity_file=EQUITY_FILE):
+    """Writes the index and the fixed-point equities for (wins, ties, total)."""
+    wins, ties, total = counts
+    safe = np.maximum(total, 1)
+    equity = np.stack([np.rint(wins / safe * FIXED_POINT), np.rint(ties / safe * FIXED_POINT)], axis=1)
+    np.save(index_file, index)
+    np.save(equity_file, equity.astype(np.uint16))
+
+class ComboTable:
+    def __init__(self, index, equity):
+        self.index = index
+        self.equity = equity
+
+    def combo_lookup(self, hero, villain):
+        """(win, tie, equity) of combo index hero vs combo index villain."""
+        k = self.index[hero, villain]
+        if k < 0:
+            return None
+        win, tie = self.equity[k] / FIXED_POINT
+        return (float(win), float(tie), float(win + tie / 2))
+
+    def hero_row(self, hero):
+        """(win, tie, faced) arrays over every villain combo for one hero combo."""
+        row = np.asarray(self.index[hero])
+        faced = row >= 0
+        eq = self.equity[np.where(faced, row, 0)] / FIXED_POINT
+        return np.where(faced, eq[:, 0], 0.0), np.where(faced, eq[:, 1], 0.0), faced
+
+    def vs_range(self, hero, weights):
+        """
+        (win, tie, equity) of one combo against a combo weight vector,
+        card removal included (villain combos sharing a card drop out).
+        """
+        win, tie, faced = self.hero_row(hero)
+        w = np.where(faced, np.asarray(weights, dtype=float), 0.0)
+        total = w.sum()
+        if total <= 0:
+            return (0.0, 0.0, 0.0)
+        win, tie = float(w @ win / total), float(w @ tie / total)
+        return (win, tie, win + tie / 2)
+
+    def range_vs_range(self, hero_weights, vil_weights):
+        """(win, tie, equity) of two combo weight vectors, pairs weighted by product."""
+        hw = np.asarray(hero_weights, dtype=float)
+        vw = np.asarray(vil_weights, dtype=float)
+        rows = np.flatnonzero(hw > 0)
+        cls = np.asarray(self.index[rows])
+        faced = cls >= 0
+        eq = self.equity[np.where(faced, cls, 0)] / FIXED_POINT
+        pair_w = hw[rows, None] * np.where(faced, vw[None, :], 0.0)
+        denom = pair_w.sum()
+        if denom <= 0:
+            return (0.0, 0.0, 0.0)
+        win = float((pair_w * eq[..., 0]).sum() / denom)
+        tie = float((pair_w * eq[..., 1]).sum() / denom)
+        return (win, tie, win + tie / 2)
+
+    def category_sums(self):
+        """
+        (win, tie, total) (169, 169) sums over every compatible combo pair of
+        each category pair, in combos.CATEGORIES order.
+        """
+        from combos import COMBO_CAT_IDX, CATEGORIES
+        n = len(CATEGORIES)
+        index = np.asarray(self.index)
+        faced = index >= 0
+        eq = self.equity[index[faced]] / FIXED_POINT
+        key = (COMBO_CAT_IDX[:, None] * n + COMBO_CAT_IDX[None, :])[faced]
+        win = np.bincount(key, weights=eq[:, 0], minlength=n * n).reshape(n, n)
+        tie = np.bincount(key, weights=eq[:, 1], minlength=n * n).reshape(n, n)
+        total = np.bincount(key, minlength=n * n).reshape(n, n).astype(float)
+        return win, tie, total
+
+_table = None
+_table_lock = threading.Lock()
+
+def load_combo_table():
+    """The memory-mapped table, or None if it has not been built."""
+    global _table
+    with _table_lock:
+        if _table is None:
+            try:
+                _table = ComboTable(np.load(INDEX_FILE, mmap_mode="r"), np.load(EQUITY_FILE, mmap_mode="r"))
+            except (OSError, ValueError):
+                return None
+        return _table
+
+# -------------- SQLite counts (precompute_queue "combos" job) --------------
+
+def init_counts(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS preflop_combo_counts (
+            class INTEGER PRIMARY KEY,
+            wins INTEGER,
+            ties INTEGER,
+            total INTEGER
+        )
+    ''')
+
+def load_counts(conn, n_classes):
+    counts = tuple(np.zeros(n_classes, dtype=np.int64) for _ in range(3))
+    for k, w, t, n in conn.execute("SELECT class, wins, ties, total FROM preflop_combo_counts"):
+        counts[0][k], counts[1][k], counts[2][k] = w, t, n
+    return counts
+
+def save_counts(conn, counts):
+    wins, ties, total = counts
+    conn.executemany("INSERT OR REPLACE INTO preflop_combo_counts (class, wins, ties, total) VALUES (?, ?, ?, ?)",
+                     [(k, int(w), int(t), int(n)) for k, (w, t, n) in enumerate(zip(wins, ties, total))])
+
+# -------------- Command line --------------
+
+def main(argv=None):
+    import preflop_db_2 as db
+    parser = argparse.ArgumentParser(description="Per-combo preflop equity table.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="compute the table in this process")
+    p.add_argument("--boards", type=int, default=200000, help="random boards to sample")
+    p.add_argument("--exact", action="store_true", help="enumerate all 2,598,960 boards")
+    p.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("export", help="write the table from the queue's SQLite counts")
+    p.add_argument("--db", default=db.DB_FILE)
+    args = parser.parse_args(argv)
+
+    index, reps = build_index()
+    if args.command == "export":
+        conn = sqlite3.connect(args.db)
+        init_counts(conn)
+        counts = load_counts(conn, len(reps))
+        conn.close()
+    elif args.exact:
+        counts = tuple(np.zeros(len(reps), dtype=np.int64) for _ in range(3))
+        step = 20000
+        for start in range(0, TOTAL_BOARDS, step):
+            for acc, part in zip(counts, board_counts(board_block(start, step), reps)):
+                acc += part
+            print(f"{min(start + step, TOTAL_BOARDS)}/{TOTAL_BOARDS} boards")
+    else:
+        rng = np.random.default_rng(args.seed)
+        boards = rng.random((args.boards, 52)).argsort(axis=1)[:, :5]
+        counts = board_counts(boards, reps)
+    save_table(index, counts)
+    print(f"Wrote {INDEX_FILE} and {EQUITY_FILE} ({len(reps)} classes, "
+          f"min {int(counts[2].min())} boards per class).")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
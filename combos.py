@@ -0,0 +1,76 @@
+"""
+Indexing of the 1,326 two-card combos and suit isomorphism of boards.
+
+Combos are numbered in itertools.combinations order over the 52 integer
+cards of fast_eval (card = (rank - 2) * 4 + suit_index). Boards that only
+differ by a relabelling of suits are equivalent; canonical_board() maps a
+board to one representative so results can be cached once per class.
+"""
+
+import itertools
+import numpy as np
+from fast_eval import int_to_card
+from hand_helpers import canonicalize_hand, grid_hand_cats
+
+COMBOS = np.array(list(itertools.combinations(range(52), 2)), dtype=np.int64)
+NUM_COMBOS = len(COMBOS)
+
+COMBO_INDEX = np.full((52, 52), -1, dtype=np.int64)
+COMBO_INDEX[COMBOS[:, 0], COMBOS[:, 1]] = np.arange(NUM_COMBOS)
+COMBO_INDEX[COMBOS[:, 1], COMBOS[:, 0]] = np.arange(NUM_COMBOS)
+
+# Hand categories in grid order, and each combo's category.
+GRID_POSITIONS = list(grid_hand_cats().keys())
+CATEGORIES = list(grid_hand_cats().values())
+CAT_INDEX = {cat: k for k, cat in enumerate(CATEGORIES)}
+COMBO_CAT = [canonicalize_hand([int_to_card(a), int_to_card(b)]) for a, b in COMBOS]
+COMBO_CAT_IDX = np.array([CAT_INDEX[cat] for cat in COMBO_CAT], dtype=np.int64)
+CAT_COMBOS = {cat: np.flatnonzero(COMBO_CAT_IDX == k) for k, cat in enumerate(CATEGORIES)}
+
+def combo_index(hand):
+    """Index of a two-card hand given as integer cards."""
+    return int(COMBO_INDEX[hand[0], hand[1]])
+
+def dead_combo_mask(dead):
+    """Boolean array, True for combos that use any of the dead cards."""
+    dead_cards = np.zeros(52, dtype=bool)
+    dead_cards[list(dead)] = True
+    return dead_cards[COMBOS[:, 0]] | dead_cards[COMBOS[:, 1]]
+
+# -------------- Suit isomorphism --------------
+
+SUIT_PERMS = list(itertools.permutations(range(4)))
+
+def permute_cards(cards, perm):
+    return [c - (c & 3) + perm[c & 3] for c in cards]
+
+def canonical_board(board):
+    """
+    Returns (key, perm) for a board of integer cards: key is the sorted
+    tuple of the lexicographically smallest suit relabelling and perm the
+    suit mapping that produces it (canonical suit = perm[suit]).
+    """
+    best = None
+    best_perm = None
+    for perm in SUIT_PERMS:
+        key = tuple(sorted(permute_cards(board, perm)))
+        if best is None or key < best:
+            best = key
+            best_perm = perm
+    return best, best_perm
+
+_combo_perm_maps = {}
+
+def combo_perm_map(perm):
+    """
+    Array mapping each combo index to the index of the same combo with its
+    suits relabelled by perm.
+    """
+    mapping = _combo_perm_maps.get(perm)
+    if mapping is None:
+        p = np.array(perm, dtype=np.int64)
+        a = COMBOS[:, 0] - (COMBOS[:, 0] & 3) + p[COMBOS[:, 0] & 3]
+        b = COMBOS[:, 1] - (COMBOS[:, 1] & 3) + p[COMBOS[:, 1] & 3]
+        mapping = COMBO_INDEX[a, b]
+        _combo_perm_maps[perm] = mapping
+    return mapping
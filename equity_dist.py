@@ -0,0 +1,65 @@
+"""
+Equity distributions of a range against another range.
+
+Every combo of the hero range gets its own equity against the villain
+range from a single range_equity.combo_matchup_sums pass over shared
+runouts, so the whole distribution costs the same as one range-vs-range
+compare. The result holds the per-combo equities and their weighted
+histogram, percentiles and nut/air fractions.
+"""
+
+import numpy as np
+from range_equity import combo_matchup_sums
+
+BUCKETS = 20
+# Combos at or above NUT_EQUITY count as "nuts", at or below AIR_EQUITY as "air".
+NUT_EQUITY = 0.8
+AIR_EQUITY = 0.2
+PERCENTILES = (10, 25, 50, 75, 90)
+
+class EquityDistribution:
+    def __init__(self, combo_equity, combo_weight, buckets=BUCKETS, range_equity=None):
+        """
+        combo_equity / combo_weight: (1326,) arrays; combos with zero weight
+        (outside the range or blocked) are ignored. range_equity is the
+        matchup-weighted equity of the whole range (defaults to the mean).
+        """
+        mask = combo_weight > 0
+        self.combos = np.flatnonzero(mask)
+        self.equities = combo_equity[mask]
+        self.weights = combo_weight[mask]
+        self.total_weight = float(self.weights.sum())
+        edges = np.linspace(0.0, 1.0, buckets + 1)
+        counts, _ = np.histogram(self.equities, bins=edges, weights=self.weights)
+        self.bucket_edges = edges
+        self.buckets = counts / self.total_weight if self.total_weight > 0 else counts
+        if self.total_weight > 0:
+            self.mean = float((self.equities * self.weights).sum() / self.total_weight)
+            self.nut_fraction = float(self.weights[self.equities >= NUT_EQUITY].sum() / self.total_weight)
+            self.air_fraction = float(self.weights[self.equities <= AIR_EQUITY].sum() / self.total_weight)
+        else:
+            self.mean = self.nut_fraction = self.air_fraction = 0.0
+        self.range_equity = self.mean if range_equity is None else range_equity
+        self.percentiles = {p: self.percentile(p) for p in PERCENTILES}
+
+    def percentile(self, p):
+        """Weighted percentile (0-100) of the combo equities."""
+        if self.total_weight <= 0:
+            return 0.0
+        order = np.argsort(self.equities, kind="stable")
+        cum = np.cumsum(self.weights[order])
+        k = int(np.searchsorted(cum, self.total_weight * p / 100.0, side="left"))
+        return float(self.equities[order][min(k, len(order) - 1)])
+
+def equity_distribution(hero_weights, vil_weights, board, num_simulations=1000, buckets=BUCKETS):
+    """
+    Distribution of the hero range's per-combo equity against the villain
+    range on board (a list of (rank, suit) cards).
+    """
+    win, tie, total = combo_matchup_sums(hero_weights, vil_weights, board, num_simulations)
+    equity = np.divide(win + tie / 2, total, out=np.zeros_like(total), where=total > 0)
+    # Combos that never faced the villain range (fully blocked) drop out.
+    weight = np.where(total > 0, np.asarray(hero_weights, dtype=float), 0.0)
+    faced = (weight * total).sum()
+    range_equity = float((weight * (win + tie / 2)).sum() / faced) if faced > 0 else 0.0
+    return EquityDistribution(equity, weight, buckets, range_equity)
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Hand evaluator backends behind one interface.
+
+Every backend scores integer cards (see fast_eval) with the same integer
+scores as fast_eval.evaluate_batch, through two calls:
+
+    evaluate(cards)        one hand of 5-7 cards, e.g. a list of ints
+    evaluate_batch(hands)  an (N, k) array, returns (N,) int64
+
+Registered backends:
+
+    reference  evaluate_seven below: best of the 21 five-card hands, pure
+               Python; the oracle every other backend is checked against
+    table      one pass over the cards into rank/suit bit masks, finished
+               with fast_eval's 13-bit rank-mask tables, pure Python
+    numpy      fast_eval.evaluate_batch, vectorized over rows
+    numba      the table kernel compiled with numba, when it is installed
+
+The first evaluation (or warm-up) self-checks each available backend
+against the reference and times it, separately for single hands and for
+batches, and keeps the fastest correct one for each. The choice is cached
+in CHOICE_FILE until the set of available backends changes. An override
+comes from the POKER_EVALUATOR environment variable ("numpy", or
+"single=table,batch=numba") or the "override" entry of CHOICE_FILE:
+
+    python evaluators.py                      # check, time and print every backend
+    python evaluators.py --override batch=numpy
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import threading
+from collections import Counter
+import numpy as np
+import fast_eval
+from fast_eval import EVALUATOR_VERSION, int_to_card
+
+CHOICE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "evaluator_choice.json")
+OVERRIDE_ENV = "POKER_EVALUATOR"
+MODES = ("single", "batch")
+CHECK_SEED = 1234
+# Random hands of each size (5, 6 and 7 cards) in the self-check.
+CHECK_HANDS = 100
+# Hands timed per backend and mode.
+BENCH_SINGLE = 300
+BENCH_BATCH = 5000
+
+# -------------- Reference evaluator --------------
+
+def evaluate_five(cards):
+    ranks = sorted((c[0] for c in cards), reverse=True)
+    suits = [c[1] for c in cards]
+    flush = (len(set(suits)) == 1)
+    counts = Counter(ranks)
+    freq = sorted(counts.values(), reverse=True)
+    unique_ranks = sorted(counts.keys(), reverse=True)
+    straight = False
+    top_str = None
+    if len(unique_ranks) == 5:
+        if unique_ranks[0] - unique_ranks[4] == 4:
+            straight = True; top_str = unique_ranks[0]
+        elif unique_ranks == [14, 5, 4, 3, 2]:
+            straight = True; top_str = 5
+    if flush and straight:
+        return (8, top_str)
+    elif 4 in freq:
+        four_rank = max(r for r, c in counts.items() if c == 4)
+        kicker = max(r for r in ranks if r != four_rank)
+        return (7, four_rank, kicker)
+    elif 3 in freq and 2 in freq:
+        triple_rank = max(r for r, c in counts.items() if c == 3)
+        pair_rank = max(r for r, c in counts.items() if c >= 2 and r != triple_rank)
+        return (6, triple_rank, pair_rank)
+    elif flush:
+        return (5, tuple(ranks))
+    elif straight:
+        return (4, top_str)
+    elif 3 in freq:
+        triple_rank = max(r for r, c in counts.items() if c == 3)
+        kickers = tuple(sorted((r for r in ranks if r != triple_rank), reverse=True))
+        return (3, triple_rank, kickers)
+    elif freq.count(2) >= 2:
+        pairs = sorted([r for r, c in counts.items() if c == 2], reverse=True)
+        kicker = max(r for r in ranks if r not in pairs)
+        return (2, tuple(pairs), kicker)
+    elif 2 in freq:
+        pair_rank = max(r for r, c in counts.items() if c == 2)
+        kickers = tuple(sorted([r for r in ranks if r != pair_rank], reverse=True))
+        return (1, pair_rank, kickers)
+    else:
+        return (0, tuple(ranks))
+
+def evaluate_seven(cards):
+    best = None
+    for combo in itertools.combinations(cards, 5):
+        score = evaluate_five(combo)
+        if best is None or score > best:
+            best = score
+    return best
+
+def tuple_score(result):
+    """An evaluate_seven tuple as the equivalent integer score."""
+    ranks = []
+    for part in result[1:]:
+        ranks.extend(part if isinstance(part, tuple) else (part,))
+    score = result[0] << 20
+    for shift, rank in zip((16, 12, 8, 4, 0), ranks):
+        score |= rank << shift
+    return score
+
+# -------------- Table kernel --------------
+
+def _score_cards(cards, high, straight, top):
+    """
+    Score of one hand of integer cards from the rank-mask tables. Written
+    so that numba can compile it unchanged.
+    """
+    counts = [0] * 13
+    suit_masks = [0, 0, 0, 0]
+    suit_counts = [0, 0, 0, 0]
+    for c in cards:
+        r = c >> 2
+        s = c & 3
+        counts[r] += 1
+        suit_masks[s] |= 1 << r
+        suit_counts[s] += 1
+    rank_mask = mask2 = mask3 = mask4 = 0
+    for r in range(13):
+        if counts[r] >= 1:
+            rank_mask |= 1 << r
+        if counts[r] >= 2:
+            mask2 |= 1 << r
+        if counts[r] >= 3:
+            mask3 |= 1 << r
+        if counts[r] >= 4:
+            mask4 |= 1 << r
+    flush_mask = 0
+    for s in range(4):
+        if suit_counts[s] >= 5:
+            flush_mask = suit_masks[s]
+    if flush_mask != 0 and straight[flush_mask] != 0:
+        return (8 << 20) | (straight[flush_mask] << 16)
+    if mask4 != 0:
+        quads = high[mask4]
+        return (7 << 20) | (quads << 16) | (high[rank_mask & ~(1 << (quads - 2))] << 12)
+    trips = high[mask3]
+    if mask3 != 0:
+        pair = high[mask2 & ~(1 << (trips - 2))]
+        if pair != 0:
+            return (6 << 20) | (trips << 16) | (pair << 12)
+    if flush_mask != 0:
+        return (5 << 20) | top[5][flush_mask]
+    if straight[rank_mask] != 0:
+        return (4 << 20) | (straight[rank_mask] << 16)
+    if mask3 != 0:
+        return (3 << 20) | (trips << 16) | (top[2][rank_mask & ~(1 << (trips - 2))] << 8)
+    if mask2 != 0:
+        code = top[2][mask2]
+        p1 = code >> 4
+        p2 = code & 15
+        if p2 != 0:
+            rest = rank_mask & ~(1 << (p1 - 2)) & ~(1 << (p2 - 2))
+            return (2 << 20) | (code << 12) | (high[rest] << 8)
+        return (1 << 20) | (p1 << 16) | (top[3][rank_mask & ~(1 << (p1 - 2))] << 4)
+    return top[5][rank_mask]
+
+def _rows_kernel(score):
+    def score_rows(hands, high, straight, top, out):
+        for i in range(hands.shape[0]):
+            out[i] = score(hands[i], high, straight, top)
+    return score_rows
+
+# -------------- Backends --------------
+
+class ReferenceBackend:
+    name = "reference"
+    # Only chosen by override: it is the oracle, never the fastest.
+    auto = False
+
+    def available(self):
+        return True
+
+    def evaluate(self, cards):
+        return tuple_score(evaluate_seven([int_to_card(int(c)) for c in cards]))
+
+    def evaluate_batch(self, hands):
+        return np.array([self.evaluate(h) for h in np.asarray(hands).tolist()], dtype=np.int64)
+
+class TableBackend:
+    name = "table"
+    auto = True
+
+    def __init__(self):
+        self.lists = None
+
+    def available(self):
+        return True
+
+    def _tables(self):
+        # Python lists index faster than arrays one element at a time.
+        if self.lists is None:
+            high, straight, top = fast_eval.tables()
+            self.lists = (high.tolist(), straight.tolist(), top.tolist())
+        return self.lists
+
+    def evaluate(self, cards):
+        high, straight, top = self._tables()
+        return _score_cards([int(c) for c in cards], high, straight, top)
+
+    def evaluate_batch(self, hands):
+        high, straight, top = self._tables()
+        return np.array([_score_cards(h, high, straight, top) for h in np.asarray(hands).tolist()],
+                        dtype=np.int64)
+
+class NumpyBackend:
+    name = "numpy"
+    auto = True
+
+    def available(self):
+        return True
+
+    def evaluate(self, cards):
+        return int(fast_eval.evaluate_batch(np.asarray([cards], dtype=np.int64))[0])
+
+    def evaluate_batch(self, hands):
+        return fast_eval.evaluate_batch(hands)
+
+class NumbaBackend:
+    name = "numba"
+    auto = True
+
+    def __init__(self):
+        self.kernels = None
+
+    def available(self):
+        try:
+            import numba  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _kernels(self):
+        if self.kernels is None:
+            import numba
+            score = numba.njit(cache=True)(_score_cards)
+            self.kernels = (score, numba.njit(cache=True)(_rows_kernel(score)))
+        return self.kernels
+
+    def evaluate(self, cards):
+        score, _ = self._kernels()
+        high, straight, top = fast_eval.tables()
+        return int(score(np.asarray(cards, dtype=np.int64), high, straight, top))
+
+    def evaluate_batch(self, hands):
+        _, score_rows = self._kernels()
+        high, straight, top = fast_eval.tables()
+        hands = np.ascontiguousarray(hands, dtype=np.int64)
+        out = np.empty(len(hands), dtype=np.int64)
+        score_rows(hands, high, straight, top, out)
+        return out
+
+BACKENDS = {}
+
+def register(backend):
+    """Adds a backend (an object with name, auto, available, evaluate and evaluate_batch)."""
+    BACKENDS[backend.name] = backend
+    return backend
+
+for _backend in (ReferenceBackend(), TableBackend(), NumpyBackend(), NumbaBackend()):
+    register(_backend)
+
+# -------------- Self-check and benchmark --------------
+
+_check = None
+
+def check_hands():
+    """{size: (hands, reference scores)} for 5, 6 and 7 cards, built once."""
+    global _check
+    if _check is None:
+        rng = np.random.default_rng(CHECK_SEED)
+        # Straight flushes, wheels, quads, two trips and three pairs are
+        # too rare among random hands to be left to chance.
+        edge = [[48, 0, 4, 8, 12, 22, 31], [48, 1, 6, 8, 12, 22, 31], [0, 1, 2, 3, 4, 5, 8],
+                [0, 1, 2, 4, 5, 6, 8], [0, 1, 4, 5, 8, 9, 13], [32, 36, 40, 44, 48, 1, 2],
+                [44, 45, 46, 47, 48, 49, 50], [0, 4, 8, 12, 16, 20, 24]]
+        _check = {}
+        for size in (5, 6, 7):
+            hands = np.array([rng.permutation(52)[:size] for _ in range(CHECK_HANDS)], dtype=np.int64)
+            hands = np.concatenate([np.array([h[:size] for h in edge], dtype=np.int64), hands])
+            ref = np.array([BACKENDS["reference"].evaluate(h) for h in hands.tolist()], dtype=np.int64)
+            _check[size] = (hands, ref)
+    return _check
+
+def self_check(backend):
+    """True if the backend matches the reference on every check hand, both ways."""
+    try:
+        for hands, ref in check_hands().values():
+            if not np.array_equal(np.asarray(backend.evaluate_batch(hands)), ref):
+                return False
+            if any(backend.evaluate(h) != r for h, r in zip(hands[:20].tolist(), ref[:20].tolist())):
+                return False
+    except Exception as e:
+        print(f"Evaluator {backend.name} failed its self-check:", e)
+        return False
+    return True
+
+def benchmark(backend, mode):
+    """Best-of-three seconds per hand for one mode."""
+    rng = np.random.default_rng(CHECK_SEED + 1)
+    count = BENCH_SINGLE if mode == "single" else BENCH_BATCH
+    hands = np.array([rng.permutation(52)[:7] for _ in range(count)], dtype=np.int64)
+    rows = hands.tolist()
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        if mode == "single":
+            for h in rows:
+                backend.evaluate(h)
+        else:
+            backend.evaluate_batch(hands)
+        elapsed = (time.perf_counter() - start) / count
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+# -------------- Selection --------------
+
+def parse_override(text):
+    """{mode: name} from "name" (both modes) or "single=name,batch=name"."""
+    result = {}
+    for part in (text or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            mode, name = (s.strip() for s in part.split("=", 1))
+            if mode not in MODES:
+                raise ValueError("Unknown evaluator mode: " + mode)
+            result[mode] = name
+        else:
+            result.update({mode: part for mode in MODES})
+    return result
+
+def load_choice(path=CHOICE_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_choice(choice, path=CHOICE_FILE):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(choice, f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        print("Could not save the evaluator choice:", e)
+
+def available_backends():
+    return sorted(name for name, b in BACKENDS.items() if b.available())
+
+def measure():
+    """{name: {"ok": bool, mode: seconds per hand}} for every available backend."""
+    results = {}
+    for name in available_backends():
+        backend = BACKENDS[name]
+        ok = self_check(backend)
+        results[name] = {"ok": ok}
+        if ok and backend.auto:
+            for mode in MODES:
+                # The first call may compile or build tables; keep it out of the timing.
+                backend.evaluate_batch(check_hands()[7][0][:2])
+                results[name][mode] = benchmark(backend, mode)
+    return results
+
+def choose(results):
+    """{mode: fastest correct backend name}."""
+    choice = {}
+    for mode in MODES:
+        timed = [(r[mode], name) for name, r in results.items() if r["ok"] and mode in r]
+        choice[mode] = min(timed)[1] if timed else "reference"
+    return choice
+
+_selected = {}
+_select_lock = threading.Lock()
+
+def _select(mode):
+    """
+    The backend for a mode: an override that passes its self-check, else
+    the cached choice, else the fastest correct backend (measured and
+    cached now).
+    """
+    with _select_lock:
+        if mode in _selected:
+            return _selected[mode]
+        stored = load_choice()
+        try:
+            override = parse_override(os.environ.get(OVERRIDE_ENV)) or stored.get("override", {})
+        except ValueError as e:
+            print(f"Ignoring {OVERRIDE_ENV}:", e)
+            override = stored.get("override", {})
+        name = override.get(mode)
+        if name is not None:
+            backend = BACKENDS.get(name)
+            if backend is not None and backend.available() and self_check(backend):
+                _selected[mode] = backend
+                return backend
+            print(f"Evaluator override {name!r} for {mode} is unavailable or failed its self-check.")
+        valid = (stored.get("version") == EVALUATOR_VERSION
+                 and stored.get("available") == available_backends()
+                 and all(m in stored.get("choice", {}) for m in MODES))
+        if valid:
+            backend = BACKENDS[stored["choice"][mode]]
+            if self_check(backend):
+                _selected[mode] = backend
+                return backend
+        results = measure()
+        stored.update({"version": EVALUATOR_VERSION, "available": available_backends(),
+                       "choice": choose(results), "timings": results})
+        save_choice(stored)
+        backend = BACKENDS[stored["choice"][mode]]
+        _selected[mode] = backend
+        return backend
+
+def get_backend(mode="batch"):
+    """The selected backend for "single" or "batch" evaluation."""
+    backend = _selected.get(mode)
+    return backend if backend is not None else _select(mode)
+
+def evaluate_batch(hands):
+    """Scores an (N, k) integer array of 5-7 cards with the selected batch backend."""
+    return get_backend("batch").evaluate_batch(hands)
+
+def evaluate_cards(cards):
+    """Score of one hand of (rank, suit) cards with the selected single-hand backend."""
+    return get_backend("single").evaluate([fast_eval.card_to_int(c) for c in cards])
+
+# -------------- Command line --------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check, time and select the hand evaluator backends.")
+    parser.add_argument("--override", help='fix a backend, e.g. "numpy" or "single=table,batch=numba" ("" clears)')
+    args = parser.parse_args(argv)
+
+    stored = load_choice()
+    if args.override is not None:
+        stored["override"] = parse_override(args.override)
+    results = measure()
+    stored.update({"version": EVALUATOR_VERSION, "available": available_backends(),
+                   "choice": choose(results), "timings": results})
+    save_choice(stored)
+    for name in sorted(BACKENDS):
+        r = results.get(name)
+        if r is None:
+            print(f"{name:10s} not available")
+            continue
+        times = "  ".join(f"{mode} {r[mode]*1e6:8.2f} us/hand" for mode in MODES if mode in r)
+        print(f"{name:10s} {'ok' if r['ok'] else 'WRONG':5s} {times}")
+    print("Selected:", ", ".join(f"{mode} {stored['choice'][mode]}" for mode in MODES))
+    if stored.get("override"):
+        print("Override:", ", ".join(f"{m} {n}" for m, n in stored["override"].items()))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,141 @@
+"""
+Vectorized hand evaluation.
+
+Cards are small integers: card = (rank - 2) * 4 + suit_index, with suits in
+generate_deck() order ('h', 'd', 'c', 's'). evaluate_batch() scores many
+5-7 card hands at once with NumPy and returns integers that order exactly
+like the tuples returned by evaluators.evaluate_seven():
+
+    score = category << 20 | r1 << 16 | r2 << 12 | r3 << 8 | r4 << 4 | r5
+
+where r1..r5 are the tie-break ranks (2..14) of that category, in the same
+order as the tuple, and 0 where the tuple has fewer entries.
+"""
+
+import numpy as np
+
+# Bump when scores change; persisted results (see result_store) are dropped.
+EVALUATOR_VERSION = 1
+
+SUITS = ['h', 'd', 'c', 's']
+SUIT_INDEX = {s: i for i, s in enumerate(SUITS)}
+
+def card_to_int(card):
+    rank, suit = card
+    return (rank - 2) * 4 + SUIT_INDEX[suit]
+
+def int_to_card(c):
+    return (c // 4 + 2, SUITS[c % 4])
+
+def cards_to_ints(cards):
+    return [card_to_int(c) for c in cards]
+
+# -------------- 13-bit rank-mask tables --------------
+
+def _build_tables():
+    n = 1 << 13
+    high = np.zeros(n, dtype=np.int64)
+    straight = np.zeros(n, dtype=np.int64)
+    top = np.zeros((6, n), dtype=np.int64)
+    windows = [(0x1F << i, i + 6) for i in range(8, -1, -1)]
+    for mask in range(1, n):
+        bits = [b for b in range(12, -1, -1) if mask >> b & 1]
+        high[mask] = bits[0] + 2
+        for k in range(1, 6):
+            code = 0
+            for b in bits[:k]:
+                code = code << 4 | (b + 2)
+            code <<= 4 * (k - len(bits[:k]))
+            top[k, mask] = code
+        for window, top_rank in windows:
+            if mask & window == window:
+                straight[mask] = top_rank
+                break
+        else:
+            if mask & 0x100F == 0x100F:
+                straight[mask] = 5
+    return high, straight, top
+
+# Built on first use, or installed from shared memory by worker processes
+# (see shared_runtime) so they never build their own copy.
+HIGH = STRAIGHT_TOP = TOP = None
+
+def tables():
+    """The (HIGH, STRAIGHT_TOP, TOP) rank-mask tables, building them if needed."""
+    global HIGH, STRAIGHT_TOP, TOP
+    if HIGH is None:
+        HIGH, STRAIGHT_TOP, TOP = _build_tables()
+    return HIGH, STRAIGHT_TOP, TOP
+
+def install_tables(high, straight, top):
+    """Uses the given (e.g. shared, read-only) arrays as the rank-mask tables."""
+    global HIGH, STRAIGHT_TOP, TOP
+    HIGH, STRAIGHT_TOP, TOP = high, straight, top
+
+def evaluate_batch(hands):
+    """
+    Scores an (N, k) integer array of cards (5 <= k <= 7) and returns an
+    int64 array of N scores, higher is better.
+    """
+    HIGH, STRAIGHT_TOP, TOP = tables()
+    hands = np.asarray(hands, dtype=np.int64)
+    n = hands.shape[0]
+    ranks = hands >> 2
+    suits = hands & 3
+    bit = np.left_shift(1, ranks)
+    rows = np.arange(n)[:, None]
+    counts = np.bincount((rows * 13 + ranks).ravel(), minlength=n * 13).reshape(n, 13)
+    weights = np.left_shift(1, np.arange(13))
+    rank_mask = (counts > 0) @ weights
+    mask2 = (counts >= 2) @ weights
+    mask3 = (counts >= 3) @ weights
+    mask4 = (counts >= 4) @ weights
+
+    suit_masks = np.zeros((n, 4), dtype=np.int64)
+    for s in range(4):
+        suit_masks[:, s] = np.bitwise_or.reduce(np.where(suits == s, bit, 0), axis=1)
+    suit_counts = np.bincount((rows * 4 + suits).ravel(), minlength=n * 4).reshape(n, 4)
+    flush_suit = suit_counts.argmax(axis=1)
+    is_flush = suit_counts[np.arange(n), flush_suit] >= 5
+    flush_mask = np.where(is_flush, suit_masks[np.arange(n), flush_suit], 0)
+
+    score = TOP[5][rank_mask]
+
+    pair = HIGH[mask2]
+    rest = rank_mask & ~np.left_shift(1, np.maximum(pair - 2, 0))
+    s = (1 << 20) | (pair << 16) | (TOP[3][rest] << 4)
+    score = np.where(mask2 != 0, s, score)
+
+    pair2_code = TOP[2][mask2]
+    p1 = pair2_code >> 4
+    p2 = pair2_code & 15
+    two = (mask2 != 0) & (p2 != 0)
+    rest = rank_mask & ~np.left_shift(1, np.maximum(p1 - 2, 0)) & ~np.left_shift(1, np.maximum(p2 - 2, 0))
+    s = (2 << 20) | (pair2_code << 12) | (HIGH[rest] << 8)
+    score = np.where(two, s, score)
+
+    trips = HIGH[mask3]
+    rest = rank_mask & ~np.left_shift(1, np.maximum(trips - 2, 0))
+    s = (3 << 20) | (trips << 16) | (TOP[2][rest] << 8)
+    score = np.where(mask3 != 0, s, score)
+
+    straight = STRAIGHT_TOP[rank_mask]
+    score = np.where(straight != 0, (4 << 20) | (straight << 16), score)
+
+    score = np.where(is_flush, (5 << 20) | TOP[5][flush_mask], score)
+
+    fh_pair = HIGH[mask2 & ~np.left_shift(1, np.maximum(trips - 2, 0))]
+    full = (mask3 != 0) & (fh_pair != 0)
+    score = np.where(full, (6 << 20) | (trips << 16) | (fh_pair << 12), score)
+
+    quads = HIGH[mask4]
+    rest = rank_mask & ~np.left_shift(1, np.maximum(quads - 2, 0))
+    score = np.where(mask4 != 0, (7 << 20) | (quads << 16) | (HIGH[rest] << 12), score)
+
+    sf = STRAIGHT_TOP[flush_mask]
+    score = np.where(sf != 0, (8 << 20) | (sf << 16), score)
+    return score
+
+def score_category(score):
+    """Hand category (0 = high card ... 8 = straight flush) of a score."""
+    return score >> 20
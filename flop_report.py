@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Range-vs-range report over every flop.
+
+For each suit isomorphic flop (1,755, each weighted by the number of raw
+flops it stands for) the report gives the left range's equity against the
+right range and each range's nut share: the fraction of its weight among
+the strongest NUT_FRACTION of both ranges' combined hands on the river,
+averaged over runouts. The combos of both ranges are scored together, once
+per runout, and that one set of scores gives both the equity and the nut
+share. Ranges that are not suit symmetric (an imported "AhKh", say) are
+reported over all 22,100 flops instead.
+
+Rows go to a CSV that can be sorted on any column, together with a summary
+per flop texture (suits, pairing, connectedness, high card):
+
+    python flop_report.py --left "22+,A2s+,KTs+,ATo+" --right "random" [--workers 8] [--runouts 300]
+"""
+
+import os
+import sys
+import csv
+import random
+import argparse
+import itertools
+import threading
+import multiprocessing as mp
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import fast_eval
+from fast_eval import int_to_card
+from evaluators import evaluate_batch
+from combos import COMBOS, SUIT_PERMS, canonical_board, combo_perm_map, dead_combo_mask
+from range_equity import runouts, weighted_showdown
+from range_parser import RANK_CHARS
+
+REPORT_FILE = "flop_report.csv"
+TEXTURE_FILE = "flop_textures.csv"
+# Runouts enumerated up to / sampled above, per flop (a flop has 1,176).
+RUNOUTS = 300
+# Share of the combined (equal-weighted) ranges counted as the nuts.
+NUT_FRACTION = 0.1
+# Flops per worker task.
+TASK_FLOPS = 16
+DEFAULT_SEED = 20240601
+FIELDS = ["flop", "weight", "left_equity", "right_equity", "left_nuts", "right_nuts", "nut_share",
+          "suits", "pairing", "connectedness", "high_card"]
+TEXTURES = ["suits", "pairing", "connectedness", "high_card"]
+
+# -------------- Flops --------------
+
+_flops = None
+_flops_lock = threading.Lock()
+
+def isomorphic_flops():
+    """[(canonical flop, number of raw flops)] in sorted order, built once."""
+    global _flops
+    with _flops_lock:
+        if _flops is None:
+            counts = Counter(canonical_board(list(f))[0] for f in itertools.combinations(range(52), 3))
+            _flops = sorted(counts.items())
+        return _flops
+
+def suit_symmetric(weights):
+    """True if relabelling suits never changes the range."""
+    weights = np.asarray(weights, dtype=float)
+    return all(np.array_equal(weights[combo_perm_map(perm)], weights) for perm in SUIT_PERMS)
+
+def report_flops(left_w, right_w):
+    """The (flop, weight) list for a pair of ranges."""
+    if suit_symmetric(left_w) and suit_symmetric(right_w):
+        return isomorphic_flops()
+    return [(f, 1) for f in itertools.combinations(range(52), 3)]
+
+def flop_text(flop):
+    """Integer flop as text, highest card first."""
+    return "".join(RANK_CHARS[r] + s for r, s in (int_to_card(c) for c in sorted(flop, reverse=True)))
+
+def texture(flop):
+    """{texture: group} for an integer flop."""
+    ranks = sorted({c // 4 + 2 for c in flop}, reverse=True)
+    suits = len({c & 3 for c in flop})
+    pairing = {3: "unpaired", 2: "paired", 1: "trips"}[len(ranks)]
+    # Distinct ranks that fit one straight (the ace also plays low).
+    spans = [ranks[0] - ranks[-1]]
+    if ranks[0] == 14:
+        low = sorted(r for r in ranks[1:]) + [1]
+        spans.append(max(low) - min(low))
+    span = min(spans)
+    if len(ranks) < 3:
+        connected = "no straight"
+    elif span == 2:
+        connected = "connected"
+    elif span <= 4:
+        connected = "straight possible"
+    else:
+        connected = "disconnected"
+    return {"suits": {1: "monotone", 2: "two-tone", 3: "rainbow"}[suits],
+            "pairing": pairing,
+            "connectedness": connected,
+            "high_card": RANK_CHARS[ranks[0]] + "-high"}
+
+# -------------- Per-flop statistics --------------
+
+def flop_stats(left_w, right_w, flop, num_runouts=RUNOUTS, rng=random):
+    """
+    (left equity, left nut fraction, right nut fraction) on one integer
+    flop, or None when either range has no live combo.
+    """
+    dead = dead_combo_mask(flop)
+    left_w = np.where(dead, 0.0, np.asarray(left_w, dtype=float))
+    right_w = np.where(dead, 0.0, np.asarray(right_w, dtype=float))
+    idx = np.flatnonzero((left_w > 0) | (right_w > 0))
+    lw, rw = left_w[idx], right_w[idx]
+    if lw.sum() <= 0 or rw.sum() <= 0:
+        return None
+    # Each range counts half of the pool the nuts are taken from.
+    pool_w = lw / lw.sum() + rw / rw.sum()
+    cards = COMBOS[idx]
+    share = faced = left_top = right_top = left_seen = right_seen = 0.0
+    for runout in runouts(list(flop), num_runouts, rng):
+        full = np.array(list(flop) + list(runout), dtype=np.int64)
+        scores = evaluate_batch(np.concatenate([cards, np.tile(full, (len(idx), 1))], axis=1))
+        out = np.zeros(52, dtype=bool)
+        out[list(runout)] = True
+        ok = ~(out[cards[:, 0]] | out[cards[:, 1]])
+        h = ok & (lw > 0)
+        v = ok & (rw > 0)
+        win, tie, total = weighted_showdown(cards[h], scores[h], cards[v], scores[v], rw[v], rw[h])
+        share += lw[h] @ (win + tie / 2)
+        faced += lw[h] @ total
+        # Nuts: the strongest hands holding NUT_FRACTION of the live pool.
+        order = np.argsort(-scores[ok], kind="stable")
+        cum = np.cumsum(pool_w[ok][order])
+        if len(cum) == 0:
+            continue
+        cut = scores[ok][order][min(np.searchsorted(cum, NUT_FRACTION * cum[-1]), len(cum) - 1)]
+        top = ok & (scores >= cut)
+        left_top += lw[top].sum()
+        right_top += rw[top].sum()
+        left_seen += lw[ok].sum()
+        right_seen += rw[ok].sum()
+    if faced <= 0:
+        return None
+    return (float(share / faced), float(left_top / max(left_seen, 1e-300)), float(right_top / max(right_seen, 1e-300)))
+
+def _flop_rows(left_w, right_w, flops, num_runouts, seed):
+    rows = []
+    for flop, weight in flops:
+        rng = random.Random(f"{seed}:{flop_text(flop)}")
+        stats = flop_stats(left_w, right_w, flop, num_runouts, rng)
+        if stats is not None:
+            rows.append((flop, weight) + stats)
+    return rows
+
+_worker_tables = None
+_worker_ranges = None
+
+def _init_worker(table_spec, left_w, right_w):
+    global _worker_tables, _worker_ranges
+    from shared_runtime import SharedArrays
+    _worker_tables = SharedArrays.attach(table_spec)
+    t = _worker_tables.arrays
+    fast_eval.install_tables(t["high"], t["straight"], t["top"])
+    _worker_ranges = (left_w, right_w)
+
+def _task(flops, num_runouts, seed):
+    return _flop_rows(*_worker_ranges, flops, num_runouts, seed)
+
+# -------------- Report --------------
+
+class FlopReport:
+    """
+    rows: (flop, weight, left equity, left nuts, right nuts) per flop;
+    the nut share is the left range's part of both nut fractions.
+    """
+    def __init__(self, rows):
+        self.rows = rows
+
+    def records(self):
+        """One dict per flop, with the FIELDS keys."""
+        for flop, weight, equity, left_nuts, right_nuts in self.rows:
+            nuts = left_nuts + right_nuts
+            record = {"flop": flop_text(flop), "weight": weight,
+                      "left_equity": equity, "right_equity": 1 - equity,
+                      "left_nuts": left_nuts, "right_nuts": right_nuts,
+                      "nut_share": left_nuts / nuts if nuts > 0 else 0.5}
+            record.update(texture(flop))
+            yield record
+
+    def sorted_records(self, key="left_equity", reverse=True):
+        return sorted(self.records(), key=lambda r: r[key], reverse=reverse)
+
+    def overall(self):
+        """Flop-weighted (left equity, nut share, share of flops where left is ahead)."""
+        records = list(self.records())
+        weights = np.array([r["weight"] for r in records], dtype=float)
+        if weights.sum() <= 0:
+            return 0.0, 0.5, 0.0
+        equity = np.array([r["left_equity"] for r in records])
+        nuts = np.array([r["nut_share"] for r in records])
+        ahead = weights[equity > 0.5].sum()
+        return (float(weights @ equity / weights.sum()), float(weights @ nuts / weights.sum()),
+                float(ahead / weights.sum()))
+
+    def textures(self):
+        """[(texture, group, flops, left equity, nut share)], flop weighted."""
+        sums = defaultdict(lambda: [0.0, 0.0, 0.0])
+        for r in self.records():
+            for name in TEXTURES:
+                s = sums[(name, r[name])]
+                s[0] += r["weight"]
+                s[1] += r["weight"] * r["left_equity"]
+                s[2] += r["weight"] * r["nut_share"]
+        return [(name, group, int(w), eq / w, nuts / w)
+                for (name, group), (w, eq, nuts) in sorted(sums.items(), key=lambda kv: (TEXTURES.index(kv[0][0]), -kv[1][1] / kv[1][0]))]
+
+    def write(self, path=REPORT_FILE, sort="left_equity"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for r in self.sorted_records(sort, reverse=sort != "flop"):
+                writer.writerow({k: f"{v:.4f}" if isinstance(v, float) else v for k, v in r.items()})
+
+    def write_textures(self, path=TEXTURE_FILE):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["texture", "group", "flops", "left_equity", "nut_share"])
+            for name, group, flops, equity, nuts in self.textures():
+                writer.writerow([name, group, flops, f"{equity:.4f}", f"{nuts:.4f}"])
+
+def flop_report(left_w, right_w, num_runouts=RUNOUTS, workers=0, seed=DEFAULT_SEED, on_progress=None):
+    """
+    FlopReport of left_w against right_w (combo weight vectors) on every
+    flop; with workers > 0 the flops are split over spawned processes that
+    map the evaluator tables from shared memory. on_progress(done, total)
+    is called as chunks of flops finish.
+    """
+    left_w = np.asarray(left_w, dtype=float)
+    right_w = np.asarray(right_w, dtype=float)
+    flops = report_flops(left_w, right_w)
+    chunks = [flops[k:k + TASK_FLOPS] for k in range(0, len(flops), TASK_FLOPS)]
+    rows = []
+    # Flops where a range has no live combos give no row, so count flops.
+    done = 0
+    if workers <= 0:
+        for chunk in chunks:
+            rows.extend(_flop_rows(left_w, right_w, chunk, num_runouts, seed))
+            done += len(chunk)
+            if on_progress:
+                on_progress(done, len(flops))
+        return FlopReport(rows)
+    from shared_runtime import SharedArrays
+    high, straight, top = fast_eval.tables()
+    tables = SharedArrays.publish({"high": high, "straight": straight, "top": top})
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(tables.spec, left_w, right_w)) as executor:
+            for chunk, result in zip(chunks, executor.map(_task, chunks, itertools.repeat(num_runouts),
+                                                          itertools.repeat(seed))):
+                rows.extend(result)
+                done += len(chunk)
+                if on_progress:
+                    on_progress(done, len(flops))
+    finally:
+        tables.close()
+    return FlopReport(rows)
+
+# -------------- Command line --------------
+
+def main(argv=None):
+    from range_parser import compile_range
+    parser = argparse.ArgumentParser(description="Range-vs-range equity and nut share on every flop.")
+    parser.add_argument("--left", required=True, help='left range, e.g. "QQ+,AKs" ("random" for all hands)')
+    parser.add_argument("--right", required=True, help="right range")
+    parser.add_argument("--runouts", type=int, default=RUNOUTS, help="turn/river runouts per flop (1176 = all)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (0 = this process)")
+    parser.add_argument("--sort", default="left_equity", choices=FIELDS, help="column the rows are sorted on")
+    parser.add_argument("--out", default=REPORT_FILE)
+    parser.add_argument("--textures-out", default=TEXTURE_FILE)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    ranges = []
+    for text in (args.left, args.right):
+        ranges.append(np.ones(len(COMBOS)) if text.strip().lower() == "random" else compile_range(text))
+    report = flop_report(ranges[0], ranges[1], args.runouts, args.workers, args.seed,
+                         on_progress=lambda done, total: print(f"\r{done}/{total} flops", end="", flush=True))
+    print()
+    report.write(args.out, args.sort)
+    report.write_textures(args.textures_out)
+    equity, nuts, ahead = report.overall()
+    print(f"Left equity {equity*100:.1f}%, nut share {nuts*100:.1f}%, ahead on {ahead*100:.1f}% of flops")
+    for name, group, flops, eq, share in report.textures():
+        print(f"  {name:14s} {group:14s} {flops:6d} flops  equity {eq*100:5.1f}%  nut share {share*100:5.1f}%")
+    print(f"Wrote {args.out} and {args.textures_out}.")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
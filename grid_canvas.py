@@ -0,0 +1,163 @@
+import tkinter as tk
+from tooltip import ToolTip
+from hand_helpers import RANKS, grid_hand_cats
+
+# Repaints are coalesced and applied at most once per frame (~60 fps).
+FRAME_MS = 16
+
+SELECTED_OUTLINE = "blue"
+DEFAULT_OUTLINE = "#9a9a9a"
+
+class HandGrid:
+    """
+    The 13x13 hand-category grid drawn on a single tk.Canvas.
+
+    Callers record the desired fill colour and selection state of each cell;
+    only cells whose state actually changed are reconfigured, in one batch
+    per frame. Clicks, drags and tooltips are resolved by hit-testing the
+    pointer position instead of binding events on every cell.
+    """
+    def __init__(self, parent, cell_width=44, cell_height=34, header_size=26,
+                 font=None, on_click=None, on_drag=None, tooltip_text=None,
+                 ranks=RANKS):
+        self.ranks = ranks
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.header_size = header_size
+        self.on_click = on_click
+        self.on_drag = on_drag
+        self.tooltip_text = tooltip_text
+        n = len(ranks)
+        width = header_size + n * cell_width + 2
+        height = header_size + n * cell_height + 2
+        self.canvas = tk.Canvas(parent, width=width, height=height, bg="white",
+                                highlightthickness=0)
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+        self.hand_cats = grid_hand_cats(ranks)
+        self._items = {}
+        self._drawn = {}
+        self._pending = {}
+        self._flush_id = None
+        self._hover = None
+        self._last_drag = None
+        self._tooltip = ToolTip(self.canvas)
+        for i, rank in enumerate(ranks):
+            x0, y0, x1, y1 = self._cell_bbox(i, -1)
+            self.canvas.create_rectangle(x0, y0, x1, y1, fill="white", outline=DEFAULT_OUTLINE)
+            self.canvas.create_text((x0+x1)/2, (y0+y1)/2, text=rank, font=font)
+            x0, y0, x1, y1 = self._cell_bbox(-1, i)
+            self.canvas.create_rectangle(x0, y0, x1, y1, fill="white", outline=DEFAULT_OUTLINE)
+            self.canvas.create_text((x0+x1)/2, (y0+y1)/2, text=rank, font=font)
+        for pos, hand_cat in self.hand_cats.items():
+            x0, y0, x1, y1 = self._cell_bbox(*pos)
+            rect = self.canvas.create_rectangle(x0, y0, x1, y1, fill="lightgrey",
+                                                outline=DEFAULT_OUTLINE, width=1)
+            text = self.canvas.create_text((x0+x1)/2, (y0+y1)/2, text=hand_cat, font=font)
+            self._items[pos] = (rect, text)
+            self._drawn[pos] = ("lightgrey", False)
+        self.canvas.bind("<Button-1>", self._on_button)
+        self.canvas.bind("<B1-Motion>", self._on_motion_drag)
+        self.canvas.bind("<ButtonRelease-1>", lambda e: self._reset_drag())
+        self.canvas.bind("<Motion>", self._on_hover)
+        self.canvas.bind("<Leave>", lambda e: self._set_hover(None))
+
+    def _cell_bbox(self, row, col):
+        # Row/column -1 are the rank headers.
+        x0 = self.header_size + col * self.cell_width + 1 if col >= 0 else 1
+        y0 = self.header_size + row * self.cell_height + 1 if row >= 0 else 1
+        x1 = x0 + (self.cell_width if col >= 0 else self.header_size) - 1
+        y1 = y0 + (self.cell_height if row >= 0 else self.header_size) - 1
+        return x0, y0, x1, y1
+
+    def cell_at(self, x, y):
+        """Maps canvas coordinates to a grid position, or None outside the cells."""
+        col = int((x - self.header_size - 1) // self.cell_width)
+        row = int((y - self.header_size - 1) // self.cell_height)
+        n = len(self.ranks)
+        if 0 <= row < n and 0 <= col < n:
+            return (row, col)
+        return None
+
+    # -------------- State updates (batched) --------------
+
+    def _state(self, pos):
+        return self._pending.get(pos, self._drawn[pos])
+
+    def set_fill(self, pos, color):
+        fill, selected = self._state(pos)
+        if fill != color:
+            self._pending[pos] = (color, selected)
+            self.schedule()
+
+    def set_selected(self, pos, selected):
+        fill, was = self._state(pos)
+        if was != bool(selected):
+            self._pending[pos] = (fill, bool(selected))
+            self.schedule()
+
+    def set_selection(self, selected):
+        for pos in self._items:
+            self.set_selected(pos, pos in selected)
+
+    def schedule(self):
+        if self._flush_id is None:
+            self._flush_id = self.canvas.after(FRAME_MS, self.flush)
+
+    def flush(self):
+        """Applies all pending cell changes that differ from what is on screen."""
+        if self._flush_id is not None:
+            self.canvas.after_cancel(self._flush_id)
+            self._flush_id = None
+        pending, self._pending = self._pending, {}
+        for pos, state in pending.items():
+            if self._drawn[pos] == state:
+                continue
+            fill, selected = state
+            rect = self._items[pos][0]
+            if selected:
+                self.canvas.itemconfig(rect, fill=fill, outline=SELECTED_OUTLINE, width=2)
+            else:
+                self.canvas.itemconfig(rect, fill=fill, outline=DEFAULT_OUTLINE, width=1)
+            self._drawn[pos] = state
+        if self._hover is not None and self.tooltip_text is not None:
+            self._show_tooltip(self._hover)
+
+    # -------------- Pointer handling --------------
+
+    def _event_cell(self, event):
+        return self.cell_at(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+
+    def _on_button(self, event):
+        pos = self._event_cell(event)
+        self._last_drag = pos
+        if pos is not None and self.on_click:
+            self.on_click(pos)
+
+    def _on_motion_drag(self, event):
+        pos = self._event_cell(event)
+        if pos is not None and pos != self._last_drag and self.on_drag:
+            self.on_drag(pos)
+        self._last_drag = pos
+
+    def _reset_drag(self):
+        self._last_drag = None
+
+    def _on_hover(self, event):
+        self._set_hover(self._event_cell(event))
+
+    def _set_hover(self, pos):
+        if pos == self._hover:
+            return
+        self._tooltip.hidetip()
+        self._hover = pos
+        if pos is not None and self.tooltip_text is not None:
+            self._show_tooltip(pos)
+
+    def _show_tooltip(self, pos):
+        text = self.tooltip_text(pos)
+        if text != self._tooltip.text:
+            self._tooltip.hidetip()
+        x0, y0, x1, y1 = self._cell_bbox(*pos)
+        x = int(x1 - self.canvas.canvasx(0))
+        y = int(y1 - self.canvas.canvasy(0))
+        self._tooltip.showtip(text, x, y)
@@ -1,9 +1,13 @@
 import tkinter as tk
 from tkinter import ttk
-import threading, concurrent.futures, sqlite3
+import threading, sqlite3
 from poker import parse_hand, parse_board, generate_deck, evaluate_seven, compare_hands, compute_equity
-from hand_helpers import canonicalize_hand, get_valid_hand, hand_weight, static_hand_rank, equity_to_color, select_cells_by_percent
-from tooltip import ToolTip
+from hand_helpers import canonicalize_hand, get_valid_hand, hand_weight, static_hand_rank, equity_to_color, ev_to_color, select_cells_by_percent, RANKS
+from grid_canvas import HandGrid
+from speculate import SpeculativeScheduler
+
+# Quiet time after the last keystroke before speculative work starts.
+SPECULATE_DELAY_MS = 300
 
 class EquityGUI:
     def __init__(self, master):
@@ -14,6 +18,11 @@ class EquityGUI:
         # Left panel for user input and controls
         left_frame = tk.Frame(main_frame)
         left_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5, pady=5)
+        game_frame = tk.Frame(left_frame)
+        game_frame.pack(anchor=tk.W)
+        self.game = tk.StringVar(value="holdem")
+        tk.Radiobutton(game_frame, text="Hold'em", variable=self.game, value="holdem").pack(side=tk.LEFT)
+        tk.Radiobutton(game_frame, text="PLO", variable=self.game, value="plo").pack(side=tk.LEFT)
         tk.Label(left_frame, text="Your Hand:").pack(anchor=tk.W)
         self.hand_entry = tk.Entry(left_frame, width=10)
         self.hand_entry.pack(anchor=tk.W, pady=2)
@@ -21,6 +30,13 @@ class EquityGUI:
         tk.Label(left_frame, text="Board Cards:").pack(anchor=tk.W)
         self.board_entry = tk.Entry(left_frame, width=20)
         self.board_entry.pack(anchor=tk.W, pady=2)
+        tk.Label(left_frame, text="Villain Hand (PLO, optional):").pack(anchor=tk.W)
+        self.villain_entry = tk.Entry(left_frame, width=12)
+        self.villain_entry.pack(anchor=tk.W, pady=2)
+        self.speculator = SpeculativeScheduler()
+        self.speculate_job = None
+        for entry in (self.hand_entry, self.board_entry):
+            entry.bind("<KeyRelease>", self.schedule_speculation, add="+")
         tk.Label(left_frame, text="Simulation Depth (# iterations):").pack(anchor=tk.W, pady=2)
         self.sim_depth = tk.IntVar(value=1000)
         self.sim_slider = tk.Scale(left_frame, from_=500, to=30000, resolution=500,
@@ -34,6 +50,13 @@ class EquityGUI:
         self.range_upper = tk.IntVar(value=100)
         tk.Scale(left_frame, from_=0, to=100, orient=tk.HORIZONTAL, variable=self.range_upper,
                  command=lambda v: self.update_range_selection()).pack(anchor=tk.W)
+        tk.Label(left_frame, text="Range (e.g. 22+, A2s+, KTo+):").pack(anchor=tk.W, pady=(5,0))
+        self.range_entry = tk.Entry(left_frame, width=30)
+        self.range_entry.pack(anchor=tk.W, pady=2)
+        range_btn_frame = tk.Frame(left_frame)
+        range_btn_frame.pack(anchor=tk.W)
+        tk.Button(range_btn_frame, text="Import Range", command=self.import_range).pack(side=tk.LEFT, padx=5)
+        tk.Button(range_btn_frame, text="Export Range", command=self.export_range).pack(side=tk.LEFT)
         btn_frame = tk.Frame(left_frame)
         btn_frame.pack(anchor=tk.W, pady=5)
         tk.Button(btn_frame, text="Update Grid", command=self.update_grid).pack(side=tk.LEFT, padx=5)
@@ -48,11 +71,60 @@ class EquityGUI:
         self.pot_odds_all_label.pack(anchor=tk.W, pady=2)
         self.pot_odds_range_label = tk.Label(left_frame, text="Pot Odds Needed (Range): N/A")
         self.pot_odds_range_label.pack(anchor=tk.W, pady=2)
+        self.best_cards_label = tk.Label(left_frame, text="", justify=tk.LEFT)
+        self.best_cards_label.pack(anchor=tk.W, pady=2)
+        self.worst_cards_label = tk.Label(left_frame, text="", justify=tk.LEFT)
+        self.worst_cards_label.pack(anchor=tk.W, pady=2)
+        push_frame = tk.Frame(left_frame)
+        push_frame.pack(anchor=tk.W, pady=(10,0))
+        tk.Label(push_frame, text="Stack (bb):").pack(side=tk.LEFT)
+        self.stack_entry = tk.Entry(push_frame, width=5)
+        self.stack_entry.pack(side=tk.LEFT, padx=2)
+        self.stack_entry.insert(0, "10")
+        tk.Label(push_frame, text="Ante:").pack(side=tk.LEFT)
+        self.ante_entry = tk.Entry(push_frame, width=5)
+        self.ante_entry.pack(side=tk.LEFT, padx=2)
+        self.ante_entry.insert(0, "0")
+        tk.Button(push_frame, text="Push/Fold", command=self.solve_push_fold).pack(side=tk.LEFT, padx=5)
+        self.push_fold_label = tk.Label(left_frame, text="", justify=tk.LEFT, wraplength=260)
+        self.push_fold_label.pack(anchor=tk.W, pady=2)
+        ev_frame = tk.Frame(left_frame)
+        ev_frame.pack(anchor=tk.W, pady=(10,0))
+        tk.Label(ev_frame, text="Pot:").pack(side=tk.LEFT)
+        self.pot_entry = tk.Entry(ev_frame, width=6)
+        self.pot_entry.pack(side=tk.LEFT, padx=2)
+        self.pot_entry.insert(0, "100")
+        self.ev_mode = tk.StringVar(value="call")
+        tk.Radiobutton(ev_frame, text="Call", variable=self.ev_mode, value="call").pack(side=tk.LEFT)
+        tk.Radiobutton(ev_frame, text="Shove", variable=self.ev_mode, value="shove").pack(side=tk.LEFT)
+        tk.Button(ev_frame, text="EV Heatmap", command=self.update_ev_heatmap).pack(side=tk.LEFT, padx=5)
+        tk.Label(left_frame, text="Bet Size (x pot):").pack(anchor=tk.W)
+        self.bet_fraction = tk.DoubleVar(value=0.5)
+        tk.Scale(left_frame, from_=0.05, to=5.0, resolution=0.05, orient=tk.HORIZONTAL,
+                 variable=self.bet_fraction, command=lambda v: self.paint_ev()).pack(anchor=tk.W)
+        self.ev_label = tk.Label(left_frame, text="", justify=tk.LEFT, wraplength=260)
+        self.ev_label.pack(anchor=tk.W, pady=2)
+        icm_frame = tk.Frame(left_frame)
+        icm_frame.pack(anchor=tk.W, pady=(10,0))
+        tk.Label(icm_frame, text="Stacks:").pack(side=tk.LEFT)
+        self.icm_stacks_entry = tk.Entry(icm_frame, width=14)
+        self.icm_stacks_entry.pack(side=tk.LEFT, padx=2)
+        tk.Label(icm_frame, text="Payouts:").pack(side=tk.LEFT)
+        self.icm_payouts_entry = tk.Entry(icm_frame, width=10)
+        self.icm_payouts_entry.pack(side=tk.LEFT, padx=2)
+        self.icm_payouts_entry.insert(0, "50,30,20")
+        tk.Button(icm_frame, text="ICM", command=self.update_icm).pack(side=tk.LEFT, padx=5)
+        self.icm_label = tk.Label(left_frame, text="", justify=tk.LEFT, wraplength=260)
+        self.icm_label.pack(anchor=tk.W, pady=2)
         
         # Right panel for the grid
         right_frame = tk.Frame(main_frame)
         right_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.canvas = tk.Canvas(right_frame)
+        self.ranks = RANKS
+        self.hand_grid = HandGrid(right_frame, cell_width=44, cell_height=34,
+                             on_click=self.toggle_cell, on_drag=self.drag_select,
+                             tooltip_text=lambda pos: self.cells[pos]["tooltip_text"])
+        self.canvas = self.hand_grid.canvas
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar = tk.Scrollbar(right_frame, orient=tk.VERTICAL, command=self.canvas.yview)
         scrollbar.pack(side=tk.LEFT, fill=tk.Y)
@@ -60,51 +132,109 @@ class EquityGUI:
         hscroll = tk.Scrollbar(right_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
         hscroll.pack(side=tk.BOTTOM, fill=tk.X)
         self.canvas.configure(xscrollcommand=hscroll.set)
-        self.grid_frame = tk.Frame(self.canvas)
-        self.canvas.create_window((0,0), window=self.grid_frame, anchor="nw")
-        self.grid_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
         
-        # Create a grid of cells showing hand categories
-        self.ranks = ['A','K','Q','J','T','9','8','7','6','5','4','3','2']
+        # Cell data for the hand categories shown on the grid
         self.cells = {}
         self.selected_cells = set()
-        for i, rank in enumerate(self.ranks):
-            tk.Label(self.grid_frame, text=rank, relief="ridge", width=3, height=2, bg="white").grid(row=i+1, column=0, padx=1, pady=1)
-            tk.Label(self.grid_frame, text=rank, relief="ridge", width=3, height=2, bg="white").grid(row=0, column=i+1, padx=1, pady=1)
-        tk.Label(self.grid_frame, text="", width=4, height=2, bg="white").grid(row=0, column=0, padx=1, pady=1)
-        for i, r1 in enumerate(self.ranks):
-            for j, r2 in enumerate(self.ranks):
-                if i == j:
-                    hand_cat = r1 * 2
-                else:
-                    high = self.ranks[min(i,j)]
-                    low = self.ranks[max(i,j)]
-                    hand_cat = high + low + ('s' if i < j else 'o')
-                label = tk.Label(self.grid_frame, text=hand_cat, width=5, height=2, bg="lightgrey", relief="ridge")
-                label.grid(row=i+1, column=j+1, padx=1, pady=1)
-                ttip = ToolTip(label)
-                self.cells[(i,j)] = {"hand_cat": hand_cat, "label": label, "equity": None, "tie": None, "tooltip": ttip}
-                label.bind("<Button-1>", lambda e, pos=(i,j): self.toggle_cell(pos))
-                label.bind("<B1-Motion>", lambda e, pos=(i,j): self.drag_select(pos))
-                label.bind("<Enter>", lambda e, pos=(i,j): self.show_tooltip(pos))
-                label.bind("<Leave>", lambda e, pos=(i,j): self.hide_tooltip(pos))
+        # Combo weights of an imported range (None = the selected cells) and
+        # the exact equity of the user's hand against it.
+        self.range_weights = None
+        self.range_equity = None
+        # street_equity.StreetEquity of the last flop/turn grid, for the
+        # best/worst next card breakdown.
+        self.street = None
+        # bet_ev.EVSweep behind the EV heatmap, None while the grid shows equity.
+        self.ev_sweep = None
+        # Inputs of the last ICM request, and a counter so only the newest
+        # request's thread updates the label.
+        self.icm_inputs = None
+        self.icm_generation = 0
+        for pos, hand_cat in self.hand_grid.hand_cats.items():
+            self.cells[pos] = {"hand_cat": hand_cat, "equity": None, "tie": None, "tooltip_text": ""}
                 
     def drag_select(self, pos):
+        self.clear_imported_range()
         if pos not in self.selected_cells:
             self.selected_cells.add(pos)
-            self.cells[pos]["label"].config(highlightbackground="blue", highlightthickness=2)
+            self.hand_grid.set_selected(pos, True)
             self.update_compound_equity()
 
     def toggle_cell(self, pos):
+        self.clear_imported_range()
         if pos in self.selected_cells:
             self.selected_cells.remove(pos)
-            self.cells[pos]["label"].config(highlightthickness=0)
+            self.hand_grid.set_selected(pos, False)
         else:
             self.selected_cells.add(pos)
-            self.cells[pos]["label"].config(highlightbackground="blue", highlightthickness=2)
+            self.hand_grid.set_selected(pos, True)
         self.update_compound_equity()
 
+    def clear_imported_range(self):
+        self.range_weights = None
+        self.range_equity = None
+
+    def import_range(self):
+        from range_parser import compile_range, category_weights
+        try:
+            weights = compile_range(self.range_entry.get())
+        except ValueError as e:
+            self.status_label.config(text=f"Error in range: {e}")
+            return
+        cat_w = category_weights(weights)
+        self.selected_cells = {pos for pos, data in self.cells.items() if cat_w[data["hand_cat"]] > 0}
+        self.hand_grid.set_selection(self.selected_cells)
+        self.range_weights = weights if self.selected_cells else None
+        self.range_equity = None
+        self.update_compound_equity()
+
+    def solve_push_fold(self):
+        """
+        Heads-up push/fold equilibrium for the entered stack: selects the
+        small blind's shoving range and lists the big blind's calling range.
+        """
+        try:
+            stack = float(self.stack_entry.get())
+            ante = float(self.ante_entry.get() or 0)
+        except ValueError:
+            self.status_label.config(text="Stack and ante must be numbers.")
+            return
+        self.push_fold_label.config(text="Solving push/fold...")
+        def run():
+            from push_fold import get_chart
+            try:
+                chart = get_chart(stack, ante=ante)
+            except Exception as e:
+                print("Push/fold solve failed:", e)
+                msg = f"Push/fold failed: {e}"
+                self.master.after(0, lambda: self.push_fold_label.config(text=msg))
+                return
+            self.master.after(0, lambda: self.show_push_fold(chart))
+        threading.Thread(target=run, daemon=True).start()
+
+    def show_push_fold(self, chart):
+        from range_parser import range_to_string, weights_from_categories
+        push = set(chart.push_range())
+        self.clear_imported_range()
+        self.selected_cells = {pos for pos, data in self.cells.items() if data["hand_cat"] in push}
+        self.hand_grid.set_selection(self.selected_cells)
+        call = range_to_string(weights_from_categories(chart.call_range()))
+        self.push_fold_label.config(text=f"{chart.stack:g}bb: shove {chart.push_percent():.1f}% (selected), "
+                                         f"call {chart.call_percent():.1f}%: {call}")
+        self.update_compound_equity()
+
+    def export_range(self):
+        from range_parser import range_to_string, weights_from_categories
+        if self.range_weights is not None:
+            weights = self.range_weights
+        else:
+            weights = weights_from_categories(self.cells[pos]["hand_cat"] for pos in self.selected_cells)
+        self.range_entry.delete(0, tk.END)
+        self.range_entry.insert(0, range_to_string(weights))
+
     def update_grid(self):
+        if self.game.get() == "plo":
+            self.update_plo()
+            return
         self.status_label.config(text="Updating grid...")
         self.master.update_idletasks()
         hand_str = self.hand_entry.get().strip()
@@ -124,8 +254,100 @@ class EquityGUI:
             return
         threading.Thread(target=self.compute_all_equities, args=(user_hand, board), daemon=True).start()
 
+    def update_plo(self):
+        """
+        PLO mode: the hand against a random four-card hand and, if one is
+        entered, against the villain hand. The grid holds Hold'em
+        categories, so it is cleared.
+        """
+        try:
+            user_hand = parse_hand(self.hand_entry.get(), game="plo")
+            villain = parse_hand(self.villain_entry.get(), game="plo")
+            board = parse_board(self.board_entry.get().strip())
+        except Exception as e:
+            self.status_label.config(text=f"Error in PLO input: {e}")
+            return
+        if not user_hand:
+            self.status_label.config(text="No user hand given. Enter four cards, then click Update Grid.")
+            return
+        cards = user_hand + (villain or []) + board
+        if len(board) > 5 or len(set(cards)) != len(cards):
+            self.status_label.config(text="Duplicate cards or more than five board cards.")
+            return
+        self.status_label.config(text="Computing PLO equity...")
+        sims = self.sim_depth.get()
+        def run():
+            from omaha import omaha_equity_vs_random
+            vs_random = omaha_equity_vs_random(user_hand, board, sims)
+            vs_villain = compute_equity(user_hand, villain, board, sims, game="plo") if villain else None
+            self.master.after(0, lambda: self.show_plo_results(vs_random, vs_villain))
+        threading.Thread(target=run, daemon=True).start()
+
+    def show_plo_results(self, vs_random, vs_villain):
+        self.update_grid_ui({})
+        def po(eq):
+            return "∞" if eq <= 0 else f"{(1-eq)/eq:.2f} : 1"
+        eq = vs_random[2]
+        self.compound_all_label.config(text=f"PLO Equity vs Random Hand: {eq*100:.1f}%")
+        self.pot_odds_all_label.config(text=f"Pot Odds Needed (All): {po(eq)}")
+        if vs_villain is not None:
+            win, tie, eq = vs_villain
+            self.compound_range_label.config(text=f"PLO Equity vs Villain: {eq*100:.1f}% (Win {win*100:.1f}%, Tie {tie*100:.1f}%)")
+            self.pot_odds_range_label.config(text=f"Pot Odds Needed (Villain): {po(eq)}")
+        else:
+            self.compound_range_label.config(text="PLO Equity vs Villain: N/A")
+            self.pot_odds_range_label.config(text="Pot Odds Needed (Villain): N/A")
+        self.best_cards_label.config(text="")
+        self.worst_cards_label.config(text="")
+        self.status_label.config(text="PLO equity updated.")
+
+    def grid_key(self, user_hand, board, sims):
+        return (tuple(sorted(user_hand)), tuple(sorted(board)), sims)
+
     def compute_all_equities(self, user_hand, board):
+        sims = self.sim_depth.get()
+        distinct = len(set(user_hand + board)) == len(user_hand) + len(board)
+        results, street = self.speculator.result(self.grid_key(user_hand, board, sims),
+                                                 lambda: self.grid_results(user_hand, board, sims))
+        range_weights = self.range_weights
+        range_equity = None
+        if range_weights is not None and distinct:
+            import numpy as np
+            if street is not None:
+                win, tie, total = street.combo_sums()
+                w = np.asarray(range_weights, dtype=float)
+                faced = (w * total).sum()
+                range_equity = float((w * (win + tie / 2)).sum() / faced) if faced > 0 else None
+            else:
+                from fast_eval import cards_to_ints
+                from combos import NUM_COMBOS, combo_index
+                from combo_table import load_combo_table
+                hero_idx = combo_index(cards_to_ints(user_hand))
+                table = load_combo_table() if not board else None
+                if table is not None:
+                    range_equity = table.vs_range(hero_idx, range_weights)[2]
+                else:
+                    from range_equity import range_vs_range
+                    hero = np.zeros(NUM_COMBOS)
+                    hero[hero_idx] = 1
+                    range_equity = range_vs_range(hero, range_weights, board, num_simulations=sims)[2]
+        self.master.after(0, lambda: self.update_grid_ui(results, range_weights, range_equity, street))
+
+    def grid_results(self, user_hand, board, sims):
+        """
+        Returns ({pos: (win, tie) | None | "error"}, street) for the grid;
+        street is the StreetEquity behind flop/turn grids, else None. Runs
+        off the Tk thread, so it must not touch widgets.
+        """
         results = {}
+        distinct = len(set(user_hand + board)) == len(user_hand) + len(board)
+        if 3 <= len(board) <= 4 and distinct:
+            return self.street_results(user_hand, board)
+        if len(board) == 0 and distinct:
+            from combo_table import load_combo_table
+            table = load_combo_table()
+            if table is not None:
+                return self.combo_table_results(table, user_hand), None
         if len(board) == 0:
             try:
                 conn = sqlite3.connect("preflop_equities.db")
@@ -146,59 +368,195 @@ class EquityGUI:
                 results = {}
         if not results or any(v is None for v in results.values()):
             forbidden = set(board + user_hand)
-            sims = self.sim_depth.get()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future_to_pos = {}
-                for pos, data in self.cells.items():
-                    opp_hand = get_valid_hand(data["hand_cat"], forbidden)
-                    if opp_hand is None:
-                        results[pos] = None
-                    else:
-                        future = executor.submit(compute_equity, user_hand, opp_hand, board, num_simulations=sims)
-                        future_to_pos[future] = pos
-                for future in concurrent.futures.as_completed(future_to_pos):
-                    pos = future_to_pos[future]
-                    try:
-                        win, tie, _ = future.result()
-                        results[pos] = (win, tie)
-                    except Exception as e:
-                        results[pos] = "error"
-        self.master.after(0, lambda: self.update_grid_ui(results))
+            tasks = []
+            for pos, data in self.cells.items():
+                opp_hand = get_valid_hand(data["hand_cat"], forbidden)
+                if opp_hand is None:
+                    results[pos] = None
+                elif len(board) == 5:
+                    # River lookups are instant; no need for the worker pool.
+                    win, tie, _ = compute_equity(user_hand, opp_hand, board)
+                    results[pos] = (win, tie)
+                else:
+                    tasks.append((pos, opp_hand))
+            if tasks:
+                self.pool_results(user_hand, board, sims, tasks, results)
+        return results, None
+
+    def pool_results(self, user_hand, board, sims, tasks, results):
+        """
+        Simulated cells: spots the result store already knows precisely are
+        read from it, the rest go to the worker pool and their samples are
+        added to the store, so each cell shows every sample taken so far.
+        """
+        from fast_eval import cards_to_ints
+        from shared_runtime import get_pool, runout_plan
+        from result_store import get_store, canonical_matchup
+        hero, b = cards_to_ints(user_hand), cards_to_ints(board)
+        try:
+            store = get_store()
+            keys = {pos: canonical_matchup(hero, cards_to_ints(opp), b) for pos, opp in tasks}
+            stored = {pos: store.lookup(key) for pos, key in keys.items()}
+        except Exception as e:
+            print("Result store unavailable:", e)
+            store, keys, stored = None, {}, {}
+        todo = []
+        for pos, opp in tasks:
+            hit = stored.get(pos)
+            if hit is not None and hit.precise():
+                win, tie, _ = hit.equity()
+                results[pos] = (win, tie)
+            else:
+                todo.append((pos, opp))
+        if not todo:
+            return
+        try:
+            out = get_pool().cell_equities(hero, [(r * 13 + c, cards_to_ints(opp)) for (r, c), opp in todo], b, sims)
+        except Exception as e:
+            print("Equity workers failed:", e)
+            for pos, _ in todo:
+                results[pos] = "error"
+            return
+        runouts, exact = runout_plan(len(b), sims)
+        samples = []
+        for (r, c), _ in todo:
+            win, tie, _ = out[r * 13 + c]
+            results[(r, c)] = (win, tie)
+            if store is not None:
+                samples.append((keys[(r, c)], round(win * runouts), round(tie * runouts), runouts, exact))
+        if store is None:
+            return
+        try:
+            store.add_many(samples)
+            for pos, _ in todo:
+                total = store.lookup(keys[pos])
+                if total is not None:
+                    win, tie, _ = total.equity()
+                    results[pos] = (win, tie)
+        except Exception as e:
+            print("Result store update failed:", e)
 
-    def update_grid_ui(self, results):
+    def combo_table_results(self, table, user_hand):
+        """
+        Preflop grid from the per-combo table: each cell averages the exact
+        suits of its combos that do not share a card with the hero.
+        """
+        from fast_eval import cards_to_ints
+        from combos import CAT_COMBOS, combo_index
+        win, tie, faced = table.hero_row(combo_index(cards_to_ints(user_hand)))
+        results = {}
+        for pos, data in self.cells.items():
+            idx = CAT_COMBOS[data["hand_cat"]]
+            idx = idx[faced[idx]]
+            results[pos] = (float(win[idx].mean()), float(tie[idx].mean())) if len(idx) else None
+        return results
+
+    def street_results(self, user_hand, board):
+        """
+        Flop/turn grid from the exact per-runout engine: one pass covers
+        every combo and every next card, and a later street of the same
+        hand is served from the cached runouts.
+        """
+        from fast_eval import cards_to_ints
+        from combos import CAT_COMBOS
+        from street_equity import street_equity
+        street = street_equity(cards_to_ints(user_hand), cards_to_ints(board))
+        win, tie, total = street.combo_sums()
+        results = {}
+        for pos, data in self.cells.items():
+            combos = CAT_COMBOS[data["hand_cat"]]
+            faced = total[combos].sum()
+            results[pos] = (win[combos].sum() / faced, tie[combos].sum() / faced) if faced > 0 else None
+        return results, street
+
+    def schedule_speculation(self, event=None):
+        """Debounces typing in the hand/board entries."""
+        if self.speculate_job is not None:
+            self.master.after_cancel(self.speculate_job)
+        self.speculate_job = self.master.after(SPECULATE_DELAY_MS, self.speculate)
+
+    def speculate(self):
+        """
+        Starts computing the grid for the current entries in the background
+        as soon as they parse, and prefetches every possible next card on a
+        flop or turn.
+        """
+        self.speculate_job = None
+        if self.game.get() == "plo":
+            return
+        try:
+            user_hand = parse_hand(self.hand_entry.get().strip())
+            board = parse_board(self.board_entry.get().strip())
+        except Exception:
+            return
+        if not user_hand or len(board) > 5 or len(set(user_hand + board)) != len(user_hand) + len(board):
+            return
+        sims = self.sim_depth.get()
+        prefetch = []
+        if 3 <= len(board) <= 4:
+            used = set(user_hand + board)
+            for card in generate_deck():
+                if card not in used:
+                    next_board = board + [card]
+                    prefetch.append((self.grid_key(user_hand, next_board, sims),
+                                     lambda b=next_board: self.grid_results(user_hand, b, sims)))
+        self.speculator.speculate(self.grid_key(user_hand, board, sims),
+                                  lambda: self.grid_results(user_hand, board, sims), prefetch)
+
+    def update_grid_ui(self, results, range_weights=None, range_equity=None, street=None):
         for pos, data in self.cells.items():
             hand_cat = data["hand_cat"]
             result = results.get(pos, None)
             if result is None:
                 data["equity"] = None; data["tie"] = None
-                data["label"].config(bg="grey")
-                data["tooltip"].text = f"{hand_cat}\nN/A"
+                self.hand_grid.set_fill(pos, "grey")
+                data["tooltip_text"] = f"{hand_cat}\nN/A"
             elif result == "error":
                 data["equity"] = None; data["tie"] = None
-                data["label"].config(bg="grey")
-                data["tooltip"].text = f"{hand_cat}\nErr"
+                self.hand_grid.set_fill(pos, "grey")
+                data["tooltip_text"] = f"{hand_cat}\nErr"
             else:
                 win, tie = result
                 data["equity"] = win; data["tie"] = tie
                 eff = win + tie/2
-                data["label"].config(bg=equity_to_color(eff))
-                data["tooltip"].text = f"{hand_cat}\nWin: {win*100:.1f}%, Tie: {tie*100:.1f}%"
+                self.hand_grid.set_fill(pos, equity_to_color(eff))
+                data["tooltip_text"] = f"{hand_cat}\nWin: {win*100:.1f}%, Tie: {tie*100:.1f}%"
+        if range_weights is not None and range_weights is self.range_weights:
+            self.range_equity = range_equity
+        self.street = street
+        self.ev_sweep = None
         self.status_label.config(text="Grid updated.")
         self.update_compound_equity()
 
+    def board_ranking_for_sliders(self):
+        """
+        Ranking used by the range sliders: board-aware once a valid flop,
+        turn or river is entered, else None for the preflop ranking. A new
+        board is ranked in the background and the selection re-applied.
+        """
+        try:
+            board = parse_board(self.board_entry.get().strip())
+        except Exception:
+            return None
+        if not 3 <= len(board) <= 5 or len(set(board)) != len(board):
+            return None
+        from board_rank import request_board_ranking
+        return request_board_ranking(board, lambda: self.master.after(0, self.update_range_selection))
+
     def update_range_selection(self):
         lower = self.range_lower.get()/100.0
         upper = self.range_upper.get()/100.0
-        sel = select_cells_by_percent(self.cells, lower, upper)
+        ranking = self.board_ranking_for_sliders()
+        sel = select_cells_by_percent(self.cells, lower, upper, ranking=ranking)
         self.selected_cells = sel
-        for pos, data in self.cells.items():
-            if pos in sel:
-                data["label"].config(highlightbackground="blue", highlightthickness=2)
-            else:
-                data["label"].config(highlightthickness=0)
+        self.hand_grid.set_selection(sel)
+        self.clear_imported_range()
         self.update_compound_equity()
 
     def update_compound_equity(self):
+        if self.game.get() == "plo":
+            # The labels hold the last PLO result; the grid is Hold'em only.
+            return
         total_w = 0
         total_eff = 0
         for data in self.cells.values():
@@ -209,13 +567,20 @@ class EquityGUI:
         comp_all = total_eff/total_w if total_w > 0 else 0
         sel_w = 0
         sel_eff = 0
+        range_cat_w = None
+        if self.range_weights is not None:
+            from range_parser import category_weights
+            range_cat_w = category_weights(self.range_weights)
         for pos in self.selected_cells:
             data = self.cells[pos]
             if data["equity"] is not None:
-                w = hand_weight(data["hand_cat"])
+                w = range_cat_w[data["hand_cat"]] if range_cat_w else hand_weight(data["hand_cat"])
                 sel_w += w
                 sel_eff += (data["equity"] + data["tie"]/2) * w
         comp_range = sel_eff/sel_w if sel_w > 0 else 0
+        if self.range_equity is not None:
+            # Exact combo-level equity against the imported range.
+            comp_range = self.range_equity
         self.compound_all_label.config(text=f"Compound Equity vs All: {comp_all*100:.1f}%")
         self.compound_range_label.config(text=f"Compound Equity vs Selected Range: {comp_range*100:.1f}%")
         def po(eq):
@@ -224,9 +589,165 @@ class EquityGUI:
             return f"{(1-eq)/eq:.2f} : 1"
         self.pot_odds_all_label.config(text=f"Pot Odds Needed (All): {po(comp_all)}")
         self.pot_odds_range_label.config(text=f"Pot Odds Needed (Range): {po(comp_range)}")
+        self.update_next_card_breakdown()
+        if self.ev_sweep is not None:
+            self.update_ev_heatmap()
+        if self.icm_stacks_entry.get().strip():
+            # With nothing selected update_icm falls back to equity vs every hand.
+            self.update_icm(comp_range if sel_w > 0 or self.range_equity is not None else None, force=False)
 
-    def show_tooltip(self, pos):
-        self.cells[pos]["tooltip"].showtip(self.cells[pos]["tooltip"].text)
+    def update_icm(self, equity=None, force=True):
+        """
+        $EV of calling villain's shove (Call) or of shoving into the
+        selected calling range (Shove) under ICM, with the equity against
+        the selected range. Stacks are chips behind, hero first and villain
+        second; the pot entry holds the chips already in the middle.
+        Unless forced, nothing is redone while the inputs are unchanged.
+        """
+        mode = self.ev_mode.get()
+        inputs = (self.icm_stacks_entry.get(), self.icm_payouts_entry.get(), self.pot_entry.get(), mode)
+        def invalid(text):
+            if force or inputs != self.icm_inputs:
+                self.status_label.config(text=text)
+            self.icm_inputs = inputs
+        try:
+            stacks = [float(x) for x in inputs[0].replace(" ", "").split(",") if x]
+            payouts = [float(x) for x in inputs[1].replace(" ", "").split(",") if x]
+            pot = float(inputs[2] or 0)
+        except ValueError:
+            invalid("Stacks, payouts and pot must be numbers.")
+            return
+        if len(stacks) < 2 or not payouts:
+            invalid("Enter at least hero's and villain's stacks, and the payouts.")
+            return
+        positions = [pos for pos, data in self.cells.items() if data["equity"] is not None]
+        if not positions:
+            invalid("Update the grid first.")
+            return
+        if equity is None:
+            equity = self.range_equity
+        if equity is None:
+            selected = [pos for pos in positions if pos in self.selected_cells] or positions
+            w = [hand_weight(self.cells[pos]["hand_cat"]) for pos in selected]
+            eq = [self.cells[pos]["equity"] + self.cells[pos]["tie"] / 2 for pos in selected]
+            equity = sum(a * b for a, b in zip(w, eq)) / sum(w)
+        every = sum(hand_weight(self.cells[pos]["hand_cat"]) for pos in positions)
+        calling = sum(hand_weight(self.cells[pos]["hand_cat"]) for pos in positions if pos in self.selected_cells)
+        call_prob = calling / every if self.selected_cells else 1.0
+        key = inputs + (round(equity, 6), round(call_prob, 6))
+        if not force and key == self.icm_inputs:
+            return
+        self.icm_inputs = key
+        self.icm_generation += 1
+        generation = self.icm_generation
+        self.icm_label.config(text="Computing ICM...")
+        def run():
+            from icm import call_decision, shove_decision, format_decision
+            try:
+                # Ties count as half a win, like the equities on the grid.
+                if mode == "shove":
+                    d = shove_decision(stacks, payouts, 0, 1, pot, call_prob, equity)
+                else:
+                    d = call_decision(stacks, payouts, 0, 1, pot, equity)
+            except Exception as e:
+                print("ICM failed:", e)
+                msg = f"ICM failed: {e}"
+                self.master.after(0, lambda: self.show_icm(generation, msg))
+                return
+            text = f"Equity {equity*100:.1f}%" + (f", villain calls {call_prob*100:.1f}%" if mode == "shove" else "")
+            text += "\n" + format_decision(d)
+            self.master.after(0, lambda: self.show_icm(generation, text))
+        threading.Thread(target=run, daemon=True).start()
 
-    def hide_tooltip(self, pos):
-        self.cells[pos]["tooltip"].hidetip()
+    def show_icm(self, generation, text):
+        # A slower, older request must not overwrite a newer result.
+        if generation == self.icm_generation:
+            self.icm_label.config(text=text)
+
+    def update_ev_heatmap(self):
+        """
+        EV of calling a bet (against the selected range, or every hand) or
+        of shoving (villain calls with the selected cells) for every swept
+        bet size, from the equities already on the grid.
+        """
+        import numpy as np
+        from bet_ev import SWEEP_FRACTIONS, call_ev, shove_ev
+        try:
+            pot = float(self.pot_entry.get())
+        except ValueError:
+            self.status_label.config(text="Pot must be a number.")
+            return
+        positions = [pos for pos, data in self.cells.items() if data["equity"] is not None]
+        if not positions or pot <= 0:
+            self.status_label.config(text="Update the grid and enter a positive pot first.")
+            return
+        equity = np.array([self.cells[pos]["equity"] + self.cells[pos]["tie"] / 2 for pos in positions])
+        every = np.array([hand_weight(self.cells[pos]["hand_cat"]) for pos in positions], dtype=float)
+        selected = np.array([pos in self.selected_cells for pos in positions])
+        sizes = SWEEP_FRACTIONS * pot
+        if self.ev_mode.get() == "shove":
+            self.ev_sweep = shove_ev(equity, every, selected, pot, sizes)
+        else:
+            weights = every
+            if self.range_weights is not None:
+                from range_parser import category_weights
+                cat_w = category_weights(self.range_weights)
+                weights = np.array([cat_w[self.cells[pos]["hand_cat"]] for pos in positions])
+            if selected.any():
+                weights = np.where(selected, weights, 0.0)
+            self.ev_sweep = call_ev(equity, weights, pot, sizes)
+        self.ev_positions = positions
+        self.paint_ev()
+
+    def paint_ev(self):
+        sweep = self.ev_sweep
+        if sweep is None:
+            return
+        k = sweep.size_index(self.bet_fraction.get() * sweep.pot)
+        size = sweep.sizes[k]
+        action = "Call" if sweep.mode == "call" else "Shove"
+        shown = set(self.ev_positions)
+        for i, pos in enumerate(self.ev_positions):
+            data = self.cells[pos]
+            ev = sweep.cell_ev[k, i]
+            self.hand_grid.set_fill(pos, ev_to_color(ev, sweep.pot))
+            eq = data["equity"] + data["tie"] / 2
+            data["tooltip_text"] = f"{data['hand_cat']}\nEquity: {eq*100:.1f}%\nEV ({action} {size:g}): {ev:+.1f}"
+        for pos in self.cells:
+            if pos not in shown:
+                self.hand_grid.set_fill(pos, "grey")
+        text = f"{action} {size:g} into {sweep.pot:g}: EV {sweep.range_ev[k]:+.2f}"
+        if sweep.mode == "call":
+            limit = sweep.break_even()
+            text += f"\nCall profitable up to: {limit:g}" if limit is not None else "\nNo profitable call"
+        else:
+            best_size, best_ev = sweep.best()
+            text += f"\nBest shove size: {best_size:g} (EV {best_ev:+.2f})"
+        self.ev_label.config(text=text)
+
+    def update_next_card_breakdown(self, count=5):
+        """
+        Best and worst next cards against the selected range (or every hand
+        when nothing is selected), from the last flop/turn grid.
+        """
+        if self.street is None:
+            self.best_cards_label.config(text="")
+            self.worst_cards_label.config(text="")
+            return
+        import numpy as np
+        from range_parser import weights_from_categories, RANK_CHARS
+        from fast_eval import int_to_card
+        from combos import NUM_COMBOS
+        if self.range_weights is not None:
+            weights = self.range_weights
+        elif self.selected_cells:
+            weights = weights_from_categories(self.cells[pos]["hand_cat"] for pos in self.selected_cells)
+        else:
+            weights = np.ones(NUM_COMBOS)
+        ranked = self.street.next_card_equity(weights)
+        street_name = "turn" if len(self.street.board) == 3 else "river"
+        def fmt(items):
+            return ", ".join(f"{RANK_CHARS[r]}{s} {eq*100:.0f}%" for r, s, eq in
+                             ((*int_to_card(c), eq) for c, eq in items))
+        self.best_cards_label.config(text=f"Best {street_name} cards: {fmt(ranked[:count])}")
+        self.worst_cards_label.config(text=f"Worst {street_name} cards: {fmt(ranked[::-1][:count])}")
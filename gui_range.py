@@ -1,8 +1,16 @@
 import tkinter as tk
-import threading, sqlite3, random
-from poker import parse_board, generate_deck, evaluate_seven
-from hand_helpers import get_valid_hand, hand_weight, equity_to_color, select_cells_by_percent
-from tooltip import ToolTip
+import threading
+import numpy as np
+from poker import parse_board
+from hand_helpers import equity_to_color, select_cells_by_percent, load_preflop_table
+from grid_canvas import HandGrid
+from combos import NUM_COMBOS, COMBO_CAT_IDX, CATEGORIES, CAT_INDEX
+from range_parser import compile_range, range_to_string, category_weights, weights_from_categories
+from range_equity import combo_matchup_sums
+from equity_dist import equity_distribution
+from histogram_canvas import EquityHistogram
+from category_matchups import category_vector, preflop_matchups, postflop_matchups
+from hand_class import board_classes, format_composition
 
 class RangeComparisonTab:
     def __init__(self, master):
@@ -30,8 +38,12 @@ class RangeComparisonTab:
         btn_frame.grid(row=2, column=0, columnspan=4, pady=5)
         tk.Button(btn_frame, text="Update Range Grids", command=self.update_range_grids).pack(side=tk.LEFT, padx=5)
         tk.Button(btn_frame, text="Compare Ranges", command=self.compare_ranges).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Equity Distribution", command=self.show_distribution).pack(side=tk.LEFT, padx=5)
+        tk.Button(btn_frame, text="Flop Report", command=self.flop_report).pack(side=tk.LEFT, padx=5)
         self.result_label = tk.Label(controls_frame, text="Left: N/A | Tie: N/A | Right: N/A")
         self.result_label.grid(row=3, column=0, columnspan=4, sticky="w", padx=10)
+        self.histogram = EquityHistogram(controls_frame)
+        self.histogram.canvas.grid(row=4, column=0, columnspan=4, sticky="w", padx=10)
         canvas = tk.Canvas(master)
         canvas.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         v_scrollbar = tk.Scrollbar(master, orient=tk.VERTICAL, command=canvas.yview)
@@ -44,69 +56,76 @@ class RangeComparisonTab:
         left_frame.grid(row=0, column=0, padx=5, pady=5)
         right_frame = tk.LabelFrame(grids_frame, text="Right Range")
         right_frame.grid(row=0, column=1, padx=5, pady=5)
-        self.left_cells, self.left_selected = self.create_grid(left_frame, "left")
-        self.right_cells, self.right_selected = self.create_grid(right_frame, "right")
+        # Combo weights imported from a range string; None means "use the grid".
+        self.imported_weights = {"left": None, "right": None}
+        self.range_entries = {}
+        self.composition_labels = {}
+        self.left_grid, self.left_cells, self.left_selected = self.create_grid(left_frame, "left")
+        self.right_grid, self.right_cells, self.right_selected = self.create_grid(right_frame, "right")
+        # Per-category matchup sums for the board (and depth) in matchups_key,
+        # each side's per-category weights, and each side's (share, total)
+        # per category against the other side. Cell toggles update these by
+        # one column instead of re-simulating.
+        self.matchups = None
+        self.matchups_key = None
+        self.building_key = None
+        self.vectors = None
+        self.grid_sums = None
 
     def create_grid(self, parent, grid_name):
-        ranks = ['A','K','Q','J','T','9','8','7','6','5','4','3','2']
         cells = {}
         selected = set()
-        for i, rank in enumerate(ranks):
-            tk.Label(parent, text=rank, relief="ridge", width=2, height=1, bg="white").grid(row=i+1, column=0, padx=1, pady=1)
-            tk.Label(parent, text=rank, relief="ridge", width=2, height=1, bg="white").grid(row=0, column=i+1, padx=1, pady=1)
-        tk.Label(parent, text="", width=3, height=1, bg="white").grid(row=0, column=0, padx=1, pady=1)
-        for i, r1 in enumerate(ranks):
-            for j, r2 in enumerate(ranks):
-                if i == j:
-                    hand_cat = r1 * 2
-                else:
-                    high = ranks[min(i,j)]
-                    low = ranks[max(i,j)]
-                    hand_cat = high + low + ('s' if i < j else 'o')
-                lbl = tk.Label(parent, text=hand_cat, width=4, height=1, bg="lightgrey", relief="ridge")
-                lbl.grid(row=i+1, column=j+1, padx=1, pady=1)
-                cells[(i,j)] = {"hand_cat": hand_cat, "label": lbl, "equity": None, "tooltip_text": "", "tooltip": ToolTip(lbl)}
-                lbl.bind("<Button-1>", lambda e, pos=(i,j), grid=grid_name: self.toggle_cell(pos, grid))
-                lbl.bind("<B1-Motion>", lambda e, pos=(i,j), grid=grid_name: self.drag_select(pos, grid))
-                lbl.bind("<Enter>", lambda e, pos=(i,j), grid=grid_name: self.show_cell_tooltip(pos, grid))
-                lbl.bind("<Leave>", lambda e, pos=(i,j), grid=grid_name: self.hide_cell_tooltip(pos, grid))
-        return cells, selected
+        grid = HandGrid(parent, cell_width=36, cell_height=22, header_size=22,
+                        font=("TkDefaultFont", 8),
+                        on_click=lambda pos: self.toggle_cell(pos, grid_name),
+                        on_drag=lambda pos: self.drag_select(pos, grid_name),
+                        tooltip_text=lambda pos: cells[pos]["tooltip_text"])
+        grid.canvas.pack(padx=1, pady=1)
+        for pos, hand_cat in grid.hand_cats.items():
+            cells[pos] = {"hand_cat": hand_cat, "equity": None, "tooltip_text": ""}
+        range_frame = tk.Frame(parent)
+        range_frame.pack(fill=tk.X, padx=1, pady=2)
+        entry = tk.Entry(range_frame, width=40)
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(range_frame, text="Import", command=lambda: self.import_range(grid_name)).pack(side=tk.LEFT, padx=2)
+        tk.Button(range_frame, text="Export", command=lambda: self.export_range(grid_name)).pack(side=tk.LEFT)
+        self.range_entries[grid_name] = entry
+        composition = tk.Label(parent, text="", justify=tk.LEFT, anchor="w", font=("TkDefaultFont", 8))
+        composition.pack(fill=tk.X, padx=1)
+        self.composition_labels[grid_name] = composition
+        return grid, cells, selected
 
     def drag_select(self, pos, grid):
+        self.imported_weights[grid] = None
         if grid == "left":
             if pos not in self.left_selected:
                 self.left_selected.add(pos)
-                self.left_cells[pos]["label"].config(highlightbackground="blue", highlightthickness=2)
+                self.left_grid.set_selected(pos, True)
         else:
             if pos not in self.right_selected:
                 self.right_selected.add(pos)
-                self.right_cells[pos]["label"].config(highlightbackground="blue", highlightthickness=2)
+                self.right_grid.set_selected(pos, True)
+        self.apply_selection_delta(grid)
+        self.update_composition()
 
     def toggle_cell(self, pos, grid):
+        self.imported_weights[grid] = None
         if grid == "left":
             if pos in self.left_selected:
                 self.left_selected.remove(pos)
-                self.left_cells[pos]["label"].config(highlightthickness=0)
+                self.left_grid.set_selected(pos, False)
             else:
                 self.left_selected.add(pos)
-                self.left_cells[pos]["label"].config(highlightbackground="blue", highlightthickness=2)
+                self.left_grid.set_selected(pos, True)
         else:
             if pos in self.right_selected:
                 self.right_selected.remove(pos)
-                self.right_cells[pos]["label"].config(highlightthickness=0)
+                self.right_grid.set_selected(pos, False)
             else:
                 self.right_selected.add(pos)
-                self.right_cells[pos]["label"].config(highlightbackground="blue", highlightthickness=2)
-
-    def show_cell_tooltip(self, pos, grid):
-        cell = self.left_cells[pos] if grid == "left" else self.right_cells[pos]
-        cell["tooltip"].showtip(cell.get("tooltip_text", ""))
-
-    def hide_cell_tooltip(self, pos, grid):
-        if grid == "left":
-            self.left_cells[pos]["tooltip"].hidetip()
-        else:
-            self.right_cells[pos]["tooltip"].hidetip()
+                self.right_grid.set_selected(pos, True)
+        self.apply_selection_delta(grid)
+        self.update_composition()
 
     def get_range_from_grid(self, cells, selected):
         rng = []
@@ -115,169 +134,277 @@ class RangeComparisonTab:
                 rng.append(cell["hand_cat"])
         return rng
 
+    def range_weights(self, grid):
+        """
+        The combo weight vector for one side: the imported range if there is
+        one, else the selected cells (the whole grid when nothing is selected).
+        """
+        if self.imported_weights[grid] is not None:
+            return self.imported_weights[grid]
+        if grid == "left":
+            rng = self.get_range_from_grid(self.left_cells, self.left_selected)
+            if not rng:
+                rng = [cell["hand_cat"] for cell in self.left_cells.values()]
+        else:
+            rng = self.get_range_from_grid(self.right_cells, self.right_selected)
+            if not rng:
+                rng = [cell["hand_cat"] for cell in self.right_cells.values()]
+        return weights_from_categories(rng)
+
+    def import_range(self, grid):
+        try:
+            weights = compile_range(self.range_entries[grid].get())
+        except ValueError as e:
+            self.result_label.config(text=f"Error in {grid} range: {e}")
+            return
+        cat_w = category_weights(weights)
+        cells = self.left_cells if grid == "left" else self.right_cells
+        selected = {pos for pos, cell in cells.items() if cat_w[cell["hand_cat"]] > 0}
+        if grid == "left":
+            self.left_selected = selected
+            self.left_grid.set_selection(selected)
+        else:
+            self.right_selected = selected
+            self.right_grid.set_selection(selected)
+        self.imported_weights[grid] = weights if selected else None
+        self.refresh_from_matchups()
+        self.update_composition()
+
+    def export_range(self, grid):
+        entry = self.range_entries[grid]
+        entry.delete(0, tk.END)
+        entry.insert(0, range_to_string(self.range_weights(grid)))
+
+    def board_ranking_for_sliders(self):
+        """
+        Ranking used by the range sliders: board-aware once a valid flop,
+        turn or river is entered, else None for the preflop ranking. A new
+        board is ranked in the background and the selection re-applied.
+        """
+        try:
+            board = parse_board(self.board_entry.get().strip())
+        except Exception:
+            return None
+        if not 3 <= len(board) <= 5 or len(set(board)) != len(board):
+            return None
+        from board_rank import request_board_ranking
+        return request_board_ranking(board, lambda: self.master.after(0, self.update_range_selection))
+
     def update_range_selection(self):
         lower = self.range_lower.get()/100.0
         upper = self.range_upper.get()/100.0
-        self.left_selected = select_cells_by_percent(self.left_cells, lower, upper)
-        self.right_selected = select_cells_by_percent(self.right_cells, lower, upper)
-        for pos, cell in self.left_cells.items():
-            if pos in self.left_selected:
-                cell["label"].config(highlightbackground="blue", highlightthickness=2)
-            else:
-                cell["label"].config(highlightthickness=0)
-        for pos, cell in self.right_cells.items():
-            if pos in self.right_selected:
-                cell["label"].config(highlightbackground="blue", highlightthickness=2)
-            else:
-                cell["label"].config(highlightthickness=0)
+        ranking = self.board_ranking_for_sliders()
+        self.left_selected = select_cells_by_percent(self.left_cells, lower, upper, ranking=ranking)
+        self.right_selected = select_cells_by_percent(self.right_cells, lower, upper, ranking=ranking)
+        self.left_grid.set_selection(self.left_selected)
+        self.right_grid.set_selection(self.right_selected)
+        self.imported_weights = {"left": None, "right": None}
+        self.refresh_from_matchups()
+        self.update_composition()
+
+    def update_composition(self):
+        """
+        Made-hand and draw breakdown of each side's range on a flop, turn
+        or river; cleared otherwise.
+        """
+        _, board = self.current_matchups_key()
+        valid = 3 <= len(board) <= 5 and len(set(board)) == len(board)
+        classes = board_classes(board) if valid else None
+        for side, label in self.composition_labels.items():
+            text = format_composition(*classes.composition(self.range_weights(side))) if classes else ""
+            label.config(text=text)
+
+    # -------------- Incremental grid updates --------------
+
+    def current_matchups_key(self):
+        try:
+            board = parse_board(self.board_entry.get().strip())
+        except Exception:
+            board = []
+        if len(set(board)) != len(board):
+            return None, board
+        if not board:
+            return ("preflop",), board
+        return (tuple(board), self.sim_depth.get()), board
+
+    def live_matchups(self):
+        """The matchup sums if they match the current board and depth, else None."""
+        key, _ = self.current_matchups_key()
+        if self.matchups is not None and key == self.matchups_key:
+            return self.matchups
+        return None
+
+    def refresh_from_matchups(self):
+        """
+        Recomputes both grids from the matchup sums (O(169^2)) when both
+        ranges have one weight per category; otherwise the grids go stale
+        until the next full update.
+        """
+        matchups = self.live_matchups()
+        self.vectors = self.grid_sums = None
+        if matchups is None:
+            return False
+        vectors = {side: self.selection_vector(side) for side in ("left", "right")}
+        if vectors["left"] is None or vectors["right"] is None:
+            return False
+        self.vectors = vectors
+        self.grid_sums = {"left": matchups.sums(vectors["right"]), "right": matchups.sums(vectors["left"])}
+        self.paint_grid("left")
+        self.paint_grid("right")
+        return True
+
+    def apply_selection_delta(self, grid):
+        """
+        After a cell toggle on one side, adds or subtracts the changed
+        categories' columns to the other side's sums and repaints it.
+        """
+        if self.grid_sums is None or self.live_matchups() is None:
+            return
+        new = self.selection_vector(grid)
+        change = new - self.vectors[grid]
+        other = "right" if grid == "left" else "left"
+        share, total = self.grid_sums[other]
+        for k in np.flatnonzero(change):
+            d_share, d_total = self.matchups.delta(k, change[k])
+            share = share + d_share
+            total = total + d_total
+        self.vectors[grid] = new
+        self.grid_sums[other] = (share, total)
+        self.paint_grid(other)
+        left, right = self.matchup_equities()
+        self.result_label.config(text=f"Left: {left*100:.1f}% | Right: {right*100:.1f}%")
+
+    def selection_vector(self, grid):
+        """
+        Per-category combo weight of one side (see range_weights), or None
+        for an imported range that weights combos within a category apart.
+        """
+        if self.imported_weights[grid] is not None:
+            return category_vector(self.imported_weights[grid])
+        cells, selected = (self.left_cells, self.left_selected) if grid == "left" else (self.right_cells, self.right_selected)
+        if not selected:
+            return np.ones(len(CATEGORIES))
+        vec = np.zeros(len(CATEGORIES))
+        for pos in selected:
+            vec[CAT_INDEX[cells[pos]["hand_cat"]]] = 1.0
+        return vec
+
+    def matchup_equities(self):
+        """(left, right) range equity from the current sums, in O(169)."""
+        share, total = self.grid_sums["left"]
+        vec = self.vectors["left"]
+        denom = vec @ total
+        if denom <= 0:
+            return 0.0, 0.0
+        left = float(vec @ share / denom)
+        return left, 1 - left
+
+    def paint_grid(self, side):
+        cells, grid = (self.left_cells, self.left_grid) if side == "left" else (self.right_cells, self.right_grid)
+        share, total = self.grid_sums[side]
+        for pos, cell in cells.items():
+            k = CAT_INDEX[cell["hand_cat"]]
+            eq = share[k] / total[k] if total[k] > 0 else 0
+            cell["equity"] = eq
+            cell["tooltip_text"] = f"{cell['hand_cat']}\nEquity vs opp: {eq*100:.1f}%"
+            grid.set_fill(pos, equity_to_color(eq))
 
     def update_range_grids(self):
+        """
+        Builds (or reuses) the per-category matchup sums for the board and
+        paints both grids from them. Imported ranges whose combos differ in
+        weight within a category take the per-combo path instead.
+        """
+        key, board = self.current_matchups_key()
+        self.update_composition()
+        if key is not None and self.live_matchups() is None:
+            if key == ("preflop",):
+                try:
+                    self.matchups = preflop_matchups(load_preflop_table())
+                    self.matchups_key = key
+                except Exception as e:
+                    print("DB update error:", e)
+            elif self.building_key != key:
+                self.building_key = key
+                self.result_label.config(text="Building matchup sums...")
+                sims = self.sim_depth.get()
+                def work():
+                    try:
+                        matchups = postflop_matchups(board, num_simulations=sims)
+                    except Exception as e:
+                        print("Matchup sums failed:", e)
+                        self.building_key = None
+                        return
+                    def done():
+                        self.building_key = None
+                        self.matchups, self.matchups_key = matchups, key
+                        self.update_range_grids()
+                    self.master.after(0, done)
+                threading.Thread(target=work, daemon=True).start()
+                return
+            else:
+                return
+        if self.refresh_from_matchups():
+            source = "preflop DB" if key == ("preflop",) else "postflop matchup sums"
+            self.result_label.config(text=f"Range grids updated ({source}).")
+        else:
+            self.update_range_grids_per_combo()
+
+    def update_range_grids_per_combo(self):
         try:
             board = parse_board(self.board_entry.get().strip())
         except Exception:
             board = []
+        left_w = self.range_weights("left")
+        right_w = self.range_weights("right")
         if len(board) == 0:
             try:
-                conn = sqlite3.connect("preflop_equities.db")
-                c = conn.cursor()
-                right_range = self.get_range_from_grid(self.right_cells, self.right_selected)
-                if not right_range:
-                    right_range = [cell["hand_cat"] for cell in self.right_cells.values()]
-                total_weight_R = sum(hand_weight(r) for r in right_range)
-                for pos, cell in self.left_cells.items():
-                    L = cell["hand_cat"]
-                    sum_eq = 0.0
-                    for r in right_range:
-                        w = hand_weight(r)
-                        c.execute("SELECT win, tie, true FROM preflop_equities WHERE user_hand=? AND opp_hand=?", (L, r))
-                        row = c.fetchone()
-                        if row:
-                            win, tie, _ = row
-                        else:
-                            win, tie = 0, 0
-                        eff = win + tie/2
-                        sum_eq += eff * w
-                    eq = sum_eq/total_weight_R if total_weight_R > 0 else 0
-                    cell["equity"] = eq
-                    cell["tooltip_text"] = f"{L}\nEquity vs opp: {eq*100:.1f}%"
-                    cell["label"].config(bg=equity_to_color(eq))
-                left_range = self.get_range_from_grid(self.left_cells, self.left_selected)
-                if not left_range:
-                    left_range = [cell["hand_cat"] for cell in self.left_cells.values()]
-                total_weight_L = sum(hand_weight(r) for r in left_range)
-                for pos, cell in self.right_cells.items():
-                    R = cell["hand_cat"]
-                    sum_eq = 0.0
-                    for r in left_range:
-                        w = hand_weight(r)
-                        c.execute("SELECT win, tie, true FROM preflop_equities WHERE user_hand=? AND opp_hand=?", (R, r))
-                        row = c.fetchone()
-                        if row:
-                            win, tie, _ = row
-                        else:
-                            win, tie = 0, 0
-                        eff = win + tie/2
-                        sum_eq += eff * w
-                    eq = sum_eq/total_weight_L if total_weight_L > 0 else 0
-                    cell["equity"] = eq
-                    cell["tooltip_text"] = f"{R}\nEquity vs opp: {eq*100:.1f}%"
-                    cell["label"].config(bg=equity_to_color(eq))
-                conn.close()
+                table = load_preflop_table()
+                for cells, grid, opp_w in ((self.left_cells, self.left_grid, right_w),
+                                           (self.right_cells, self.right_grid, left_w)):
+                    opp = [(r, w) for r, w in category_weights(opp_w).items() if w > 0]
+                    total_weight = sum(w for _, w in opp)
+                    for pos, cell in cells.items():
+                        L = cell["hand_cat"]
+                        sum_eq = 0.0
+                        for r, w in opp:
+                            win, tie, _ = table.get((L, r), (0, 0, 0))
+                            sum_eq += (win + tie/2) * w
+                        eq = sum_eq/total_weight if total_weight > 0 else 0
+                        cell["equity"] = eq
+                        cell["tooltip_text"] = f"{L}\nEquity vs opp: {eq*100:.1f}%"
+                        grid.set_fill(pos, equity_to_color(eq))
                 self.result_label.config(text="Range grids updated (preflop DB).")
             except Exception as e:
                 print("DB update error:", e)
         else:
             sims = self.sim_depth.get()
-            right_range = self.get_range_from_grid(self.right_cells, self.right_selected)
-            if not right_range:
-                right_range = [cell["hand_cat"] for cell in self.right_cells.values()]
-            left_results = {cell["hand_cat"]: 0.0 for cell in self.left_cells.values()}
-            count_left = {cell["hand_cat"]: 0 for cell in self.left_cells.values()}
-            for _ in range(sims):
-                deck = generate_deck()
-                for card in board:
-                    if card in deck: deck.remove(card)
-                missing = 5 - len(board)
-                runout = random.sample(deck, missing) if missing > 0 else []
-                full_board = board + runout
-                left_evals = {}
-                for L in left_results.keys():
-                    handL = get_valid_hand(L, set(full_board))
-                    if handL:
-                        left_evals[L] = evaluate_seven(handL + full_board)
-                right_evals = {}
-                for r in right_range:
-                    handR = get_valid_hand(r, set(full_board))
-                    if handR:
-                        right_evals[r] = evaluate_seven(handR + full_board)
-                if not right_evals:
-                    continue
-                for L, L_val in left_evals.items():
-                    cnt = 0.0; tot = 0.0
-                    for r, R_val in right_evals.items():
-                        tot += 1
-                        if L_val > R_val: 
-                            cnt += 1
-                        elif L_val == R_val: 
-                            cnt += 0.5
-                    if tot > 0:
-                        left_results[L] += cnt/tot; count_left[L] += 1
-            for L in left_results:
-                eq = left_results[L] / count_left[L] if count_left[L] > 0 else 0
-                for pos, cell in self.left_cells.items():
-                    if cell["hand_cat"] == L:
-                        cell["equity"] = eq
-                        cell["tooltip_text"] = f"{L}\nEquity vs opp: {eq*100:.1f}%"
-                        cell["label"].config(bg=equity_to_color(eq))
-            left_range = self.get_range_from_grid(self.left_cells, self.left_selected)
-            if not left_range:
-                left_range = [cell["hand_cat"] for cell in self.left_cells.values()]
-            right_results = {cell["hand_cat"]: 0.0 for cell in self.right_cells.values()}
-            count_right = {cell["hand_cat"]: 0 for cell in self.right_cells.values()}
-            for _ in range(sims):
-                deck = generate_deck()
-                for card in board:
-                    if card in deck: deck.remove(card)
-                missing = 5 - len(board)
-                runout = random.sample(deck, missing) if missing > 0 else []
-                full_board = board + runout
-                left_evals = {}
-                for L in left_range:
-                    handL = get_valid_hand(L, set(full_board))
-                    if handL:
-                        left_evals[L] = evaluate_seven(handL + full_board)
-                right_evals = {}
-                for R in right_results.keys():
-                    handR = get_valid_hand(R, set(full_board))
-                    if handR:
-                        right_evals[R] = evaluate_seven(handR + full_board)
-                if not left_evals:
-                    continue
-                for R, R_val in right_evals.items():
-                    cnt = 0.0; tot = 0.0
-                    for L, L_val in left_evals.items():
-                        tot += 1
-                        if R_val > L_val: 
-                            cnt += 1
-                        elif R_val == L_val: 
-                            cnt += 0.5
-                    if tot > 0:
-                        right_results[R] += cnt/tot; count_right[R] += 1
-            for R in right_results:
-                eq = right_results[R] / count_right[R] if count_right[R] > 0 else 0
-                for pos, cell in self.right_cells.items():
-                    if cell["hand_cat"] == R:
-                        cell["equity"] = eq
-                        cell["tooltip_text"] = f"{R}\nEquity vs opp: {eq*100:.1f}%"
-                        cell["label"].config(bg=equity_to_color(eq))
+            every_combo = np.ones(NUM_COMBOS)
+            for cells, grid, opp_w in ((self.left_cells, self.left_grid, right_w),
+                                       (self.right_cells, self.right_grid, left_w)):
+                win, tie, total = combo_matchup_sums(every_combo, opp_w, board, num_simulations=sims)
+                cat_eq = np.bincount(COMBO_CAT_IDX, weights=win + tie/2, minlength=len(CATEGORIES))
+                cat_total = np.bincount(COMBO_CAT_IDX, weights=total, minlength=len(CATEGORIES))
+                for pos, cell in cells.items():
+                    k = CAT_INDEX[cell["hand_cat"]]
+                    eq = cat_eq[k] / cat_total[k] if cat_total[k] > 0 else 0
+                    cell["equity"] = eq
+                    cell["tooltip_text"] = f"{cell['hand_cat']}\nEquity vs opp: {eq*100:.1f}%"
+                    grid.set_fill(pos, equity_to_color(eq))
             self.result_label.config(text="Range grids updated (postflop simulation).")
 
     def compare_ranges(self):
         """
         Simplified approach that only displays final left/right equity
-        (ties split 0.5 each). We do one simulation pass for postflop.
+        (ties split 0.5 each). Preflop uses the DB, postflop the vectorized
+        range-vs-range engine on the two combo weight vectors.
         """
-        import sqlite3
+        if self.grid_sums is not None and self.live_matchups() is not None:
+            left_equity, right_equity = self.matchup_equities()
+            self.result_label.config(
+                text=f"Left: {left_equity*100:.1f}% | Right: {right_equity*100:.1f}%"
+            )
+            return
 
         # Parse the board
         try:
@@ -285,22 +412,15 @@ class RangeComparisonTab:
         except Exception:
             board = []
 
-        # Gather selected hands
-        left_range = self.get_range_from_grid(self.left_cells, self.left_selected)
-        if not left_range:
-            left_range = [cell["hand_cat"] for cell in self.left_cells.values()]
-        right_range = self.get_range_from_grid(self.right_cells, self.right_selected)
-        if not right_range:
-            right_range = [cell["hand_cat"] for cell in self.right_cells.values()]
-
-        # Number of simulations
-        sims = self.sim_depth.get()
+        left_w = self.range_weights("left")
+        right_w = self.range_weights("right")
 
-        # ----- PRE-FLOP (No Board) -> Use DB approach (if you want) -----
+        # ----- PRE-FLOP (No Board) -> Use DB approach -----
         if len(board) == 0:
             try:
-                conn = sqlite3.connect("preflop_equities.db")
-                c = conn.cursor()
+                table = load_preflop_table()
+                left_range = [(L, w) for L, w in category_weights(left_w).items() if w > 0]
+                right_range = [(R, w) for R, w in category_weights(right_w).items() if w > 0]
 
                 total_weight = 0.0
                 left_sum = 0.0
@@ -308,19 +428,10 @@ class RangeComparisonTab:
 
                 # For each hand L in left range, each hand R in right range,
                 # gather (win, tie) from DB and add tie as 0.5 to each side
-                for L in left_range:
-                    wL = hand_weight(L)
-                    for R in right_range:
-                        wR = hand_weight(R)
+                for L, wL in left_range:
+                    for R, wR in right_range:
                         total_weight += (wL * wR)
-
-                        c.execute("SELECT win, tie, true FROM preflop_equities "
-                                "WHERE user_hand=? AND opp_hand=?", (L, R))
-                        row = c.fetchone()
-                        if row:
-                            win, tie, _ = row
-                        else:
-                            win, tie = 0, 0
+                        win, tie, _ = table.get((L, R), (0, 0, 0))
 
                         # Add tie * 0.5 to each side
                         left_sum += (win + 0.5*tie) * wL * wR
@@ -329,8 +440,6 @@ class RangeComparisonTab:
                         # lose = 1 - win - tie
                         right_sum += ((1 - win - tie) + 0.5*tie) * wL * wR
 
-                conn.close()
-
                 if total_weight <= 0:
                     left_equity = 0
                     right_equity = 0
@@ -346,68 +455,79 @@ class RangeComparisonTab:
                 self.result_label.config(text="Compare error (DB).")
             return
 
-        # ----- POST-FLOP (Board given) -> Single-pass simulation -----
-        import random
-        from poker import generate_deck, evaluate_seven
-        from hand_helpers import get_valid_hand
-
-        left_sum = 0.0
-        right_sum = 0.0
-        total_weight = 0.0  # Sum of wL * wR for each matchup
-
-        for _ in range(sims):
-            deck = generate_deck()
-            for card in board:
-                if card in deck:
-                    deck.remove(card)
-
-            missing = 5 - len(board)
-            runout = random.sample(deck, missing) if missing > 0 else []
-            full_board = board + runout
-
-            # Evaluate all valid combos in left range
-            left_evals = {}
-            for L in left_range:
-                handL = get_valid_hand(L, set(full_board))
-                if handL:
-                    left_evals[L] = evaluate_seven(handL + full_board)
-
-            # Evaluate all valid combos in right range
-            right_evals = {}
-            for R in right_range:
-                handR = get_valid_hand(R, set(full_board))
-                if handR:
-                    right_evals[R] = evaluate_seven(handR + full_board)
-
-            # If either side is empty this run, skip
-            if not left_evals or not right_evals:
-                continue
-
-            # For every L vs R, compare
-            for L, L_val in left_evals.items():
-                wL = hand_weight(L)
-                for R, R_val in right_evals.items():
-                    wR = hand_weight(R)
-                    # Weighted matchups
-                    total_weight += (wL * wR)
-
-                    if L_val > R_val:
-                        left_sum += (wL * wR)
-                    elif R_val > L_val:
-                        right_sum += (wL * wR)
-                    else:
-                        # tie -> 0.5 each
-                        left_sum += 0.5 * (wL * wR)
-                        right_sum += 0.5 * (wL * wR)
-
+        # ----- POST-FLOP (Board given) -> Vectorized range vs range -----
+        win, tie, total = combo_matchup_sums(left_w, right_w, board, num_simulations=self.sim_depth.get())
+        total_weight = (left_w * total).sum()
         if total_weight <= 0:
             left_equity = 0.0
             right_equity = 0.0
         else:
-            left_equity = left_sum / total_weight
-            right_equity = right_sum / total_weight
+            left_equity = (left_w * (win + 0.5*tie)).sum() / total_weight
+            right_equity = 1 - left_equity
 
         # Show final simplified results
         self.result_label.config(
             text=f"Left: {left_equity*100:.1f}% | Right: {right_equity*100:.1f}%"
         )
+
+    def show_distribution(self):
+        """
+        Computes the per-combo equity distribution of each range against
+        the other in the background and draws both histograms.
+        """
+        try:
+            board = parse_board(self.board_entry.get().strip())
+        except Exception as e:
+            self.result_label.config(text=f"Invalid board: {e}")
+            return
+        left_w = self.range_weights("left")
+        right_w = self.range_weights("right")
+        sims = self.sim_depth.get()
+        self.result_label.config(text="Computing equity distributions...")
+        def work():
+            try:
+                left = equity_distribution(left_w, right_w, board, num_simulations=sims)
+                right = equity_distribution(right_w, left_w, board, num_simulations=sims)
+            except Exception as e:
+                print("Equity distribution failed:", e)
+                msg = f"Equity distribution failed: {e}"
+                self.master.after(0, lambda: self.result_label.config(text=msg))
+                return
+            self.master.after(0, lambda: self.draw_distribution(left, right))
+        threading.Thread(target=work, daemon=True).start()
+
+    def flop_report(self):
+        """
+        Left-vs-right equity and nut share on every flop, computed in worker
+        processes; writes flop_report's CSV files and shows the summary.
+        """
+        import os
+        from flop_report import flop_report, REPORT_FILE, TEXTURE_FILE
+        left_w = self.range_weights("left")
+        right_w = self.range_weights("right")
+        self.result_label.config(text="Flop report: starting...")
+        def progress(done, total):
+            self.master.after(0, lambda: self.result_label.config(text=f"Flop report: {done}/{total} flops"))
+        def work():
+            try:
+                report = flop_report(left_w, right_w, workers=os.cpu_count() or 1, on_progress=progress)
+                report.write(REPORT_FILE)
+                report.write_textures(TEXTURE_FILE)
+            except Exception as e:
+                print("Flop report failed:", e)
+                self.master.after(0, lambda: self.result_label.config(text="Flop report failed."))
+                return
+            equity, nuts, ahead = report.overall()
+            ranked = report.sorted_records("left_equity")
+            text = f"Left {equity*100:.1f}% over all flops, nut share {nuts*100:.1f}%, ahead on {ahead*100:.0f}% of flops"
+            if ranked:
+                text += f" (best {ranked[0]['flop']}, worst {ranked[-1]['flop']})"
+            text += f". Wrote {REPORT_FILE}."
+            self.master.after(0, lambda: self.result_label.config(text=text))
+        threading.Thread(target=work, daemon=True).start()
+
+    def draw_distribution(self, left, right):
+        self.histogram.draw([("Left", "blue", left), ("Right", "red", right)])
+        self.result_label.config(
+            text=f"Left: {left.range_equity*100:.1f}% | Right: {right.range_equity*100:.1f}%"
+        )
@@ -0,0 +1,184 @@
+"""
+Made-hand and draw classes of every combo on a flop, turn or river.
+
+Each live combo gets one made-hand class (the best that applies, counting
+only hands the hole cards take part in, so a paired board alone is not
+"two pair") and a set of draw flags. Made hands come from evaluate_batch's
+category plus the board's rank counts; straight draws come from a 13-bit
+rank-mask table of the ranks that would complete a straight. A whole board
+is classified in one vectorized pass over the 1,326 combos and cached per
+suit isomorphic board, so a range composition is a weighted bincount.
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+from fast_eval import card_to_int, tables
+from evaluators import evaluate_batch
+from combos import COMBOS, NUM_COMBOS, dead_combo_mask, canonical_board, combo_perm_map
+
+MAX_CACHED_BOARDS = 128
+
+MADE_CLASSES = ["Straight flush", "Quads", "Full house", "Flush", "Straight", "Set", "Trips",
+                "Two pair", "Overpair", "Top pair", "Underpair", "Second pair", "Weak pair", "Ace high",
+                "No made hand"]
+(STRAIGHT_FLUSH, QUADS, FULL_HOUSE, FLUSH, STRAIGHT, SET, TRIPS, TWO_PAIR, OVERPAIR, TOP_PAIR,
+ UNDERPAIR, SECOND_PAIR, WEAK_PAIR, ACE_HIGH, NOTHING) = range(len(MADE_CLASSES))
+# fast_eval score categories 4 (straight) .. 8 (straight flush).
+_CATEGORY_CLASS = {8: STRAIGHT_FLUSH, 7: QUADS, 6: FULL_HOUSE, 5: FLUSH, 4: STRAIGHT}
+
+FLUSH_DRAW, STRAIGHT_DRAW, GUTSHOT, BACKDOOR_FLUSH_DRAW, OVERCARDS = 1, 2, 4, 8, 16
+DRAWS = [(FLUSH_DRAW, "Flush draw"), (STRAIGHT_DRAW, "Open-ended straight draw"),
+         (GUTSHOT, "Gutshot"), (BACKDOOR_FLUSH_DRAW, "Backdoor flush draw"), (OVERCARDS, "Overcards")]
+
+# -------------- Rank-mask tables --------------
+
+STRAIGHT_OUTS = OUT_COUNT = None
+
+def draw_tables():
+    """
+    (STRAIGHT_OUTS, OUT_COUNT): per 13-bit rank mask, the mask of ranks
+    that would make a straight, and the number of bits of every mask.
+    """
+    global STRAIGHT_OUTS, OUT_COUNT
+    if STRAIGHT_OUTS is None:
+        _, straight, _ = tables()
+        masks = np.arange(1 << 13)
+        outs = np.zeros(1 << 13, dtype=np.int64)
+        for r in range(13):
+            with_r = masks | (1 << r)
+            outs |= np.where((with_r != masks) & (straight[with_r] != 0), 1 << r, 0)
+        count = np.zeros(1 << 13, dtype=np.int64)
+        for r in range(13):
+            count += (masks >> r) & 1
+        STRAIGHT_OUTS, OUT_COUNT = outs, count
+    return STRAIGHT_OUTS, OUT_COUNT
+
+# -------------- Classification --------------
+
+class BoardClasses:
+    """
+    made: (1326,) int8 MADE_CLASSES index per combo, -1 for combos
+    blocked by the board; draws: (1326,) uint8 DRAWS flags.
+    """
+    def __init__(self, made, draws):
+        self.made = made
+        self.draws = draws
+        self.live = made >= 0
+
+    def remapped(self, mapping):
+        """The classes in the caller's suits, given combo_perm_map(perm)."""
+        return BoardClasses(self.made[mapping], self.draws[mapping])
+
+    def composition(self, weights):
+        """
+        ({made class: fraction}, {draw: fraction}) of a combo weight vector,
+        over its combos not blocked by the board. Classes with no weight
+        are left out.
+        """
+        w = np.where(self.live, np.asarray(weights, dtype=float), 0.0)
+        total = w.sum()
+        if total <= 0:
+            return {}, {}
+        sums = np.bincount(np.where(self.live, self.made, 0), weights=w, minlength=len(MADE_CLASSES))
+        made = {MADE_CLASSES[k]: float(sums[k] / total) for k in range(len(MADE_CLASSES)) if sums[k] > 0}
+        draws = {}
+        for flag, label in DRAWS:
+            share = float(w[(self.draws & flag) != 0].sum() / total)
+            if share > 0:
+                draws[label] = share
+        return made, draws
+
+def classify_board(board_ints):
+    """BoardClasses for a 3-5 card board of integer cards."""
+    board = np.array(board_ints, dtype=np.int64)
+    live = ~dead_combo_mask(board_ints)
+    made = np.full(NUM_COMBOS, -1, dtype=np.int8)
+    draws = np.zeros(NUM_COMBOS, dtype=np.uint8)
+    idx = np.flatnonzero(live)
+    cards = COMBOS[idx]
+    scores = evaluate_batch(np.concatenate([cards, np.tile(board, (len(idx), 1))], axis=1))
+    category = scores >> 20
+
+    ranks = cards >> 2
+    hi, lo = ranks.max(axis=1), ranks.min(axis=1)
+    pocket = hi == lo
+    board_ranks = board >> 2
+    on_board = np.bincount(board_ranks, minlength=13)
+    # Distinct board ranks above each rank (0 for the top board card).
+    above = np.array([np.count_nonzero((on_board > 0) & (np.arange(13) > r)) for r in range(13)])
+    top_board = board_ranks.max()
+
+    cls = np.where(hi == 12, ACE_HIGH, NOTHING)
+    # One hole card pairing the board: position of the better one.
+    pos = np.minimum(np.where(on_board[hi] == 1, above[hi], 99), np.where(on_board[lo] == 1, above[lo], 99))
+    pos = np.where(pocket, 99, pos)
+    pair_cls = np.where(pos == 0, TOP_PAIR, np.where(pos == 1, SECOND_PAIR, WEAK_PAIR))
+    cls = np.where(pos < 99, pair_cls, cls)
+    # Pocket pairs not on the board rank against the top board card only.
+    cls = np.where(pocket & (on_board[hi] == 0), np.where(hi > top_board, OVERPAIR, UNDERPAIR), cls)
+    cls = np.where(~pocket & (on_board[hi] >= 1) & (on_board[lo] >= 1), TWO_PAIR, cls)
+    cls = np.where(~pocket & ((on_board[hi] >= 2) | (on_board[lo] >= 2)), TRIPS, cls)
+    cls = np.where(pocket & (on_board[hi] == 1), SET, cls)
+    # A straight or better made by the board alone is every combo's hand;
+    # only credit the category to combos that improve on the board.
+    if len(board_ints) == 5:
+        beats_board = scores > evaluate_batch(board[None])[0]
+    else:
+        beats_board = category > (7 if on_board.max() == 4 else 0)
+    for cat, made_cls in _CATEGORY_CLASS.items():
+        cls = np.where(beats_board & (category == cat), made_cls, cls)
+    made[idx] = cls
+
+    if len(board_ints) < 5:
+        outs_table, out_count = draw_tables()
+        board_mask = np.bitwise_or.reduce(1 << board_ranks)
+        hand_mask = board_mask | (1 << hi) | (1 << lo)
+        # Ranks that complete a straight through the hole cards, not the board alone.
+        outs = out_count[outs_table[hand_mask] & ~outs_table[board_mask]]
+        no_straight = category < 4
+        flags = np.where(no_straight & (outs >= 2), STRAIGHT_DRAW, 0)
+        flags |= np.where(no_straight & (outs == 1), GUTSHOT, 0)
+        board_suits = np.bincount(board & 3, minlength=4)
+        suits = cards & 3
+        suited = np.zeros(len(idx), dtype=np.int64)
+        for side in (0, 1):
+            s = suits[:, side]
+            suited = np.maximum(suited, board_suits[s] + (suits == s[:, None]).sum(axis=1))
+        flags |= np.where((category < 5) & (suited == 4), FLUSH_DRAW, 0)
+        if len(board_ints) == 3:
+            flags |= np.where(suited == 3, BACKDOOR_FLUSH_DRAW, 0)
+        flags |= np.where(((cls == ACE_HIGH) | (cls == NOTHING)) & (lo > top_board), OVERCARDS, 0)
+        draws[idx] = flags
+    return BoardClasses(made, draws)
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def board_classes(board):
+    """
+    BoardClasses in the caller's suits for a board of (rank, suit) or
+    integer cards, classified once per suit isomorphic board.
+    """
+    board_ints = [c if isinstance(c, (int, np.integer)) else card_to_int(c) for c in board]
+    if not 3 <= len(board_ints) <= 5:
+        raise ValueError("Hand classes need a flop, turn or river")
+    key, perm = canonical_board(board_ints)
+    with _cache_lock:
+        classes = _cache.get(key)
+        if classes is not None:
+            _cache.move_to_end(key)
+    if classes is None:
+        classes = classify_board(list(key))
+        with _cache_lock:
+            _cache[key] = classes
+            while len(_cache) > MAX_CACHED_BOARDS:
+                _cache.popitem(last=False)
+    return classes.remapped(combo_perm_map(tuple(perm)))
+
+def format_composition(made, draws):
+    """Multi-line text for a composition, strongest classes first."""
+    lines = [f"{label}: {share*100:.1f}%" for label, share in made.items()]
+    if draws:
+        lines.append("Draws: " + ", ".join(f"{label} {share*100:.1f}%" for label, share in draws.items()))
+    return "\n".join(lines)
@@ -1,7 +1,27 @@
 import sqlite3
+import threading
 import random
 from poker import rank_char_to_int, generate_deck
 
+RANKS = ['A','K','Q','J','T','9','8','7','6','5','4','3','2']
+
+def grid_hand_cats(ranks=RANKS):
+    """
+    Returns {(row, col): hand_cat} for the 13x13 grid. Pairs sit on the
+    diagonal, suited hands above it and offsuit hands below it.
+    """
+    cats = {}
+    for i, r1 in enumerate(ranks):
+        for j, r2 in enumerate(ranks):
+            if i == j:
+                hand_cat = r1 * 2
+            else:
+                high = ranks[min(i,j)]
+                low = ranks[max(i,j)]
+                hand_cat = high + low + ('s' if i < j else 'o')
+            cats[(i,j)] = hand_cat
+    return cats
+
 def get_valid_hand(hand_cat, forbidden):
     suits = ['h', 'd', 'c', 's']
     if len(hand_cat) == 2:
@@ -43,48 +63,59 @@ def hand_weight(hand_cat):
     return 0
 
 _static_hand_rankings = None
+_preflop_table = None
+# Guards the lazy loads below; the GUI warms them up on a background thread.
+_load_lock = threading.RLock()
 
 def load_static_hand_rankings():
     """
     Loads the average 'true' equity for every canonical hand from preflop_equities.db.
     """
     global _static_hand_rankings
-    _static_hand_rankings = {}
-    try:
-        conn = sqlite3.connect("preflop_equities.db")
-        c = conn.cursor()
-        ranks = ['A','K','Q','J','T','9','8','7','6','5','4','3','2']
-        canonical_hands = []
-        for i, r1 in enumerate(ranks):
-            for j, r2 in enumerate(ranks):
-                if i == j:
-                    hand_cat = r1 * 2
-                elif i < j:
-                    hand_cat = r1 + r2 + 's'
-                else:
-                    hand_cat = r1 + r2 + 'o'
-                if hand_cat not in canonical_hands:
-                    canonical_hands.append(hand_cat)
-        for hand in canonical_hands:
-            c.execute("SELECT true FROM preflop_equities WHERE user_hand=?", (hand,))
-            rows = c.fetchall()
-            if rows and len(rows) > 0:
-                avg_equity = sum(row[0] for row in rows) / len(rows)
-                _static_hand_rankings[hand] = avg_equity
-            else:
-                _static_hand_rankings[hand] = 0.0
-        conn.close()
-    except Exception as e:
-        print("Error loading static hand rankings:", e)
-        for hand in canonical_hands:
-            _static_hand_rankings[hand] = 0.0
-    return _static_hand_rankings
+    with _load_lock:
+        if _static_hand_rankings is not None:
+            return _static_hand_rankings
+        rankings = {hand: 0.0 for hand in grid_hand_cats().values()}
+        try:
+            conn = sqlite3.connect("preflop_equities.db")
+            c = conn.cursor()
+            c.execute("SELECT user_hand, AVG(true) FROM preflop_equities GROUP BY user_hand")
+            for hand, avg_equity in c.fetchall():
+                if hand in rankings:
+                    rankings[hand] = avg_equity
+            conn.close()
+        except Exception as e:
+            print("Error loading static hand rankings:", e)
+        _static_hand_rankings = rankings
+        return rankings
+
+def load_preflop_table():
+    """
+    Loads the whole preflop_equities table in one query, as
+    {(user_hand, opp_hand): (win, tie, true)}.
+    """
+    global _preflop_table
+    with _load_lock:
+        if _preflop_table is not None:
+            return _preflop_table
+        table = {}
+        try:
+            conn = sqlite3.connect("preflop_equities.db")
+            c = conn.cursor()
+            c.execute("SELECT user_hand, opp_hand, win, tie, true FROM preflop_equities")
+            for user_hand, opp_hand, win, tie, true_eq in c.fetchall():
+                table[(user_hand, opp_hand)] = (win, tie, true_eq)
+            conn.close()
+        except Exception as e:
+            print("Error loading preflop table:", e)
+        _preflop_table = table
+        return table
 
 def static_hand_rank(hand_cat):
-    global _static_hand_rankings
-    if _static_hand_rankings is None:
-        load_static_hand_rankings()
-    return _static_hand_rankings.get(hand_cat, 0.0)
+    rankings = _static_hand_rankings
+    if rankings is None:
+        rankings = load_static_hand_rankings()
+    return rankings.get(hand_cat, 0.0)
 
 def canonicalize_hand(hand):
     rank_letter = {14:'A', 13:'K', 12:'Q', 11:'J', 10:'T',
@@ -108,24 +139,18 @@ def equity_to_color(equity):
     g = int(255 * equity)
     return f'#{r:02x}{g:02x}00'
 
-def select_cells_by_percent(cells, lower_pct, upper_pct):
-    items = []
-    total_w = 0
-    for pos, data in cells.items():
-        w = hand_weight(data["hand_cat"])
-        total_w += w
-        sr = static_hand_rank(data["hand_cat"])
-        items.append((pos, sr, w))
-    items.sort(key=lambda x: x[1], reverse=True)
-    selected = set()
-    cum = 0
-    for pos, sr, w in items:
-        prev = cum
-        cum += w
-        if prev < total_w * lower_pct and cum > total_w * lower_pct:
-            selected.add(pos)
-        elif prev >= total_w * lower_pct and cum <= total_w * upper_pct:
-            selected.add(pos)
-        elif prev < total_w * upper_pct and cum >= total_w * upper_pct:
-            selected.add(pos)
-    return selected
+def ev_to_color(ev, scale):
+    """Red for losing, green for winning; +-scale (e.g. the pot) saturates."""
+    return equity_to_color(0.5 + ev / (2 * scale)) if scale > 0 else equity_to_color(0.5)
+
+def select_cells_by_percent(cells, lower_pct, upper_pct, ordering="preflop", ranking=None):
+    """
+    Selects the grid cells whose cumulative combo weight, strongest first,
+    overlaps [lower_pct, upper_pct]. Uses the precomputed range index for
+    the given ordering key (see range_index); passing a board ranking
+    (board_rank.BoardRanking) ranks hands on that board instead.
+    """
+    from range_index import get_range_index, board_ordering
+    if ranking is not None:
+        ordering = board_ordering(ranking)
+    return get_range_index(ordering).select(lower_pct, upper_pct).intersection(cells)
@@ -0,0 +1,43 @@
+import tkinter as tk
+
+class EquityHistogram:
+    """
+    Bar chart of one or more equity_dist.EquityDistribution objects drawn
+    side by side per equity bucket, with a summary line per distribution.
+    """
+    def __init__(self, parent, width=520, height=170):
+        self.width = width
+        self.height = height
+        self.canvas = tk.Canvas(parent, width=width, height=height, bg="white",
+                                highlightthickness=0)
+
+    def draw(self, series):
+        """series: list of (label, colour, EquityDistribution)."""
+        c = self.canvas
+        c.delete("all")
+        if not series:
+            return
+        left, right, top = 30, self.width - 10, 10
+        bottom = self.height - 20 - 14 * len(series)
+        n_buckets = len(series[0][2].buckets)
+        peak = max(max(d.buckets) for _, _, d in series) or 1.0
+        slot = (right - left) / n_buckets
+        bar = slot / (len(series) + 1)
+        c.create_line(left, bottom, right, bottom)
+        for b in range(n_buckets + 1):
+            if b % (n_buckets // 4 or 1) == 0:
+                x = left + b * slot
+                c.create_text(x, bottom + 8, text=f"{b * 100 // n_buckets}%", font=("TkDefaultFont", 7))
+        for s, (label, colour, dist) in enumerate(series):
+            for b, frac in enumerate(dist.buckets):
+                if frac <= 0:
+                    continue
+                x0 = left + b * slot + (s + 0.5) * bar
+                y0 = bottom - (bottom - top) * frac / peak
+                c.create_rectangle(x0, y0, x0 + bar, bottom, fill=colour, outline="")
+            p = dist.percentiles
+            text = (f"{label}: equity {dist.range_equity*100:.1f}% | p25 {p[25]*100:.0f}% "
+                    f"p50 {p[50]*100:.0f}% p75 {p[75]*100:.0f}% | "
+                    f"nuts {dist.nut_fraction*100:.1f}% air {dist.air_fraction*100:.1f}%")
+            c.create_text(left, bottom + 20 + 14 * s, text=text, anchor="w", fill=colour,
+                          font=("TkDefaultFont", 8))
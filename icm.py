@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Tournament equity ($EV) under the Independent Chip Model.
+
+ICM (Malmuth-Harville) gives each player first place with probability
+stack / total chips, then the next place among those left in proportion
+to their stacks. Summing over finishing orders is factorial in the number
+of players; the probability of each set of players having taken the top
+places only depends on the set, so a memoized DP over subsets (one layer
+per paid place) is exact in O(sum of C(n, k), k < places) states. Fields
+whose DP would exceed EXACT_STATES are sampled instead: ordering players
+by Exponential(1) / stack draws finishing orders with exactly the
+Harville probabilities, SAMPLES orders at a time in NumPy.
+
+Results are cached by the stacks and payouts normalized to fractions of
+their totals (sorted, 4 significant digits): in memory for the session,
+and in CACHE_FILE for sampled fields and for the stack configurations
+written by precompute(), so repeated queries are lookups.
+
+Decisions combine ICM with an all-in equity: call_decision() and
+shove_decision() give the $EV of the action and of folding, and the equity
+the action needs under ICM and in chips.
+
+    python icm.py equity --stacks 5000,3000,2000 --payouts 50,30,20
+    python icm.py call --stacks 20,15,10,5 --payouts 50,30,20 --hand AhKd --range "22+,A2s+,KTs+" --pot 1.5
+    python icm.py precompute --payouts 50,30,20 --players 3-9
+"""
+
+import sys
+import math
+import sqlite3
+import argparse
+import itertools
+import threading
+from collections import OrderedDict
+import numpy as np
+
+CACHE_FILE = "icm_cache.db"
+# Subset states solved exactly before switching to sampling.
+EXACT_STATES = 50000
+SAMPLES = 200000
+SAMPLE_CHUNK = 20000
+MAX_CACHED = 4096
+KEY_DIGITS = 4
+# Stack sizes (in big blinds) of the precomputed configurations.
+COMMON_LEVELS = (5, 10, 15, 20, 25, 30, 40, 50)
+
+# -------------- Finishing probabilities --------------
+
+def exact_states(players, places):
+    return sum(math.comb(players, k) for k in range(min(places, players)))
+
+def place_probabilities_exact(stacks, places):
+    """
+    (n, places) probability of each player finishing in each paid place,
+    by the subset DP: layer k maps the set of players holding places
+    1..k to (probability, their chips).
+    """
+    stacks = [float(s) for s in stacks]
+    n = len(stacks)
+    total = sum(stacks)
+    probs = np.zeros((n, places))
+    layer = {0: (1.0, 0.0)}
+    for k in range(min(places, n)):
+        nxt = {}
+        for mask, (p, taken) in layer.items():
+            left = total - taken
+            if left <= 0:
+                continue
+            for i in range(n):
+                if mask >> i & 1 or stacks[i] <= 0:
+                    continue
+                q = p * stacks[i] / left
+                probs[i, k] += q
+                if k + 1 < places:
+                    m = mask | 1 << i
+                    prev = nxt.get(m)
+                    nxt[m] = (q + prev[0], prev[1]) if prev else (q, taken + stacks[i])
+        layer = nxt
+    return probs
+
+def place_probabilities_sampled(stacks, places, samples=SAMPLES, rng=None):
+    """Monte Carlo estimate of place_probabilities_exact."""
+    rng = rng or np.random.default_rng()
+    stacks = np.asarray(stacks, dtype=float)
+    n = len(stacks)
+    counts = np.zeros((n, places))
+    live = stacks > 0
+    done = 0
+    while done < samples:
+        k = min(SAMPLE_CHUNK, samples - done)
+        keys = np.where(live, rng.exponential(size=(k, n)) / np.where(live, stacks, 1.0), np.inf)
+        order = np.argsort(keys, axis=1)[:, :places]
+        for place in range(min(places, int(live.sum()))):
+            counts[:, place] += np.bincount(order[:, place], minlength=n)
+        done += k
+    return counts / samples
+
+def place_probabilities(stacks, places, samples=SAMPLES, rng=None):
+    if exact_states(len(stacks), places) <= EXACT_STATES:
+        return place_probabilities_exact(stacks, places)
+    return place_probabilities_sampled(stacks, places, samples, rng)
+
+def _equity_uncached(stacks, payouts, samples=SAMPLES, rng=None):
+    """$EV per player; busted players (no chips) share the places below the live ones."""
+    stacks = np.asarray(stacks, dtype=float)
+    n = len(stacks)
+    pay = np.zeros(n)
+    paid = np.asarray(payouts, dtype=float)[:n]
+    pay[:len(paid)] = paid
+    live = stacks > 0
+    alive = int(live.sum())
+    equity = np.zeros(n)
+    places = min(alive, len(paid))
+    if places:
+        probs = place_probabilities(stacks[live], places, samples, rng)
+        equity[live] = probs @ pay[:places]
+    if alive < n:
+        equity[~live] = pay[alive:].mean()
+    return equity
+
+# -------------- Cache --------------
+
+def normalize(values):
+    """Values as fractions of their total, to KEY_DIGITS significant digits."""
+    values = np.asarray(values, dtype=float)
+    total = values.sum()
+    return tuple(float(f"{v / total:.{KEY_DIGITS}g}") if total > 0 else 0.0 for v in values)
+
+def cache_key(stacks, payouts):
+    """(key text, order): stacks sorted largest first, then the payouts."""
+    order = np.argsort(-np.asarray(stacks, dtype=float), kind="stable")
+    s = normalize(np.asarray(stacks, dtype=float)[order])
+    p = normalize([x for x in payouts if x > 0])
+    return ",".join(map(repr, s)) + "|" + ",".join(map(repr, p)), order
+
+class ICMCache:
+    """Pool fractions per sorted seat, by cache_key, in SQLite."""
+    def __init__(self, path=CACHE_FILE):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS icm (key TEXT PRIMARY KEY, equity TEXT, exact INTEGER)")
+        self.conn.commit()
+
+    def lookup(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT equity FROM icm WHERE key=?", (key,)).fetchone()
+        return np.array([float(x) for x in row[0].split(",")]) if row else None
+
+    def add_many(self, entries):
+        """Stores (key, pool fractions, exact) entries."""
+        with self.lock:
+            self.conn.executemany("INSERT OR REPLACE INTO icm VALUES (?, ?, ?)",
+                                  [(key, ",".join(repr(float(x)) for x in eq), int(exact))
+                                   for key, eq, exact in entries])
+            self.conn.commit()
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+_disk = None
+_disk_lock = threading.Lock()
+
+def get_cache():
+    """The shared ICMCache on CACHE_FILE, opened on first use."""
+    global _disk
+    with _disk_lock:
+        if _disk is None:
+            _disk = ICMCache()
+        return _disk
+
+def icm_equity(stacks, payouts, samples=SAMPLES, rng=None, cache=True):
+    """
+    $EV of every player for the given stacks and payouts (first place
+    first), in the payouts' units.
+    """
+    payouts = [float(x) for x in payouts if x > 0]
+    pool = sum(payouts)
+    if not cache:
+        return _equity_uncached(stacks, payouts, samples, rng)
+    key, order = cache_key(stacks, payouts)
+    with _memory_lock:
+        fractions = _memory.get(key)
+        if fractions is not None:
+            _memory.move_to_end(key)
+    if fractions is None:
+        sorted_stacks = [float(x) for x in key.split("|")[0].split(",")]
+        fractions = get_cache().lookup(key)
+        if fractions is None:
+            norm_pay = [float(x) for x in key.split("|")[1].split(",")]
+            fractions = _equity_uncached(sorted_stacks, norm_pay, samples, rng)
+            exact = exact_states(sum(s > 0 for s in sorted_stacks), len(norm_pay)) <= EXACT_STATES
+            if not exact:
+                get_cache().add_many([(key, fractions, False)])
+        with _memory_lock:
+            _memory[key] = fractions
+            while len(_memory) > MAX_CACHED:
+                _memory.popitem(last=False)
+    equity = np.empty(len(order))
+    equity[order] = fractions * pool
+    return equity
+
+def common_configs(players, levels=COMMON_LEVELS):
+    """Every multiset of players stacks drawn from levels, largest first."""
+    return [tuple(reversed(c)) for c in itertools.combinations_with_replacement(levels, players)]
+
+def precompute(configs, payouts, samples=SAMPLES):
+    """Solves and stores each stack configuration; returns how many were new."""
+    cache = get_cache()
+    entries = []
+    seen = set()
+    stored = 0
+    for stacks in configs:
+        key, _ = cache_key(stacks, payouts)
+        if key in seen or cache.lookup(key) is not None:
+            continue
+        seen.add(key)
+        sorted_stacks = [float(x) for x in key.split("|")[0].split(",")]
+        norm_pay = [float(x) for x in key.split("|")[1].split(",")]
+        fractions = _equity_uncached(sorted_stacks, norm_pay, samples)
+        entries.append((key, fractions, exact_states(len(sorted_stacks), len(norm_pay)) <= EXACT_STATES))
+        if len(entries) >= 1000:
+            cache.add_many(entries)
+            stored += len(entries)
+            entries = []
+    if entries:
+        cache.add_many(entries)
+    return stored + len(entries)
+
+# -------------- Decisions --------------
+
+class ICMDecision:
+    """
+    ev_action / ev_fold: hero's $EV (or chips, for the chip_ fields) of
+    the action and of folding; required: the all-in equity at which the
+    action breaks even (None if it never does, 0 if it always gains).
+    """
+    def __init__(self, action, ev_action, ev_fold, required, chip_required):
+        self.action = action
+        self.ev_action = ev_action
+        self.ev_fold = ev_fold
+        self.required = required
+        self.chip_required = chip_required
+
+    def gain(self):
+        return self.ev_action - self.ev_fold
+
+    def profitable(self):
+        return self.gain() > 0
+
+def _allin_stacks(stacks, hero, villain, pot):
+    """
+    Stacks after hero and villain get all in: (hero wins, villain wins,
+    split) for chips behind stacks and pot already in the middle.
+    """
+    stacks = np.asarray(stacks, dtype=float)
+    risk = min(stacks[hero], stacks[villain])
+    win, lose, split = stacks.copy(), stacks.copy(), stacks.copy()
+    win[hero] += risk + pot
+    win[villain] -= risk
+    lose[hero] -= risk
+    lose[villain] += risk + pot
+    split[hero] += pot / 2
+    split[villain] += pot / 2
+    return win, lose, split
+
+def _break_even(fold, win, lose, rest=0.0, weight=1.0):
+    """Equity e with rest + weight * (e * win + (1 - e) * lose) = fold, clipped to [0, 1]."""
+    if weight <= 0 or win <= lose:
+        return None if rest < fold else 0.0
+    e = ((fold - rest) / weight - lose) / (win - lose)
+    return None if e > 1 else max(e, 0.0)
+
+def _decide(action, values, stacks, hero, villain, pot, win_p, tie_p, call_prob):
+    outcomes = _allin_stacks(stacks, hero, villain, pot)
+    w, l, t = (values(s)[hero] for s in outcomes)
+    allin = win_p * w + tie_p * t + (1 - win_p - tie_p) * l
+    folded = np.asarray(stacks, dtype=float).copy()
+    if action == "call":
+        folded[villain] += pot
+        fold = values(folded)[hero]
+        return allin, fold, _break_even(fold, w, l)
+    stolen = folded.copy()
+    stolen[hero] += pot
+    folded[villain] += pot
+    fold = values(folded)[hero]
+    steal = values(stolen)[hero]
+    ev = (1 - call_prob) * steal + call_prob * allin
+    return ev, fold, _break_even(fold, w, l, (1 - call_prob) * steal, call_prob)
+
+def _chips(stacks):
+    return np.asarray(stacks, dtype=float)
+
+def call_decision(stacks, payouts, hero, villain, pot, win, tie=0.0):
+    """
+    Hero calls villain's all-in. stacks are every player's chips behind
+    (villain's shove not yet in), pot the chips already in the middle;
+    folding gives the pot to villain. win/tie: hero's all-in equity.
+    """
+    values = lambda s: icm_equity(s, payouts)
+    ev, fold, required = _decide("call", values, stacks, hero, villain, pot, win, tie, 1.0)
+    _, _, chip_required = _decide("call", _chips, stacks, hero, villain, pot, win, tie, 1.0)
+    return ICMDecision("call", ev, fold, required, chip_required)
+
+def shove_decision(stacks, payouts, hero, villain, pot, call_prob, win, tie=0.0):
+    """
+    Hero shoves; villain calls with probability call_prob, and hero's
+    equity when called is win/tie. Folding gives the pot to villain.
+    """
+    values = lambda s: icm_equity(s, payouts)
+    ev, fold, required = _decide("shove", values, stacks, hero, villain, pot, win, tie, call_prob)
+    _, _, chip_required = _decide("shove", _chips, stacks, hero, villain, pot, win, tie, call_prob)
+    return ICMDecision("shove", ev, fold, required, chip_required)
+
+def format_decision(d):
+    def pct(x):
+        return "never" if x is None else f"{x*100:.1f}%"
+    verb = "Call" if d.action == "call" else "Shove"
+    return (f"ICM: {verb} ${d.ev_action:.2f} vs fold ${d.ev_fold:.2f} ({d.gain():+.2f})\n"
+            f"Equity needed: {pct(d.required)} ICM, {pct(d.chip_required)} chip EV")
+
+# -------------- Command line --------------
+
+def _numbers(text):
+    return [float(x) for x in text.replace(" ", "").split(",") if x]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ICM tournament equity and all-in decisions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("equity", help="$EV of every player")
+    p.add_argument("--stacks", required=True, help="comma separated chip counts")
+    for name in ("call", "shove"):
+        p = sub.add_parser(name, help=f"$EV of {name}ing all in (hero is the first stack, villain the second)")
+        p.add_argument("--stacks", required=True, help="chips behind, hero first, villain second")
+        p.add_argument("--pot", type=float, default=0.0, help="chips already in the middle")
+        p.add_argument("--hand", required=True, help="hero's hand, e.g. AhKd")
+        p.add_argument("--range", required=True, help="villain's shoving (call) or calling (shove) range")
+        p.add_argument("--board", default="")
+    p = sub.add_parser("precompute", help=f"store every configuration of {COMMON_LEVELS} bb stacks")
+    p.add_argument("--players", default="3-9", help="player counts, e.g. 3-9")
+    for p in sub.choices.values():
+        p.add_argument("--payouts", required=True, help="comma separated prizes, first place first")
+    args = parser.parse_args(argv)
+
+    payouts = _numbers(args.payouts)
+    if args.command == "precompute":
+        low, _, high = args.players.partition("-")
+        total = 0
+        for n in range(int(low), int(high or low) + 1):
+            total += precompute(common_configs(n), payouts)
+            print(f"{n} players done")
+        print(f"Stored {total} configurations in {CACHE_FILE}.")
+        return
+    stacks = _numbers(args.stacks)
+    if args.command == "equity":
+        for k, (s, eq) in enumerate(zip(stacks, icm_equity(stacks, payouts))):
+            print(f"Player {k + 1}: {s:g} chips -> ${eq:.2f}")
+        return
+
+    from poker import parse_board
+    from fast_eval import card_to_int
+    from combos import COMBOS, dead_combo_mask
+    from range_parser import compile_range
+    from range_equity import range_vs_range
+    board = parse_board(args.board)
+    hero_w = compile_range(args.hand)
+    villain_w = compile_range(args.range)
+    win, tie, _ = range_vs_range(hero_w, villain_w, board, num_simulations=2000)
+    if args.command == "call":
+        d = call_decision(stacks, payouts, 0, 1, args.pot, win, tie)
+    else:
+        # Villain holds a random hand that does not block hero's cards or the board.
+        hero_cards = set(COMBOS[np.asarray(hero_w) > 0].ravel().tolist())
+        dead = dead_combo_mask([card_to_int(c) for c in board] + sorted(hero_cards))
+        call_prob = float(np.asarray(villain_w)[~dead].sum() / (~dead).sum())
+        d = shove_decision(stacks, payouts, 0, 1, args.pot, call_prob, win, tie)
+        print(f"Villain calls {call_prob*100:.1f}% of hands")
+    print(f"Equity when all in: {(win + tie / 2)*100:.1f}%")
+    print(format_decision(d))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
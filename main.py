@@ -1,24 +1,46 @@
 #!/usr/bin/env python3
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk
 from gui_equity import EquityGUI
-from gui_range import RangeComparisonTab
+from warmup import start_warmup
+
+def main(benchmark=False):
+    start = time.perf_counter()
+    marks = {}
+
+    def mark(name):
+        if name not in marks:
+            marks[name] = time.perf_counter() - start
+        if benchmark and {"first_frame", "first_grid", "tables_ready"} <= marks.keys():
+            for key in ("first_frame", "first_grid", "tables_ready"):
+                print(f"time_to_{key}: {marks[key]*1000:.1f} ms")
+            root.after(0, root.destroy)
 
-def main():
     root = tk.Tk()
     root.title("Texas Hold'em Equity & Range Comparator")
+    root.bind("<Map>", lambda e: mark("first_frame") if e.widget is root else None)
     notebook = ttk.Notebook(root)
     notebook.pack(fill=tk.BOTH, expand=True)
     
     frame1 = tk.Frame(notebook)
-    EquityGUI(frame1)
+    equity_tab = EquityGUI(frame1)
     notebook.add(frame1, text="Equity Calculator")
+    equity_tab.canvas.bind("<Map>", lambda e: mark("first_grid"), add="+")
     
+    # The Range Comparison tab is only built the first time it is shown.
     frame2 = tk.Frame(notebook)
-    RangeComparisonTab(frame2)
     notebook.add(frame2, text="Range Comparison")
-    
+    range_tab = []
+    def on_tab_changed(event):
+        if not range_tab and notebook.select() == str(frame2):
+            from gui_range import RangeComparisonTab
+            range_tab.append(RangeComparisonTab(frame2))
+    notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+
+    start_warmup(on_ready=lambda: root.after(0, lambda: mark("tables_ready")))
     root.mainloop()
 
 if __name__ == '__main__':
-    main()
+    main(benchmark="--benchmark" in sys.argv)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Bulk export of 169x169 category-vs-category equity matrices.
+
+For every requested board the win and tie probability of each category
+against each other (over compatible combo pairs and every runout) is
+computed with the fastest engine available: category_matchups' exact
+per-runout sums postflop, and combo_table (or the preflop DB) for an empty
+board. Boards are written CHUNK_BOARDS at a time to compressed .npz files
+in the output directory:
+
+    boards  (n, 5) int8   integer cards, -1 padded
+    win     (n, 169, 169) float32
+    tie     (n, 169, 169) float32
+    pairs   (n, 169, 169) float32  compatible combo pairs x runouts
+    categories (169,)              row/column order
+
+and index.jsonl gets one {"chunk": file, "boards": [...]} line per chunk
+once the file is complete. A rerun skips every board already in the index,
+so an interrupted export resumes where it stopped; only one chunk is held
+in memory however many boards are requested. Category matrices do not
+depend on suits, so boards are de-duplicated up to suit isomorphism.
+
+    python matrix_export.py --out flops --all-flops [--workers 4]
+    python matrix_export.py --out spots --boards boards.txt   # one board per line, "" for preflop
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+import itertools
+import multiprocessing as mp
+import numpy as np
+from fast_eval import card_to_int, int_to_card
+from combos import CATEGORIES, canonical_board
+from poker import parse_board
+from range_parser import RANK_CHARS
+
+CHUNK_BOARDS = 64
+INDEX_FILE = "index.jsonl"
+
+# -------------- Boards --------------
+
+def board_text(board_ints):
+    return "".join(RANK_CHARS[r] + s for r, s in (int_to_card(c) for c in board_ints))
+
+def board_key(board_ints):
+    """The same text for boards that differ only in card order or suits."""
+    return board_text(canonical_board(list(board_ints))[0])
+
+def isomorphic_boards(size):
+    """Sorted canonical boards of 3 (flops) or 4 (turns) cards, one per suit isomorphism class."""
+    flops = sorted({canonical_board(list(b))[0] for b in itertools.combinations(range(52), 3)})
+    if size == 3:
+        return flops
+    turns = set()
+    for flop in flops:
+        for card in range(52):
+            if card not in flop:
+                turns.add(canonical_board(list(flop) + [card])[0])
+    return sorted(turns)
+
+def read_boards(path):
+    """Integer boards from a file with one board per line (a blank line is preflop)."""
+    with open(path) as f:
+        for line in f:
+            yield tuple(card_to_int(c) for c in parse_board(line.strip()))
+
+# -------------- Matrices --------------
+
+def board_matrices(board_ints, samples=None):
+    """
+    (win, tie, pairs) float32 (169, 169) for one integer board: exact
+    unless samples caps the runouts.
+    """
+    if not board_ints:
+        from combo_table import load_combo_table
+        table = load_combo_table()
+        if table is not None:
+            win, tie, total = table.category_sums()
+        else:
+            from hand_helpers import load_preflop_table
+            from category_matchups import preflop_matchups
+            m = preflop_matchups(load_preflop_table())
+            win, tie, total = m.win, m.tie, m.total
+    else:
+        from category_matchups import postflop_matchups
+        board = [int_to_card(c) for c in board_ints]
+        runouts = math.comb(52 - len(board_ints), 5 - len(board_ints))
+        m = postflop_matchups(board, num_simulations=samples or runouts)
+        win, tie, total = m.win, m.tie, m.total
+    safe = np.maximum(total, 1)
+    return (win / safe).astype(np.float32), (tie / safe).astype(np.float32), total.astype(np.float32)
+
+def _task(args):
+    board, samples = args
+    return board, board_matrices(board, samples)
+
+# -------------- Output --------------
+
+def load_index(out_dir):
+    """(boards already exported, next chunk number)."""
+    done, chunks = set(), 0
+    path = os.path.join(out_dir, INDEX_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    done.update(board_key(card_to_int(c) for c in parse_board(text)) for text in entry["boards"])
+                    chunks += 1
+    return done, chunks
+
+def write_chunk(out_dir, number, rows):
+    """Writes one chunk file atomically, then records it in the index."""
+    name = f"chunk_{number:05d}.npz"
+    boards = np.full((len(rows), 5), -1, dtype=np.int8)
+    for k, (board, _) in enumerate(rows):
+        boards[k, :len(board)] = board
+    tmp = os.path.join(out_dir, name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez_compressed(f, boards=boards,
+                            win=np.stack([m[0] for _, m in rows]),
+                            tie=np.stack([m[1] for _, m in rows]),
+                            pairs=np.stack([m[2] for _, m in rows]),
+                            categories=np.array(CATEGORIES))
+    os.replace(tmp, os.path.join(out_dir, name))
+    with open(os.path.join(out_dir, INDEX_FILE), "a") as f:
+        f.write(json.dumps({"chunk": name, "boards": [board_text(b) for b, _ in rows]}) + "\n")
+
+def export(boards, out_dir, workers=0, samples=None, chunk_boards=CHUNK_BOARDS):
+    """Exports every board not yet in out_dir's index; returns boards written."""
+    os.makedirs(out_dir, exist_ok=True)
+    done, chunk = load_index(out_dir)
+    def todo():
+        for b in boards:
+            key = board_key(b)
+            if key not in done:
+                done.add(key)
+                yield b
+    rows = []
+    written = 0
+    pool = mp.get_context("spawn").Pool(workers) if workers > 0 else None
+    try:
+        tasks = ((b, samples) for b in todo())
+        results = pool.imap(_task, tasks) if pool is not None else map(_task, tasks)
+        for row in results:
+            rows.append(row)
+            if len(rows) == chunk_boards:
+                write_chunk(out_dir, chunk, rows)
+                chunk += 1
+                written += len(rows)
+                print(f"{written} boards written")
+                rows = []
+        if rows:
+            write_chunk(out_dir, chunk, rows)
+            written += len(rows)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return written
+
+# -------------- Command line --------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export 169x169 category equity matrices per board.")
+    parser.add_argument("--out", required=True, help="output directory")
+    which = parser.add_mutually_exclusive_group(required=True)
+    which.add_argument("--boards", help="file with one board per line")
+    which.add_argument("--all-flops", action="store_true", help="every suit isomorphic flop")
+    which.add_argument("--all-turns", action="store_true", help="every suit isomorphic turn")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 = this process)")
+    parser.add_argument("--samples", type=int, help="cap on runouts per board (default: all)")
+    parser.add_argument("--chunk-boards", type=int, default=CHUNK_BOARDS)
+    args = parser.parse_args(argv)
+
+    if args.boards:
+        boards = read_boards(args.boards)
+    else:
+        boards = isomorphic_boards(3 if args.all_flops else 4)
+    written = export(boards, args.out, args.workers, args.samples, args.chunk_boards)
+    print(f"Exported {written} boards to {args.out}.")
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,113 @@
+"""
+Pot-Limit Omaha evaluation and equity.
+
+An Omaha hand plays exactly two of its four hole cards with three board
+cards: 6 hole pairs x 10 board triples = 60 five-card hands. Each of them
+is split into a hole pair and a board triple. A rank-only score comes from
+one table indexed by the five ranks in base 13 (the pair and triple
+contribute separate parts of the index), and a flush is only possible
+when a suited hole pair meets a monotone triple of the same suit, scored
+from fast_eval's rank-mask tables. Runouts are scored as arrays of gathers,
+and scores order exactly like fast_eval.evaluate_batch.
+"""
+
+import math
+import itertools
+import numpy as np
+from fast_eval import card_to_int, tables
+from evaluators import evaluate_batch
+
+HOLE_CARDS = 4
+HOLE_PAIRS = np.array(list(itertools.combinations(range(HOLE_CARDS), 2)))
+BOARD_TRIPLES = np.array(list(itertools.combinations(range(5), 3)))
+# Rank-table entries evaluated per evaluate_batch call while building.
+BUILD_CHUNK = 65536
+
+RANK5 = FLUSH5 = None
+
+def omaha_tables():
+    """
+    (RANK5, FLUSH5): the non-flush score of every base-13 five-rank index
+    and the flush (or straight flush) score of every 13-bit rank mask.
+    """
+    global RANK5, FLUSH5
+    if RANK5 is None:
+        codes = np.arange(13 ** 5)
+        digits = np.stack([(codes // 13 ** k) % 13 for k in (4, 3, 2, 1, 0)], axis=1)
+        # Four suits over five cards: never a flush.
+        cards = digits * 4 + np.array([0, 1, 2, 3, 0])
+        rank5 = np.concatenate([evaluate_batch(cards[i:i + BUILD_CHUNK])
+                                for i in range(0, len(cards), BUILD_CHUNK)]).astype(np.int32)
+        _, straight, top = tables()
+        masks = np.arange(1 << 13)
+        flush5 = np.where(straight[masks] != 0, (8 << 20) | (straight[masks] << 16),
+                          (5 << 20) | top[5][masks]).astype(np.int32)
+        RANK5, FLUSH5 = rank5, flush5
+    return RANK5, FLUSH5
+
+def omaha_scores(holes, boards):
+    """
+    Scores of (N, 4) (or one (4,)) integer Omaha hands on (N, 5) integer
+    boards, as an (N,) array comparable with evaluate_batch scores.
+    """
+    rank5, flush5 = omaha_tables()
+    boards = np.asarray(boards, dtype=np.int64)
+    holes = np.broadcast_to(np.asarray(holes, dtype=np.int64), (len(boards), HOLE_CARDS))
+    hr, hs = holes >> 2, holes & 3
+    br, bs = boards >> 2, boards & 3
+    h0, h1 = HOLE_PAIRS[:, 0], HOLE_PAIRS[:, 1]
+    b0, b1, b2 = BOARD_TRIPLES[:, 0], BOARD_TRIPLES[:, 1], BOARD_TRIPLES[:, 2]
+    pair_code = hr[:, h0] * 13 ** 4 + hr[:, h1] * 13 ** 3
+    triple_code = br[:, b0] * 169 + br[:, b1] * 13 + br[:, b2]
+    scores = rank5[pair_code[:, :, None] + triple_code[:, None, :]]
+    pair_suit = np.where(hs[:, h0] == hs[:, h1], hs[:, h0], -1)
+    triple_suit = np.where((bs[:, b0] == bs[:, b1]) & (bs[:, b1] == bs[:, b2]), bs[:, b0], -2)
+    flush = pair_suit[:, :, None] == triple_suit[:, None, :]
+    if flush.any():
+        pair_mask = (1 << hr[:, h0]) | (1 << hr[:, h1])
+        triple_mask = (1 << br[:, b0]) | (1 << br[:, b1]) | (1 << br[:, b2])
+        scores = np.where(flush, flush5[pair_mask[:, :, None] | triple_mask[:, None, :]], scores)
+    return scores.max(axis=(1, 2))
+
+def _runouts(remaining, needed, num_simulations, rng):
+    """Every runout when there are at most num_simulations of them, else a sample."""
+    if needed == 0:
+        return np.empty((1, 0), np.int64)
+    if math.comb(len(remaining), needed) <= num_simulations:
+        combos = list(itertools.combinations(remaining, needed))
+        return np.array(combos, dtype=np.int64).reshape(len(combos), needed)
+    deck = np.array(remaining, dtype=np.int64)
+    return deck[rng.random((num_simulations, len(deck))).argsort(axis=1)[:, :needed]]
+
+def omaha_equity(hand1, hand2, board, num_simulations=5000, rng=None):
+    """(win, tie, equity) of Omaha hand1 vs hand2, like poker.compute_equity."""
+    rng = rng or np.random.default_rng()
+    h1 = [card_to_int(c) for c in hand1]
+    h2 = [card_to_int(c) for c in hand2]
+    b = [card_to_int(c) for c in board]
+    used = set(h1 + h2 + b)
+    remaining = [c for c in range(52) if c not in used]
+    runouts = _runouts(remaining, 5 - len(b), num_simulations, rng)
+    boards = np.concatenate([np.tile(np.array(b, dtype=np.int64), (len(runouts), 1)), runouts], axis=1)
+    s1 = omaha_scores(h1, boards)
+    s2 = omaha_scores(h2, boards)
+    win = float((s1 > s2).mean())
+    tie = float((s1 == s2).mean())
+    return (win, tie, win + tie / 2)
+
+def omaha_equity_vs_random(hand, board, num_simulations=5000, rng=None):
+    """(win, tie, equity) of an Omaha hand against a random four-card hand."""
+    rng = rng or np.random.default_rng()
+    h = [card_to_int(c) for c in hand]
+    b = [card_to_int(c) for c in board]
+    used = set(h + b)
+    deck = np.array([c for c in range(52) if c not in used], dtype=np.int64)
+    needed = 5 - len(b)
+    dealt = deck[rng.random((num_simulations, len(deck))).argsort(axis=1)[:, :HOLE_CARDS + needed]]
+    boards = np.concatenate([np.tile(np.array(b, dtype=np.int64), (num_simulations, 1)),
+                             dealt[:, HOLE_CARDS:]], axis=1)
+    s1 = omaha_scores(h, boards)
+    s2 = omaha_scores(dealt[:, :HOLE_CARDS], boards)
+    win = float((s1 > s2).mean())
+    tie = float((s1 == s2).mean())
+    return (win, tie, win + tie / 2)
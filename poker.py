@@ -1,5 +1,5 @@
 import itertools, random
-from collections import Counter
+from evaluators import evaluate_five, evaluate_seven, evaluate_cards
 
 def rank_char_to_int(ch):
     mapping = {'2':2, '3':3, '4':4, '5':5, '6':6,
@@ -20,10 +20,12 @@ def parse_card(card_str):
         raise ValueError("Invalid suit: " + suit)
     return (rank, suit)
 
-def parse_hand(hand_str):
+def parse_hand(hand_str, game="holdem"):
     hand_str = hand_str.strip()
     if not hand_str:
         return None
+    if game == "plo":
+        return parse_omaha_hand(hand_str)
     if " " in hand_str:
         parts = hand_str.split()
         if len(parts) != 2:
@@ -49,6 +51,14 @@ def parse_hand(hand_str):
         else:
             raise ValueError("Invalid hand format: " + hand_str)
 
+def parse_omaha_hand(hand_str):
+    cards = parse_board(hand_str)
+    if len(cards) != 4:
+        raise ValueError("Please supply exactly four cards for an Omaha hand.")
+    if len(set(cards)) != 4:
+        raise ValueError("Duplicate card in hand: " + hand_str)
+    return cards
+
 def parse_board(board_str):
     board_str = board_str.strip()
     if not board_str:
@@ -66,60 +76,9 @@ def generate_deck():
     suits = ['h', 'd', 'c', 's']
     return [(r, s) for r in ranks for s in suits]
 
-def evaluate_five(cards):
-    ranks = sorted((c[0] for c in cards), reverse=True)
-    suits = [c[1] for c in cards]
-    flush = (len(set(suits)) == 1)
-    counts = Counter(ranks)
-    freq = sorted(counts.values(), reverse=True)
-    unique_ranks = sorted(counts.keys(), reverse=True)
-    straight = False
-    top_str = None
-    if len(unique_ranks) == 5:
-        if unique_ranks[0] - unique_ranks[4] == 4:
-            straight = True; top_str = unique_ranks[0]
-        elif unique_ranks == [14, 5, 4, 3, 2]:
-            straight = True; top_str = 5
-    if flush and straight:
-        return (8, top_str)
-    elif 4 in freq:
-        four_rank = max(r for r, c in counts.items() if c == 4)
-        kicker = max(r for r in ranks if r != four_rank)
-        return (7, four_rank, kicker)
-    elif 3 in freq and 2 in freq:
-        triple_rank = max(r for r, c in counts.items() if c == 3)
-        pair_rank = max(r for r, c in counts.items() if c >= 2 and r != triple_rank)
-        return (6, triple_rank, pair_rank)
-    elif flush:
-        return (5, tuple(ranks))
-    elif straight:
-        return (4, top_str)
-    elif 3 in freq:
-        triple_rank = max(r for r, c in counts.items() if c == 3)
-        kickers = tuple(sorted((r for r in ranks if r != triple_rank), reverse=True))
-        return (3, triple_rank, kickers)
-    elif freq.count(2) >= 2:
-        pairs = sorted([r for r, c in counts.items() if c == 2], reverse=True)
-        kicker = max(r for r in ranks if r not in pairs)
-        return (2, tuple(pairs), kicker)
-    elif 2 in freq:
-        pair_rank = max(r for r, c in counts.items() if c == 2)
-        kickers = tuple(sorted([r for r in ranks if r != pair_rank], reverse=True))
-        return (1, pair_rank, kickers)
-    else:
-        return (0, tuple(ranks))
-
-def evaluate_seven(cards):
-    best = None
-    for combo in itertools.combinations(cards, 5):
-        score = evaluate_five(combo)
-        if best is None or score > best:
-            best = score
-    return best
-
 def compare_hands(hand1, hand2, board):
-    s1 = evaluate_seven(hand1 + board)
-    s2 = evaluate_seven(hand2 + board)
+    s1 = evaluate_cards(hand1 + board)
+    s2 = evaluate_cards(hand2 + board)
     if s1 > s2: 
         return 1
     elif s2 > s1: 
@@ -127,11 +86,32 @@ def compare_hands(hand1, hand2, board):
     else: 
         return 0
 
-def compute_equity(hand1, hand2, board, num_simulations=5000):
+def compute_equity(hand1, hand2, board, num_simulations=5000, game="holdem"):
+    if game == "plo":
+        # Pot-Limit Omaha: exactly two hole cards, vectorized runouts.
+        from omaha import omaha_equity
+        return omaha_equity(hand1, hand2, board, num_simulations)
     deck = generate_deck()
     used = set(hand1 + hand2 + board)
     deck = [c for c in deck if c not in used]
     needed = 5 - len(board)
+    if needed == 0:
+        # Complete board: one lookup in the cached showdown index.
+        from river_index import river_index
+        from fast_eval import card_to_int
+        from combos import combo_index
+        res = river_index(board).hand_vs_hand(combo_index([card_to_int(c) for c in hand1]),
+                                              combo_index([card_to_int(c) for c in hand2]))
+        return (1.0, 0.0, 1.0) if res == 1 else (0.0, 0.0, 0.0) if res == -1 else (0.0, 1.0, 0.5)
+    if needed == 5 and len(used) == 4:
+        # Preflop: the per-combo table, when it has been built.
+        from combo_table import load_combo_table
+        table = load_combo_table()
+        if table is not None:
+            from fast_eval import card_to_int
+            from combos import combo_index
+            return table.combo_lookup(combo_index([card_to_int(c) for c in hand1]),
+                                      combo_index([card_to_int(c) for c in hand2]))
     wins1 = wins2 = ties = 0
     total = 0
     if needed <= 2:
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Distributed work queue for precompute jobs.
+
+A job is split into numbered shards. Shard k is deterministic (its random
+boards come from a generator seeded with the job seed and k) and merging
+is idempotent (the merged shard id is recorded in the same transaction as
+the counts), so a shard can be handed out again after a lost worker and a
+duplicate result is simply dropped.
+
+The coordinator serves shards over TCP as newline-delimited JSON:
+
+    -> {"op": "get"}
+    <- {"shard": k, "job": name, "params": {...}} | {"wait": seconds} | {"done": true}
+    -> {"op": "put", "shard": k, "result": "<base64 .npz>"}
+    <- {"ok": true, "duplicate": false}
+
+The coordinator listens on localhost unless given --host. Serving other
+hosts needs a shared --token (or $PRECOMPUTE_QUEUE_TOKEN), which every
+message must carry; only leased shards with arrays shaped like the stored
+counts are merged. The next shard to hand out is kept in the `meta`
+table with the job parameters, so a restarted coordinator resumes where
+it stopped and first re-issues shards that were handed out but never
+merged; it refuses to resume with different parameters.
+
+    python precompute_queue.py serve --shards 500 [--host 0.0.0.0 --token SECRET] [--port 5555]
+    python precompute_queue.py work --host COORDINATOR [--token SECRET] [--port 5555]
+    python precompute_queue.py local --shards 20 --workers 4
+    python precompute_queue.py local --job combos --workers 8   # then: combo_table.py export
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import hmac
+import sqlite3
+import argparse
+import threading
+import socketserver
+import multiprocessing as mp
+import numpy as np
+import preflop_db_2 as db
+import combo_table
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5555
+TOKEN_ENV = "PRECOMPUTE_QUEUE_TOKEN"
+# A shard not returned within this many seconds is handed out again.
+LEASE_SECONDS = 600
+# Board batches (of preflop_db_2.BOARD_BATCH boards) per preflop shard.
+SHARD_BATCHES = 25
+DEFAULT_SEED = 20240601
+# Boards (of the 2,598,960 in enumeration order) per combos shard.
+COMBO_SHARD_BOARDS = 20000
+CONNECT_RETRIES = 30
+
+# -------------- Jobs --------------
+
+class PreflopJob:
+    """
+    Counts for preflop_equities.db: each shard scores SHARD_BATCHES batches
+    of random boards exactly like preflop_db_2's main loop.
+    """
+    name = "preflop"
+
+    def __init__(self, seed=DEFAULT_SEED, shard_batches=SHARD_BATCHES):
+        self.seed = seed
+        self.shard_batches = shard_batches
+        self.canonical = db.generate_canonical_hands()
+        self.counters = None
+        self.iterations = 0
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(seed=args.seed, shard_batches=args.shard_batches)
+
+    def params(self):
+        return {"seed": self.seed, "shard_batches": self.shard_batches}
+
+    def default_shards(self):
+        return None
+
+    def compute(self, shard):
+        """Counter deltas for one shard, as a dict of arrays."""
+        rng = np.random.default_rng([self.seed, shard])
+        holes = db.hole_array([db.get_valid_hand(h, set()) for h in self.canonical])
+        second_holes = db.hole_array([db.get_second_valid_hand(h) for h in self.canonical])
+        n = len(self.canonical)
+        counters = tuple(np.zeros((n, n), dtype=np.int64) for _ in range(3))
+        for _ in range(self.shard_batches):
+            boards = rng.random((db.BOARD_BATCH, 52)).argsort(axis=1)[:, :5]
+            scores, valid = db.score_boards(holes, boards)
+            self_scores, self_valid = db.score_boards(second_holes, boards)
+            db.accumulate(counters, scores, valid, self_scores, self_valid)
+        wins, ties, total = counters
+        return {"wins": wins, "ties": ties, "total": total}
+
+    def open(self):
+        """Loads the stored counts the coordinator merges into."""
+        self.counters = db.load_counters(self.canonical)
+        self.iterations = db.load_iterations()
+
+    def check(self, result):
+        check_result(result, self.counters)
+
+    def merge(self, conn, shard, result):
+        """Adds one shard's deltas inside the caller's transaction."""
+        counters = tuple(c + result[k] for c, k in zip(self.counters, ("wins", "ties", "total")))
+        iterations = self.iterations + self.shard_batches * db.BOARD_BATCH
+        db.save_counters(self.canonical, counters, iterations, conn)
+        return lambda: self._commit(counters, iterations)
+
+    def _commit(self, counters, iterations):
+        self.counters = counters
+        self.iterations = iterations
+
+class CombosJob:
+    """
+    Exact per-combo preflop counts for combo_table: shard k scores every
+    isomorphism class on boards k * shard_boards onwards of the
+    enumeration of all 5-card boards.
+    """
+    name = "combos"
+
+    def __init__(self, shard_boards=COMBO_SHARD_BOARDS):
+        self.shard_boards = shard_boards
+        self.reps = None
+        self.counts = None
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(shard_boards=args.shard_boards)
+
+    def params(self):
+        return {"shard_boards": self.shard_boards}
+
+    def default_shards(self):
+        return -(-combo_table.TOTAL_BOARDS // self.shard_boards)
+
+    def compute(self, shard):
+        if self.reps is None:
+            self.reps = combo_table.build_index()[1]
+        boards = combo_table.board_block(shard * self.shard_boards, self.shard_boards)
+        wins, ties, total = combo_table.board_counts(boards, self.reps)
+        return {"wins": wins, "ties": ties, "total": total}
+
+    def open(self):
+        n_classes = len(combo_table.build_index()[1])
+        conn = sqlite3.connect(db.DB_FILE)
+        combo_table.init_counts(conn)
+        conn.commit()
+        self.counts = combo_table.load_counts(conn, n_classes)
+        conn.close()
+
+    def check(self, result):
+        check_result(result, self.counts)
+
+    def merge(self, conn, shard, result):
+        counts = tuple(c + result[k] for c, k in zip(self.counts, ("wins", "ties", "total")))
+        combo_table.save_counts(conn, counts)
+        def commit():
+            self.counts = counts
+        return commit
+
+JOBS = {PreflopJob.name: PreflopJob, CombosJob.name: CombosJob}
+
+def check_result(result, counters):
+    """
+    Raises ValueError unless result holds wins/ties/total arrays of
+    non-negative integers shaped like the stored counters.
+    """
+    for name, stored in zip(("wins", "ties", "total"), counters):
+        if name not in result:
+            raise ValueError(f"result has no {name} array")
+        a = result[name]
+        if a.shape != stored.shape or not np.issubdtype(a.dtype, np.integer):
+            raise ValueError(f"{name} is {a.dtype} {a.shape}, expected integer {stored.shape}")
+        if (a < 0).any():
+            raise ValueError(f"{name} has negative counts")
+
+def make_job(name, params):
+    return JOBS[name](**params)
+
+# -------------- Result encoding --------------
+
+def encode_result(result):
+    buf = io.BytesIO()
+    np.savez_compressed(buf, **result)
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+def decode_result(text):
+    with np.load(io.BytesIO(base64.b64decode(text)), allow_pickle=False) as data:
+        return {k: data[k] for k in data.files}
+
+# -------------- Coordinator --------------
+
+class Coordinator:
+    def __init__(self, job, shards, lease=LEASE_SECONDS, token=None):
+        self.job = job
+        self.shards = shards
+        self.lease = lease
+        self.token = token
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        db.init_db()
+        job.open()
+        conn = sqlite3.connect(db.DB_FILE)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS queue_shards (
+                job TEXT,
+                shard INTEGER,
+                PRIMARY KEY (job, shard)
+            )
+        ''')
+        self.merged = {row[0] for row in conn.execute("SELECT shard FROM queue_shards WHERE job=?", (job.name,))}
+        row = conn.execute("SELECT value FROM meta WHERE key=?", (self.meta_key,)).fetchone()
+        # Shard k only means the same boards under the same parameters.
+        params = json.dumps(job.params(), sort_keys=True)
+        stored = conn.execute("SELECT value FROM meta WHERE key=?", (self.params_key,)).fetchone()
+        if stored is not None and stored[0] != params:
+            conn.close()
+            raise ValueError(f"{db.DB_FILE} holds {job.name} shards merged with {stored[0]}, not {params}; "
+                             "resume with those parameters or use a fresh --db")
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (self.params_key, params))
+        conn.commit()
+        conn.close()
+        self.next_shard = int(row[0]) if row else 0
+        # Handed out before a restart but never merged.
+        self.retry = [k for k in range(min(self.next_shard, shards)) if k not in self.merged]
+        self.leases = {}
+        self.check_finished()
+
+    @property
+    def meta_key(self):
+        return f"queue_{self.job.name}_next_shard"
+
+    @property
+    def params_key(self):
+        return f"queue_{self.job.name}_params"
+
+    def authorized(self, msg):
+        return self.token is None or hmac.compare_digest(str(msg.get("token", "")), self.token)
+
+    def remaining(self):
+        return sum(1 for k in range(self.shards) if k not in self.merged)
+
+    def check_finished(self):
+        if self.remaining() == 0:
+            self.finished.set()
+
+    def checkout(self):
+        with self.lock:
+            now = time.time()
+            for k, deadline in list(self.leases.items()):
+                if deadline < now:
+                    del self.leases[k]
+                    self.retry.append(k)
+            if self.retry:
+                k = self.retry.pop(0)
+            elif self.next_shard < self.shards:
+                k = self.next_shard
+                self.next_shard += 1
+                conn = sqlite3.connect(db.DB_FILE)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (self.meta_key, str(self.next_shard)))
+                conn.commit()
+                conn.close()
+            elif self.leases:
+                return {"wait": 1.0}
+            else:
+                return {"done": True}
+            self.leases[k] = now + self.lease
+            return {"shard": k, "job": self.job.name, "params": self.job.params()}
+
+    def submit(self, shard, result):
+        with self.lock:
+            if shard in self.merged:
+                self.leases.pop(shard, None)
+                return {"ok": True, "duplicate": True}
+            if not 0 <= shard < self.shards:
+                raise ValueError(f"shard {shard} is out of range")
+            if shard not in self.leases:
+                raise ValueError(f"shard {shard} is not leased")
+            self.job.check(result)
+            conn = sqlite3.connect(db.DB_FILE)
+            try:
+                commit = self.job.merge(conn, shard, result)
+                conn.execute("INSERT OR IGNORE INTO queue_shards (job, shard) VALUES (?, ?)", (self.job.name, shard))
+                conn.commit()
+            except Exception:
+                # Hand the shard out again rather than losing it.
+                self.leases.pop(shard, None)
+                if shard not in self.retry:
+                    self.retry.append(shard)
+                raise
+            finally:
+                conn.close()
+            commit()
+            self.leases.pop(shard, None)
+            self.merged.add(shard)
+            if shard in self.retry:
+                self.retry.remove(shard)
+            done = self.shards - self.remaining()
+            print(f"Merged shard {shard} ({done}/{self.shards})")
+            self.check_finished()
+            return {"ok": True, "duplicate": False}
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        for line in self.rfile:
+            try:
+                msg = json.loads(line)
+                if not coordinator.authorized(msg):
+                    reply = {"error": "bad token"}
+                elif msg.get("op") == "get":
+                    reply = coordinator.checkout()
+                elif msg.get("op") == "put":
+                    reply = coordinator.submit(int(msg["shard"]), decode_result(msg["result"]))
+                else:
+                    reply = {"error": "unknown op"}
+            except Exception as e:
+                print("Bad request:", e)
+                reply = {"error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+            self.wfile.flush()
+
+class QueueServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, coordinator, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        super().__init__((host, port), _Handler)
+        self.coordinator = coordinator
+
+def serve(coordinator, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    """Serves shards until every one is merged."""
+    server = QueueServer(coordinator, host, port)
+    if ready is not None:
+        ready(server.server_address[1])
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        coordinator.finished.wait()
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"All {coordinator.shards} shards merged.")
+
+# -------------- Worker --------------
+
+class _Connection:
+    def __init__(self, host, port, token=None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.sock = None
+
+    def request(self, msg):
+        """Sends one message and returns the reply, reconnecting as needed."""
+        if self.token is not None:
+            msg = dict(msg, token=self.token)
+        for attempt in range(CONNECT_RETRIES):
+            try:
+                if self.sock is None:
+                    self.sock = socket.create_connection((self.host, self.port))
+                    self.file = self.sock.makefile("rwb")
+                self.file.write((json.dumps(msg) + "\n").encode())
+                self.file.flush()
+                line = self.file.readline()
+                if not line:
+                    raise ConnectionError("coordinator closed the connection")
+                return json.loads(line)
+            except OSError:
+                self.close()
+                if attempt == CONNECT_RETRIES - 1:
+                    raise
+                time.sleep(1.0)
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+
+def work(host, port=DEFAULT_PORT, token=None):
+    """Computes shards from the coordinator until it reports done."""
+    conn = _Connection(host, port, token)
+    jobs = {}
+    try:
+        while True:
+            try:
+                reply = conn.request({"op": "get"})
+            except OSError:
+                # Coordinator gone: everything was merged or it stopped.
+                return
+            if "error" in reply:
+                print("Coordinator refused:", reply["error"])
+                return
+            if reply.get("done"):
+                return
+            if "wait" in reply:
+                time.sleep(reply["wait"])
+                continue
+            key = (reply["job"], json.dumps(reply["params"], sort_keys=True))
+            if key not in jobs:
+                jobs[key] = make_job(reply["job"], reply["params"])
+            result = jobs[key].compute(reply["shard"])
+            reply = conn.request({"op": "put", "shard": reply["shard"], "result": encode_result(result)})
+            if "error" in reply:
+                print("Result rejected:", reply["error"])
+    finally:
+        conn.close()
+
+# -------------- Command line --------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed precompute queue.")
+    parser.add_argument("--db", default=db.DB_FILE, help="SQLite file to merge into")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "local"):
+        p = sub.add_parser(name)
+        p.add_argument("--job", default="preflop", choices=sorted(JOBS))
+        p.add_argument("--shards", type=int, help="total shards (default: the whole job, if it has an end)")
+        p.add_argument("--seed", type=int, default=DEFAULT_SEED, help="preflop job")
+        p.add_argument("--shard-batches", type=int, default=SHARD_BATCHES, help="preflop job")
+        p.add_argument("--shard-boards", type=int, default=COMBO_SHARD_BOARDS, help="combos job")
+        p.add_argument("--lease", type=float, default=LEASE_SECONDS)
+        if name == "serve":
+            p.add_argument("--host", default=DEFAULT_HOST, help="0.0.0.0 to accept remote workers (needs --token)")
+            p.add_argument("--port", type=int, default=DEFAULT_PORT)
+            p.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"shared secret (default ${TOKEN_ENV})")
+        else:
+            p.add_argument("--workers", type=int, default=mp.cpu_count())
+    p = sub.add_parser("work")
+    p.add_argument("--host", default=DEFAULT_HOST)
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"shared secret (default ${TOKEN_ENV})")
+    args = parser.parse_args(argv)
+    db.DB_FILE = args.db
+
+    if args.command == "work":
+        work(args.host, args.port, args.token)
+        return
+    token = (args.token or None) if args.command == "serve" else None
+    if args.command == "serve" and not token and args.host not in ("127.0.0.1", "localhost", "::1"):
+        parser.error(f"--token (or ${TOKEN_ENV}) is required to serve on {args.host}")
+    job = JOBS[args.job].from_args(args)
+    shards = args.shards or job.default_shards()
+    if not shards:
+        parser.error(f"--shards is required for the {args.job} job")
+    try:
+        coordinator = Coordinator(job, shards, lease=args.lease, token=token)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.command == "serve":
+        serve(coordinator, args.host, args.port)
+        return
+    # local: coordinator on an ephemeral localhost port plus worker processes.
+    workers = []
+    def start_workers(port):
+        ctx = mp.get_context("spawn")
+        for _ in range(args.workers):
+            proc = ctx.Process(target=work, args=("127.0.0.1", port), daemon=True)
+            proc.start()
+            workers.append(proc)
+    serve(coordinator, "127.0.0.1", 0, ready=start_workers)
+    for proc in workers:
+        proc.join(timeout=5)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
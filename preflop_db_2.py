@@ -5,13 +5,23 @@ Incremental Preflop DB Generator (with Proper Resumption)
 This generator simulates matchups and stores both raw counts and computed
 probabilities. When restarted it loads the previous raw counts and iteration
 count from the database, so the simulation properly resumes.
+
+Every pair's standard error is stored next to its counts. Each batch only
+scores the hands that still have a pair above the target error, and the
+run stops by itself once every pair meets it:
+
+    python preflop_db_2.py [--target-se 0.001]
 """
 
+import sys
+import argparse
 import sqlite3
 import random
-import itertools
 import time
 from collections import defaultdict
+import numpy as np
+from fast_eval import card_to_int
+from evaluators import evaluate_batch
 
 # -------------- Poker Hand Evaluation Code --------------
 
@@ -24,62 +34,6 @@ def rank_char_to_int(ch):
 def generate_deck():
     return [(r, s) for r in range(2,15) for s in ['h','d','c','s']]
 
-def evaluate_five(cards):
-    from collections import Counter
-    ranks = sorted((c[0] for c in cards), reverse=True)
-    suits = [c[1] for c in cards]
-    flush = (len(set(suits)) == 1)
-    counts = Counter(ranks)
-    freq = sorted(counts.values(), reverse=True)
-    unique_ranks = sorted(counts.keys(), reverse=True)
-    
-    straight = False
-    top_str = None
-    if len(unique_ranks) == 5:
-        if unique_ranks[0] - unique_ranks[4] == 4:
-            straight = True
-            top_str = unique_ranks[0]
-        elif unique_ranks == [14, 5, 4, 3, 2]:
-            straight = True
-            top_str = 5
-
-    if flush and straight:
-        return (8, top_str)
-    elif 4 in freq:
-        four_rank = max(r for r, c in counts.items() if c == 4)
-        kicker = max(r for r in ranks if r != four_rank)
-        return (7, four_rank, kicker)
-    elif 3 in freq and 2 in freq:
-        triple_rank = max(r for r, c in counts.items() if c == 3)
-        pair_rank = max(r for r, c in counts.items() if c >= 2 and r != triple_rank)
-        return (6, triple_rank, pair_rank)
-    elif flush:
-        return (5, tuple(ranks))
-    elif straight:
-        return (4, top_str)
-    elif 3 in freq:
-        triple_rank = max(r for r, c in counts.items() if c == 3)
-        kickers = tuple(sorted((r for r in ranks if r != triple_rank), reverse=True))
-        return (3, triple_rank, kickers)
-    elif freq.count(2) >= 2:
-        pairs = sorted([r for r, c in counts.items() if c == 2], reverse=True)
-        kicker = max(r for r in ranks if r not in pairs)
-        return (2, tuple(pairs), kicker)
-    elif 2 in freq:
-        pair_rank = max(r for r, c in counts.items() if c == 2)
-        kickers = tuple(sorted([r for r in ranks if r != pair_rank], reverse=True))
-        return (1, pair_rank, kickers)
-    else:
-        return (0, tuple(ranks))
-
-def evaluate_seven(cards):
-    best = None
-    for combo in itertools.combinations(cards, 5):
-        score = evaluate_five(combo)
-        if best is None or score > best:
-            best = score
-    return best
-
 # -------------- Canonical Hands Helpers --------------
 
 def get_valid_hand(hand_cat, forbidden):
@@ -165,6 +119,10 @@ def generate_canonical_hands():
 
 DB_FILE = "preflop_equities.db"
 BATCH_SIZE = 1000
+# Standard error of a pair's equity at which it stops being sampled.
+TARGET_SE = 0.001
+# Pairs with fewer samples than this count as unconverged whatever their error.
+MIN_PAIR_SAMPLES = 10000
 
 def init_db():
     conn = sqlite3.connect(DB_FILE)
@@ -188,9 +146,14 @@ def init_db():
             wins INTEGER,
             ties INTEGER,
             total INTEGER,
+            se REAL,
             PRIMARY KEY (user_hand, opp_hand)
         )
     ''')
+    # Databases from before the se column.
+    columns = [row[1] for row in c.execute("PRAGMA table_info(preflop_equities_counts)")]
+    if "se" not in columns:
+        c.execute("ALTER TABLE preflop_equities_counts ADD COLUMN se REAL")
     c.execute('''
         CREATE TABLE IF NOT EXISTS meta (
             key TEXT PRIMARY KEY,
@@ -209,124 +172,192 @@ def load_iterations():
     return int(row[0]) if row else 0
 
 def load_counters(canonical):
-    # Start with a dictionary of zero counts.
-    counters = {h1: {h2: {"wins": 0, "ties": 0, "total": 0} for h2 in canonical} for h1 in canonical}
+    """
+    Returns the raw counts as three 169x169 int64 arrays (wins, ties, total),
+    indexed [user_hand, opp_hand] in canonical-hand order.
+    """
+    index = {h: k for k, h in enumerate(canonical)}
+    n = len(canonical)
+    wins = np.zeros((n, n), dtype=np.int64)
+    ties = np.zeros((n, n), dtype=np.int64)
+    total = np.zeros((n, n), dtype=np.int64)
     conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
     try:
         c.execute("SELECT user_hand, opp_hand, wins, ties, total FROM preflop_equities_counts")
         rows = c.fetchall()
-        for user_hand, opp_hand, wins, ties, total in rows:
-            counters[user_hand][opp_hand] = {"wins": wins, "ties": ties, "total": total}
+        for user_hand, opp_hand, w, t, tot in rows:
+            i, j = index[user_hand], index[opp_hand]
+            wins[i, j] = w
+            ties[i, j] = t
+            total[i, j] = tot
     except Exception as e:
         print("No counts loaded:", e)
     conn.close()
-    return counters
+    return wins, ties, total
 
-def save_counters(counters, iterations):
-    conn = sqlite3.connect(DB_FILE)
+def standard_errors(counters):
+    """
+    (169, 169) standard error of each pair's equity; a win scores 1 and a
+    tie 0.5, so the per-board variance is win + tie/4 - equity^2. Pairs
+    with no samples get inf.
+    """
+    wins, ties, total = counters
+    safe = np.maximum(total, 1)
+    win, tie = wins / safe, ties / safe
+    eq = win + 0.5 * tie
+    variance = np.maximum(win + 0.25 * tie - eq * eq, 0.0)
+    return np.where(total > 0, np.sqrt(variance / safe), np.inf)
+
+def unconverged(counters, target_se=TARGET_SE):
+    """(169, 169) True for pairs still above target_se or short of MIN_PAIR_SAMPLES."""
+    return (standard_errors(counters) > target_se) | (counters[2] < MIN_PAIR_SAMPLES)
+
+def save_counters(canonical, counters, iterations, conn=None):
+    """
+    Writes counts, standard errors, probabilities and the iteration count.
+    With conn the writes join the caller's transaction, which the caller
+    commits.
+    """
+    wins, ties, total = counters
+    safe = np.maximum(total, 1)
+    win_prob = np.where(total > 0, wins / safe, 0.0)
+    tie_prob = np.where(total > 0, ties / safe, 0.0)
+    true_eq = win_prob + 0.5 * tie_prob
+    errors = standard_errors(counters)
+    count_rows = []
+    prob_rows = []
+    for i, user_hand in enumerate(canonical):
+        for j, opp_hand in enumerate(canonical):
+            se = float(errors[i, j]) if total[i, j] > 0 else None
+            count_rows.append((user_hand, opp_hand, int(wins[i, j]), int(ties[i, j]), int(total[i, j]), se))
+            prob_rows.append((user_hand, opp_hand, float(win_prob[i, j]), float(tie_prob[i, j]), float(true_eq[i, j])))
+    own = conn is None
+    if own:
+        conn = sqlite3.connect(DB_FILE)
     c = conn.cursor()
-    for user_hand, opp_dict in counters.items():
-        for opp_hand, stats in opp_dict.items():
-            total = stats["total"]
-            wins = stats["wins"]
-            ties = stats["ties"]
-            if total > 0:
-                win_prob = wins / total
-                tie_prob = ties / total
-                true_eq  = win_prob + 0.5 * tie_prob
-            else:
-                win_prob = 0.0
-                tie_prob = 0.0
-                true_eq  = 0.0
-            # Save raw counts:
-            c.execute('''
-                INSERT OR REPLACE INTO preflop_equities_counts (user_hand, opp_hand, wins, ties, total)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_hand, opp_hand, wins, ties, total))
-            # Save computed probabilities:
-            c.execute('''
-                INSERT OR REPLACE INTO preflop_equities (user_hand, opp_hand, win, tie, true)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (user_hand, opp_hand, win_prob, tie_prob, true_eq))
+    # Save raw counts:
+    c.executemany('''
+        INSERT OR REPLACE INTO preflop_equities_counts (user_hand, opp_hand, wins, ties, total, se)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', count_rows)
+    # Save computed probabilities:
+    c.executemany('''
+        INSERT OR REPLACE INTO preflop_equities (user_hand, opp_hand, win, tie, true)
+        VALUES (?, ?, ?, ?, ?)
+    ''', prob_rows)
     c.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('iterations', ?)", (str(iterations),))
-    conn.commit()
-    conn.close()
+    if (total > 0).all():
+        c.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('max_se', ?)", (repr(float(errors.max())),))
+    if own:
+        conn.commit()
+        conn.close()
+
+# -------------- Vectorized Board Scoring --------------
+
+# Boards scored and accumulated per NumPy step.
+BOARD_BATCH = 200
+
+def hole_array(assignments):
+    """(169, 2) integer cards for a list of hole-card assignments."""
+    return np.array([[card_to_int(c) for c in hole] for hole in assignments], dtype=np.int64)
+
+def score_boards(holes, boards):
+    """
+    Scores every hand on every board: returns (scores, valid), both
+    (B, 169), where valid is False when the hole cards hit the board.
+    """
+    b, n = len(boards), len(holes)
+    hands = np.concatenate([np.broadcast_to(holes[None, :, :], (b, n, 2)),
+                            np.broadcast_to(boards[:, None, :], (b, n, 5))], axis=2)
+    scores = evaluate_batch(hands.reshape(-1, 7)).reshape(b, n)
+    on_board = np.zeros((b, 52), dtype=bool)
+    on_board[np.arange(b)[:, None], boards] = True
+    valid = ~(on_board[:, holes[:, 0]] | on_board[:, holes[:, 1]])
+    return scores, valid
+
+def accumulate(counters, scores, valid, self_scores, self_valid, active=None):
+    """
+    Adds a batch of boards to the counters. Every ordered pair of distinct
+    valid hands gets a total; wins and ties come from comparing the hands'
+    showdown scores (broadcast over the rank order) rather than a pair loop.
+    The diagonal records each hand against its second suit assignment.
+    With active (hand indices), the scores cover only those hands and only
+    pairs among them are updated.
+    """
+    wins, ties, total = counters
+    n = scores.shape[1]
+    diag = np.arange(n)
+    pair = valid[:, :, None] & valid[:, None, :]
+    pair[:, diag, diag] = False
+    higher = scores[:, :, None] > scores[:, None, :]
+    equal = scores[:, :, None] == scores[:, None, :]
+    d_total = pair.sum(axis=0)
+    d_wins = (higher & pair).sum(axis=0)
+    d_ties = (equal & pair).sum(axis=0)
+    # --- Self Matchup Simulation ---
+    both = valid & self_valid
+    same = scores == self_scores
+    d_total[diag, diag] += both.sum(axis=0)
+    d_wins[diag, diag] += (both & ~same).sum(axis=0)
+    d_ties[diag, diag] += (both & same).sum(axis=0)
+    cells = np.ix_(active, active) if active is not None else slice(None)
+    total[cells] += d_total
+    wins[cells] += d_wins
+    ties[cells] += d_ties
 
 # -------------- Main Simulation Loop --------------
 
-def main():
+def active_hands(counters, target_se=TARGET_SE):
+    """Indices of the hands in at least one unconverged pair (as either player)."""
+    open_pairs = unconverged(counters, target_se)
+    return np.flatnonzero(open_pairs.any(axis=0) | open_pairs.any(axis=1))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate preflop equities into preflop_equities.db.")
+    parser.add_argument("--target-se", type=float, default=TARGET_SE,
+                        help="stop once every pair's equity has this standard error")
+    args = parser.parse_args(argv)
+
     canonical = generate_canonical_hands()  # 169 canonical hands
     counters = load_counters(canonical)
     iterations = load_iterations()
     print(f"Resuming simulation from {iterations} iterations.")
 
     # Precompute a fixed assignment for each canonical hand.
-    canonical_assignments = {h: get_valid_hand(h, set()) for h in canonical}
-    deck = generate_deck()
+    holes = hole_array([get_valid_hand(h, set()) for h in canonical])
+    second_holes = hole_array([get_second_valid_hand(h) for h in canonical])
 
     start_time = time.time()
     batch_start = start_time
+    active = active_hands(counters, args.target_se)
     try:
-        while True:
-            iterations += 1
-
-            # Draw a random board of 5 cards.
-            board = random.sample(deck, 5)
-
-            # For each canonical hand, if its fixed hole cards conflict with the board, skip it.
-            valid_results = {}
-            for hand in canonical:
-                hole = canonical_assignments[hand]
-                if any(card in board for card in hole):
-                    continue
-                hand_value = evaluate_seven(hole + board)
-                valid_results[hand] = hand_value
-
-            # Compare every ordered pair of distinct valid canonical hands.
-            valid_hands = list(valid_results.keys())
-            for i in range(len(valid_hands)):
-                h1 = valid_hands[i]
-                for j in range(i+1, len(valid_hands)):
-                    h2 = valid_hands[j]
-                    counters[h1][h2]["total"] += 1
-                    counters[h2][h1]["total"] += 1
-                    val1 = valid_results[h1]
-                    val2 = valid_results[h2]
-                    if val1 > val2:
-                        counters[h1][h2]["wins"] += 1
-                    elif val1 < val2:
-                        counters[h2][h1]["wins"] += 1
-                    else:
-                        counters[h1][h2]["ties"] += 1
-                        counters[h2][h1]["ties"] += 1
-
-            # --- Self Matchup Simulation ---
-            for hand in valid_results:
-                primary_value = valid_results[hand]
-                second_assignment = get_second_valid_hand(hand)
-                if second_assignment is None or any(card in board for card in second_assignment):
-                    continue
-                second_value = evaluate_seven(second_assignment + board)
-                counters[hand][hand]["total"] += 1
-                if primary_value > second_value:
-                    counters[hand][hand]["wins"] += 1
-                elif primary_value < second_value:
-                    counters[hand][hand]["wins"] += 1
-                else:
-                    counters[hand][hand]["ties"] += 1
-
-            if iterations % BATCH_SIZE == 0:
-                save_counters(counters, iterations)
+        while len(active):
+            # Draw a batch of random 5-card boards; only hands with an
+            # unconverged pair are scored on them.
+            boards = np.array([random.sample(range(52), 5) for _ in range(BOARD_BATCH)], dtype=np.int64)
+            scores, valid = score_boards(holes[active], boards)
+            self_scores, self_valid = score_boards(second_holes[active], boards)
+            accumulate(counters, scores, valid, self_scores, self_valid, active)
+            previous = iterations
+            iterations += BOARD_BATCH
+
+            if iterations // BATCH_SIZE != previous // BATCH_SIZE:
+                save_counters(canonical, counters, iterations)
+                active = active_hands(counters, args.target_se)
                 batch_time = time.time() - batch_start
-                print(f"Completed {iterations} iterations (last {BATCH_SIZE} in {batch_time:.1f} s)")
+                worst = standard_errors(counters).max()
+                print(f"Completed {iterations} iterations (last {BATCH_SIZE} in {batch_time:.1f} s), "
+                      f"max SE {worst:.5f}, {len(active)} hands still sampled")
                 batch_start = time.time()
 
+        save_counters(canonical, counters, iterations)
+        print(f"Every pair is within SE {args.target_se} after {iterations} iterations.")
     except KeyboardInterrupt:
         print("Interrupted! Saving progress...")
-        save_counters(counters, iterations)
+        save_counters(canonical, counters, iterations)
         print(f"Saved after {iterations} iterations.")
 
 if __name__ == '__main__':
     init_db()
-    main()
+    main(sys.argv[1:])
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Heads-up push/fold equilibrium over the 169 preflop categories.
+
+The small blind shoves or folds; the big blind calls a shove or folds.
+With E[a, b] the equity of category a against category b and W[a, b] the
+number of card-compatible combo pairs, the expected value of every shove
+and call is a matrix-vector product against the other player's strategy,
+so fictitious play reaches the equilibrium in a few thousand O(169^2)
+iterations. Stacks are effective stacks in big blinds, blinds and ante
+included.
+
+Charts over a grid of stack depths are cached in CHART_FILE:
+
+    python push_fold.py solve --stack 10 [--ante 0.1]
+    python push_fold.py charts [--ante 0.1]
+"""
+
+import sys
+import argparse
+import threading
+import numpy as np
+from combos import COMBO_CAT_IDX, CATEGORIES, NUM_COMBOS
+from category_matchups import CONFLICTS, NUM_CATS
+
+CHART_FILE = "push_fold_charts.npz"
+DEFAULT_STACKS = np.arange(1.0, 25.5, 0.5)
+MAX_ITERATIONS = 20000
+# Stop once neither player can gain more than this (in big blinds) by deviating.
+TOLERANCE = 1e-4
+# Combos per category, as a fraction of all hands.
+CAT_FREQ = np.bincount(COMBO_CAT_IDX, minlength=NUM_CATS) / NUM_COMBOS
+
+def pair_counts():
+    """(169, 169) combo pairs of each category pair that share no card."""
+    counts = np.bincount(COMBO_CAT_IDX, minlength=NUM_CATS).astype(float)
+    key = (COMBO_CAT_IDX[:, None] * NUM_CATS + COMBO_CAT_IDX[CONFLICTS]).ravel()
+    shared = np.bincount(key, minlength=NUM_CATS * NUM_CATS).reshape(NUM_CATS, NUM_CATS)
+    return np.outer(counts, counts) - shared
+
+def equity_matrix():
+    """
+    (169, 169) preflop equity of each category against each other, averaged
+    over compatible combo pairs from combo_table when it has been built,
+    else read from preflop_equities.db.
+    """
+    from combo_table import load_combo_table
+    table = load_combo_table()
+    if table is not None:
+        win, tie, total = table.category_sums()
+        return (win + tie / 2) / np.maximum(total, 1)
+    from hand_helpers import load_preflop_table
+    rows = load_preflop_table()
+    equity = np.full((NUM_CATS, NUM_CATS), 0.5)
+    for a, cat_a in enumerate(CATEGORIES):
+        for b, cat_b in enumerate(CATEGORIES):
+            row = rows.get((cat_a, cat_b))
+            if row is not None:
+                equity[a, b] = row[2]
+    return equity
+
+class PushFoldChart:
+    def __init__(self, stack, push, call, exploitability, blinds):
+        self.stack = stack
+        self.push = push
+        self.call = call
+        self.exploitability = exploitability
+        self.blinds = blinds
+
+    def push_range(self, threshold=0.5):
+        return [cat for k, cat in enumerate(CATEGORIES) if self.push[k] >= threshold]
+
+    def call_range(self, threshold=0.5):
+        return [cat for k, cat in enumerate(CATEGORIES) if self.call[k] >= threshold]
+
+    def push_percent(self):
+        return float(CAT_FREQ @ self.push) * 100
+
+    def call_percent(self):
+        return float(CAT_FREQ @ self.call) * 100
+
+class PushFoldGame:
+    def __init__(self, equity, pairs, stack, sb=0.5, bb=1.0, ante=0.0):
+        if stack < bb + ante:
+            raise ValueError("stack must cover the big blind and ante")
+        self.stack = stack
+        self.blinds = (sb, bb, ante)
+        self.pairs = pairs
+        self.row_pairs = pairs.sum(axis=1)
+        self.col_pairs = pairs.sum(axis=0)
+        # Net results when the shove is called, weighted by pair counts.
+        self.sb_called = pairs * (2 * stack * equity - stack)
+        self.bb_called = pairs * (2 * stack * (1 - equity) - stack)
+        self.sb_fold = -(sb + ante)
+        self.sb_steal = bb + ante
+        self.bb_fold = -(bb + ante)
+
+    def shove_ev(self, call):
+        """SB's EV of shoving each category against BB calling frequencies."""
+        return (self.pairs @ (1 - call) * self.sb_steal + self.sb_called @ call) / self.row_pairs
+
+    def call_ev(self, push):
+        """
+        (EV of calling, weight of shoves faced) per BB category; BB hands
+        that never face a shove get the fold value.
+        """
+        faced = push @ self.pairs
+        ev = np.where(faced > 0, (push @ self.bb_called) / np.maximum(faced, 1e-300), self.bb_fold)
+        return ev, faced / self.col_pairs
+
+    def exploitability(self, push, call):
+        """Total big blinds both players could gain by best-responding."""
+        shove = self.shove_ev(call)
+        sb_gain = CAT_FREQ @ (np.maximum(shove, self.sb_fold) - (push * shove + (1 - push) * self.sb_fold))
+        ev, shoved = self.call_ev(push)
+        bb_gain = CAT_FREQ @ (shoved * (np.maximum(ev, self.bb_fold) - (call * ev + (1 - call) * self.bb_fold)))
+        return float(sb_gain + bb_gain)
+
+    def solve(self, max_iterations=MAX_ITERATIONS, tol=TOLERANCE):
+        """Fictitious play from shove-all/call-all to an approximate equilibrium."""
+        push = np.ones(NUM_CATS)
+        call = np.ones(NUM_CATS)
+        gap = self.exploitability(push, call)
+        for t in range(1, max_iterations + 1):
+            best_push = (self.shove_ev(call) > self.sb_fold).astype(float)
+            best_call = (self.call_ev(push)[0] > self.bb_fold).astype(float)
+            push += (best_push - push) / (t + 1)
+            call += (best_call - call) / (t + 1)
+            if t % 50 == 0:
+                gap = self.exploitability(push, call)
+                if gap < tol:
+                    break
+        gap = self.exploitability(push, call)
+        return PushFoldChart(self.stack, push, call, gap, self.blinds)
+
+_matrices = None
+_matrices_lock = threading.Lock()
+
+def game_matrices():
+    """(equity, pairs), built once."""
+    global _matrices
+    with _matrices_lock:
+        if _matrices is None:
+            _matrices = (equity_matrix(), pair_counts())
+        return _matrices
+
+def solve(stack, sb=0.5, bb=1.0, ante=0.0):
+    equity, pairs = game_matrices()
+    return PushFoldGame(equity, pairs, stack, sb, bb, ante).solve()
+
+# -------------- Chart cache --------------
+
+_charts = {}
+_charts_lock = threading.Lock()
+
+def precompute_charts(stacks=DEFAULT_STACKS, sb=0.5, bb=1.0, ante=0.0, path=CHART_FILE):
+    """Solves every stack depth and writes the charts to path."""
+    charts = [solve(float(s), sb, bb, ante) for s in stacks]
+    np.savez_compressed(path, stacks=np.asarray(stacks, dtype=float),
+                        blinds=np.array([sb, bb, ante]),
+                        push=np.array([c.push for c in charts]),
+                        call=np.array([c.call for c in charts]),
+                        exploitability=np.array([c.exploitability for c in charts]))
+    with _charts_lock:
+        _charts.clear()
+    return charts
+
+def load_charts(path=CHART_FILE):
+    """{(stack, sb, bb, ante): PushFoldChart} from the cache file, if any."""
+    try:
+        with np.load(path) as data:
+            blinds = tuple(float(x) for x in data["blinds"])
+            return {(float(s),) + blinds: PushFoldChart(float(s), data["push"][k], data["call"][k],
+                                                       float(data["exploitability"][k]), blinds)
+                    for k, s in enumerate(data["stacks"])}
+    except (OSError, KeyError, ValueError):
+        return {}
+
+def get_chart(stack, sb=0.5, bb=1.0, ante=0.0):
+    """The chart for one stack depth: cached on disk or in memory, else solved."""
+    key = (float(stack), float(sb), float(bb), float(ante))
+    with _charts_lock:
+        if not _charts:
+            _charts.update(load_charts())
+        chart = _charts.get(key)
+    if chart is None:
+        chart = solve(*key)
+        with _charts_lock:
+            _charts[key] = chart
+    return chart
+
+# -------------- Command line --------------
+
+def main(argv=None):
+    from range_parser import range_to_string, weights_from_categories
+    parser = argparse.ArgumentParser(description="Heads-up push/fold equilibrium charts.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("solve", help="solve one stack depth")
+    p.add_argument("--stack", type=float, required=True, help="effective stack in big blinds")
+    p = sub.add_parser("charts", help=f"precompute charts for {DEFAULT_STACKS[0]:g}-{DEFAULT_STACKS[-1]:g}bb into {CHART_FILE}")
+    for p in sub.choices.values():
+        p.add_argument("--sb", type=float, default=0.5)
+        p.add_argument("--ante", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "charts":
+        charts = precompute_charts(sb=args.sb, ante=args.ante)
+    else:
+        charts = [get_chart(args.stack, args.sb, 1.0, args.ante)]
+    for chart in charts:
+        print(f"{chart.stack:g}bb: shove {chart.push_percent():.1f}%, call {chart.call_percent():.1f}% "
+              f"(exploitability {chart.exploitability:.5f}bb)")
+        if args.command == "solve":
+            print("  Shove:", range_to_string(weights_from_categories(chart.push_range())))
+            print("  Call: ", range_to_string(weights_from_categories(chart.call_range())))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,136 @@
+"""
+Range-vs-range equity on combo weight vectors.
+
+Both sides are (1326,) weight vectors (see range_parser / combos). For each
+runout every weighted combo on both sides is scored in one evaluate_batch
+call, and each hero combo's weighted wins/ties against the villain range
+are found with sorted prefix sums, including card removal. Runouts are
+enumerated when there are at most num_simulations of them (e.g. turn and
+river, or the flop at high depth) and sampled otherwise.
+"""
+
+import itertools
+import random
+import numpy as np
+from fast_eval import card_to_int
+from evaluators import evaluate_batch
+from combos import COMBOS, NUM_COMBOS, dead_combo_mask
+
+# Keys are card * SCORE_SPAN + score; scores are below 2**24.
+SCORE_SPAN = 1 << 24
+
+def weighted_showdown(hero_cards, hero_scores, vil_cards, vil_scores, vil_weights, self_weights=None):
+    """
+    For each hero combo on a complete board, returns the villain weight it
+    beats, ties and faces (villain combos sharing a card with the hero
+    combo are excluded). All arrays are aligned with their combo arrays;
+    self_weights, if known, is the villain weight of each hero combo itself.
+    """
+    order = np.argsort(vil_scores, kind="stable")
+    sorted_scores = vil_scores[order]
+    cum = np.concatenate([[0.0], np.cumsum(vil_weights[order])])
+    below = cum[np.searchsorted(sorted_scores, hero_scores, side="left")]
+    upto = cum[np.searchsorted(sorted_scores, hero_scores, side="right")]
+    win = below.copy()
+    tie = upto - below
+    total = np.full(len(hero_scores), cum[-1])
+
+    # Villain weight per (card, score) so blocked combos can be removed.
+    keys = np.concatenate([vil_cards[:, 0] * SCORE_SPAN + vil_scores,
+                           vil_cards[:, 1] * SCORE_SPAN + vil_scores])
+    key_weights = np.concatenate([vil_weights, vil_weights])
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    kcum = np.concatenate([[0.0], np.cumsum(key_weights[order])])
+    for side in (0, 1):
+        base = hero_cards[:, side] * SCORE_SPAN
+        start = kcum[np.searchsorted(keys, base, side="left")]
+        lo = kcum[np.searchsorted(keys, base + hero_scores, side="left")]
+        hi = kcum[np.searchsorted(keys, base + hero_scores, side="right")]
+        end = kcum[np.searchsorted(keys, base + SCORE_SPAN, side="left")]
+        win -= lo - start
+        tie -= hi - lo
+        total -= end - start
+
+    # The identical combo was removed once per card; add it back once.
+    if self_weights is None:
+        vil_index = {int(a) * 52 + int(b): w for (a, b), w in zip(vil_cards, vil_weights)}
+        self_weights = np.array([vil_index.get(int(a) * 52 + int(b), 0.0) for a, b in hero_cards])
+    tie += self_weights
+    total += self_weights
+    return win, tie, total
+
+def runouts(board, num_simulations, rng=random):
+    """
+    Runouts completing the integer board to five cards: all of them when
+    there are at most num_simulations, else num_simulations random ones.
+    """
+    remaining = [c for c in range(52) if c not in board]
+    needed = 5 - len(board)
+    count = 1
+    for k in range(needed):
+        count = count * (len(remaining) - k) // (k + 1)
+    if count <= num_simulations:
+        return list(itertools.combinations(remaining, needed))
+    return [tuple(rng.sample(remaining, needed)) for _ in range(num_simulations)]
+
+def combo_matchup_sums(hero_weights, vil_weights, board, num_simulations=1000, runout_list=None):
+    """
+    Per hero combo, the summed villain weight won, tied and faced over all
+    runouts, as three (1326,) arrays (zero for combos outside the hero range
+    or blocked by the board). board is a list of (rank, suit) cards.
+    """
+    board_ints = [card_to_int(c) for c in board]
+    dead = dead_combo_mask(board_ints)
+    hero_idx = np.flatnonzero((np.asarray(hero_weights) > 0) & ~dead)
+    vil_idx = np.flatnonzero((np.asarray(vil_weights) > 0) & ~dead)
+    win = np.zeros(NUM_COMBOS)
+    tie = np.zeros(NUM_COMBOS)
+    total = np.zeros(NUM_COMBOS)
+    if len(hero_idx) == 0 or len(vil_idx) == 0:
+        return win, tie, total
+    if len(board_ints) == 5 and runout_list is None:
+        from river_index import river_index
+        w, t, n = river_index(board_ints).combo_sums(np.where(dead, 0.0, np.asarray(vil_weights, dtype=float)))
+        win[hero_idx] = w[hero_idx]
+        tie[hero_idx] = t[hero_idx]
+        total[hero_idx] = n[hero_idx]
+        return win, tie, total
+    if runout_list is None:
+        runout_list = runouts(board_ints, num_simulations)
+    hero_cards = COMBOS[hero_idx]
+    vil_cards = COMBOS[vil_idx]
+    vil_w = np.asarray(vil_weights, dtype=float)[vil_idx]
+    self_w = np.asarray(vil_weights, dtype=float)[hero_idx]
+    both = np.concatenate([hero_cards, vil_cards])
+    for runout in runout_list:
+        full = np.array(board_ints + list(runout), dtype=np.int64)
+        scores = evaluate_batch(np.concatenate([both, np.tile(full, (len(both), 1))], axis=1))
+        out = np.zeros(52, dtype=bool)
+        out[list(runout)] = True
+        hero_ok = ~(out[hero_cards[:, 0]] | out[hero_cards[:, 1]])
+        vil_ok = ~(out[vil_cards[:, 0]] | out[vil_cards[:, 1]])
+        h_scores = scores[:len(hero_idx)]
+        v_scores = scores[len(hero_idx):]
+        w, t, n = weighted_showdown(hero_cards[hero_ok], h_scores[hero_ok],
+                                    vil_cards[vil_ok], v_scores[vil_ok], vil_w[vil_ok], self_w[hero_ok])
+        rows = hero_idx[hero_ok]
+        win[rows] += w
+        tie[rows] += t
+        total[rows] += n
+    return win, tie, total
+
+def range_vs_range(hero_weights, vil_weights, board, num_simulations=1000):
+    """
+    Equity of the hero range against the villain range, weighting every
+    non-conflicting combo pair by the product of their weights. Returns
+    (win, tie, equity) like poker.compute_equity.
+    """
+    win, tie, total = combo_matchup_sums(hero_weights, vil_weights, board, num_simulations)
+    hw = np.asarray(hero_weights, dtype=float)
+    denom = (hw * total).sum()
+    if denom <= 0:
+        return (0.0, 0.0, 0.0)
+    w = (hw * win).sum() / denom
+    t = (hw * tie).sum() / denom
+    return (float(w), float(t), float(w + t / 2))
@@ -0,0 +1,139 @@
+"""
+Range-percentile index for the 13x13 grid.
+
+Cells are sorted once by strength and stored with their cumulative combo
+weights, so selecting "the hands between x% and y%" is a couple of binary
+searches over prefix bitmasks instead of a fresh sort on every slider tick.
+
+The strength ordering is pluggable: an ordering is any function mapping a
+hand category to a number (higher = stronger), optionally with its own
+combo weights (e.g. live combos on a board). Indexes are cached by an
+ordering key, so e.g. "equity vs the opponent's current range" or a given
+board is built once.
+"""
+
+import threading
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from hand_helpers import grid_hand_cats, hand_weight, static_hand_rank, load_preflop_table
+
+class RangeIndex:
+    def __init__(self, strength, weight=hand_weight, hand_cats=None):
+        if hand_cats is None:
+            hand_cats = grid_hand_cats()
+        self.hand_cats = hand_cats
+        items = [(pos, strength(cat), weight(cat)) for pos, cat in hand_cats.items()]
+        # Same stable ordering the original per-call sort produced.
+        items.sort(key=lambda x: x[1], reverse=True)
+        self.order = [pos for pos, _, _ in items]
+        self.rank_of = {pos: k for k, pos in enumerate(self.order)}
+        self.cum = []
+        self.prev = []
+        total = 0
+        for _, _, w in items:
+            self.prev.append(total)
+            total += w
+            self.cum.append(total)
+        self.total_weight = total
+        # prefix_masks[k] has a bit set for each of the k strongest cells.
+        self.prefix_masks = [0]
+        for k in range(len(self.order)):
+            self.prefix_masks.append(self.prefix_masks[-1] | (1 << k))
+        self._sets = {}
+
+    def select_mask(self, lower_pct, upper_pct):
+        """
+        Bitmask (bit k = k-th strongest cell) of the cells that overlap the
+        [lower, upper] slice of the cumulative combo weight.
+        """
+        lo = self.total_weight * lower_pct
+        hi = self.total_weight * upper_pct
+        cum, prev, prefix = self.cum, self.prev, self.prefix_masks
+        n = len(cum)
+        # Cells lying entirely inside the slice.
+        a = bisect_left(prev, lo)
+        b = bisect_right(cum, hi)
+        mask = prefix[b] & ~prefix[a] if b > a else 0
+        # The cell straddling the lower edge.
+        k = bisect_right(cum, lo)
+        if k < n and prev[k] < lo:
+            mask |= 1 << k
+        # The cell that reaches the upper edge.
+        k = bisect_left(cum, hi)
+        if k < n and prev[k] < hi:
+            mask |= 1 << k
+        return mask
+
+    def positions(self, mask):
+        sel = self._sets.get(mask)
+        if sel is None:
+            sel = frozenset(self.order[k] for k in range(len(self.order)) if mask >> k & 1)
+            self._sets[mask] = sel
+        return sel
+
+    def select(self, lower_pct, upper_pct):
+        return set(self.positions(self.select_mask(lower_pct, upper_pct)))
+
+# -------------- Orderings --------------
+
+# Orderings other than the built-in ones are evicted oldest-first.
+MAX_ORDERINGS = 64
+
+_orderings = OrderedDict(preflop=(static_hand_rank, hand_weight))
+_indexes = {}
+_lock = threading.Lock()
+
+def register_ordering(name, strength, weight=hand_weight):
+    """
+    Registers a strength function (and optionally a combo-weight function)
+    under an ordering key usable with get_range_index().
+    """
+    with _lock:
+        _orderings[name] = (strength, weight)
+        _orderings.move_to_end(name)
+        _indexes.pop(name, None)
+        while len(_orderings) > MAX_ORDERINGS:
+            old = next(k for k in _orderings if k != "preflop")
+            del _orderings[old]
+            _indexes.pop(old, None)
+
+def equity_vs_range_ordering(opp_range):
+    """
+    Ordering key ranking hands by preflop equity against opp_range
+    (a collection of hand categories), weighted by combo counts.
+    """
+    key = ("vs", frozenset(opp_range))
+    if key not in _orderings:
+        table = load_preflop_table()
+        opp = [(r, hand_weight(r)) for r in key[1]]
+        total = sum(w for _, w in opp)
+        def strength(cat):
+            if total <= 0:
+                return 0.0
+            return sum(table.get((cat, r), (0, 0, 0))[2] * w for r, w in opp) / total
+        register_ordering(key, strength)
+    return key
+
+def board_ordering(ranking):
+    """
+    Ordering key for a board_rank.BoardRanking: hands ranked by equity vs a
+    random hand on that board, weighted by their live combos.
+    """
+    key = ("board", ranking.key)
+    if key not in _orderings:
+        register_ordering(key, ranking.strength, ranking.live_weight)
+    return key
+
+def get_range_index(ordering="preflop"):
+    """Returns the (cached) index for an ordering key."""
+    index = _indexes.get(ordering)
+    if index is None:
+        strength, weight = _orderings[ordering]
+        index = RangeIndex(strength, weight)
+        with _lock:
+            _indexes[ordering] = index
+    return index
+
+def clear_range_indexes():
+    with _lock:
+        _indexes.clear()
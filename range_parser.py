@@ -0,0 +1,199 @@
+"""
+Range notation parser.
+
+Compiles standard range strings such as
+
+    22+, A2s+, KTo+, QJs-Q9s, AhKh, AKo:0.5
+
+into a 1,326-slot combo weight vector (indexed like combos.COMBOS) and
+back. Entries are comma separated; later entries overwrite the weight of
+combos named earlier. Supported forms:
+
+    AA, AKs, AKo, AK      a pair, suited, offsuit, or all AK combos
+    22+  A2s+  KTo+       pairs up to AA / kicker up to one below the top card
+    99-66  QJs-Q9s        inclusive spans with a fixed top card
+    AhKh                  one specific combo
+    <entry>:0.5           weight (default 1)
+
+Compiled vectors are cached and returned read-only.
+"""
+
+from functools import lru_cache
+import numpy as np
+from poker import rank_char_to_int, parse_card
+from fast_eval import card_to_int, int_to_card
+from combos import NUM_COMBOS, COMBO_INDEX, CAT_COMBOS, CATEGORIES, COMBO_CAT_IDX, COMBOS
+
+RANK_CHARS = {14:'A', 13:'K', 12:'Q', 11:'J', 10:'T', 9:'9', 8:'8',
+              7:'7', 6:'6', 5:'5', 4:'4', 3:'3', 2:'2'}
+
+def _cat(high, low, suffix=''):
+    if high == low:
+        return RANK_CHARS[high] * 2
+    return RANK_CHARS[high] + RANK_CHARS[low] + suffix
+
+def _hand_parts(token):
+    """Splits 'AKs' / 'AK' / '22' into (high, low, suffix)."""
+    if len(token) not in (2, 3):
+        raise ValueError("Invalid range entry: " + token)
+    r1 = rank_char_to_int(token[0])
+    r2 = rank_char_to_int(token[1])
+    suffix = token[2].lower() if len(token) == 3 else ''
+    if suffix not in ('', 's', 'o'):
+        raise ValueError("Invalid suffix (expect 's' or 'o'): " + token)
+    if r1 == r2 and suffix:
+        raise ValueError("Pairs take no suffix: " + token)
+    if r2 > r1:
+        r1, r2 = r2, r1
+    return r1, r2, suffix
+
+def _expand(high, low, suffix):
+    """Categories for one hand, expanding a missing suffix to both."""
+    if high == low:
+        return [_cat(high, low)]
+    if suffix:
+        return [_cat(high, low, suffix)]
+    return [_cat(high, low, 's'), _cat(high, low, 'o')]
+
+def _entry_combos(entry):
+    """Combo indices named by one entry (without weight)."""
+    entry = entry.strip()
+    if len(entry) == 4 and entry[1].lower() in 'hdcs' and entry[3].lower() in 'hdcs':
+        c1 = card_to_int(parse_card(entry[0:2]))
+        c2 = card_to_int(parse_card(entry[2:4]))
+        if c1 == c2:
+            raise ValueError("Duplicate card in combo: " + entry)
+        return [int(COMBO_INDEX[c1, c2])]
+    cats = []
+    if entry.endswith('+'):
+        high, low, suffix = _hand_parts(entry[:-1])
+        if high == low:
+            for r in range(low, 15):
+                cats += _expand(r, r, '')
+        else:
+            for r in range(low, high):
+                cats += _expand(high, r, suffix)
+    elif '-' in entry:
+        first, last = entry.split('-', 1)
+        h1, l1, s1 = _hand_parts(first.strip())
+        h2, l2, s2 = _hand_parts(last.strip())
+        if s1 != s2:
+            raise ValueError("Mismatched span: " + entry)
+        if h1 == l1 and h2 == l2:
+            for r in range(min(h1, h2), max(h1, h2) + 1):
+                cats += _expand(r, r, '')
+        elif h1 == h2 and h1 != l1 and h2 != l2:
+            for r in range(min(l1, l2), max(l1, l2) + 1):
+                cats += _expand(h1, r, s1)
+        else:
+            raise ValueError("Spans need pairs or a fixed top card: " + entry)
+    else:
+        cats = _expand(*_hand_parts(entry))
+    combos = []
+    for cat in cats:
+        combos.extend(int(k) for k in CAT_COMBOS[cat])
+    return combos
+
+@lru_cache(maxsize=256)
+def _compile(text):
+    weights = np.zeros(NUM_COMBOS)
+    for raw in text.split(','):
+        entry = raw.strip()
+        if not entry:
+            continue
+        weight = 1.0
+        if ':' in entry:
+            entry, w = entry.split(':', 1)
+            try:
+                weight = float(w)
+            except ValueError:
+                raise ValueError("Invalid weight: " + raw.strip())
+            if not 0.0 <= weight <= 1.0:
+                raise ValueError("Weight must be between 0 and 1: " + raw.strip())
+        weights[_entry_combos(entry)] = weight
+    weights.flags.writeable = False
+    return weights
+
+def compile_range(text):
+    """Compiles a range string to a read-only (1326,) combo weight vector."""
+    return _compile(" ".join(text.split()))
+
+# -------------- Grid conversion --------------
+
+def category_weights(weights):
+    """Per-category combo weight sums, as {hand_cat: weight}."""
+    sums = np.bincount(COMBO_CAT_IDX, weights=weights, minlength=len(CATEGORIES))
+    return {cat: float(sums[k]) for k, cat in enumerate(CATEGORIES)}
+
+def weights_from_categories(hand_cats, weight=1.0):
+    """Combo weight vector with every combo of the given categories set."""
+    weights = np.zeros(NUM_COMBOS)
+    for cat in hand_cats:
+        weights[CAT_COMBOS[cat]] = weight
+    return weights
+
+# -------------- Export --------------
+
+def _format_weight(w):
+    return "" if w == 1.0 else ":" + f"{w:.3f}".rstrip('0').rstrip('.')
+
+def _runs(ranks):
+    """Splits a descending list of ranks into runs of consecutive ranks."""
+    runs = []
+    for r in ranks:
+        if runs and runs[-1][-1] == r + 1:
+            runs[-1].append(r)
+        else:
+            runs.append([r])
+    return runs
+
+def _compress(cats):
+    """Shortest notation for a set of whole categories sharing one weight."""
+    parts = []
+    pairs = sorted((rank_char_to_int(c[0]) for c in cats if len(c) == 2), reverse=True)
+    for run in _runs(pairs):
+        if run[0] == 14 and len(run) > 1:
+            parts.append(_cat(run[-1], run[-1]) + '+')
+        elif len(run) > 1:
+            parts.append(_cat(run[0], run[0]) + '-' + _cat(run[-1], run[-1]))
+        else:
+            parts.append(_cat(run[0], run[0]))
+    for high in range(14, 2, -1):
+        for suffix in ('s', 'o'):
+            kickers = sorted((rank_char_to_int(c[1]) for c in cats
+                              if len(c) == 3 and c[2] == suffix and rank_char_to_int(c[0]) == high),
+                             reverse=True)
+            for run in _runs(kickers):
+                if run[0] == high - 1 and len(run) > 1:
+                    parts.append(_cat(high, run[-1], suffix) + '+')
+                elif len(run) > 1:
+                    parts.append(_cat(high, run[0], suffix) + '-' + _cat(high, run[-1], suffix))
+                else:
+                    parts.append(_cat(high, run[0], suffix))
+    return parts
+
+def _combo_str(k):
+    out = ""
+    for c in sorted(COMBOS[k], reverse=True):
+        rank, suit = int_to_card(int(c))
+        out += RANK_CHARS[rank] + suit
+    return out
+
+def range_to_string(weights):
+    """Formats a combo weight vector in range notation."""
+    weights = np.asarray(weights, dtype=float)
+    by_weight = {}
+    singles = []
+    for cat in CATEGORIES:
+        ws = weights[CAT_COMBOS[cat]]
+        if not ws.any():
+            continue
+        if (ws == ws[0]).all():
+            by_weight.setdefault(float(ws[0]), []).append(cat)
+        else:
+            singles.extend(int(k) for k in CAT_COMBOS[cat] if weights[k] > 0)
+    parts = []
+    for w in sorted(by_weight, reverse=True):
+        parts += [p + _format_weight(w) for p in _compress(by_weight[w])]
+    parts += [_combo_str(k) + _format_weight(float(weights[k])) for k in singles]
+    return ", ".join(parts)
@@ -0,0 +1,115 @@
+"""
+Persistent win/tie/total counts for hand-vs-hand equities.
+
+Results are keyed by the suit isomorphic (hero, villain, board) and kept
+as raw counts in SQLite, so a new simulation of a spot adds its samples to
+everything computed before instead of replacing it: spots that are looked
+at often get more precise at no extra cost per query. An entry that is
+exact (every runout enumerated) or whose standard error is already below
+PRECISE_SE is returned without simulating. Entries written by another
+evaluator version are dropped when the store is opened.
+"""
+
+import math
+import sqlite3
+import threading
+from fast_eval import EVALUATOR_VERSION
+from combos import SUIT_PERMS, permute_cards
+
+STORE_FILE = "equity_results.db"
+# Standard error of the equity below which no more samples are taken.
+PRECISE_SE = 0.002
+
+def canonical_matchup(hero, villain, board):
+    """Smallest suit relabelling of integer (hero, villain, board) as sorted tuples."""
+    return min(tuple(tuple(sorted(permute_cards(c, perm))) for c in (hero, villain, board))
+               for perm in SUIT_PERMS)
+
+def key_text(key):
+    return "|".join(",".join(str(c) for c in part) for part in key)
+
+class StoredResult:
+    def __init__(self, wins, ties, total, exact):
+        self.wins = wins
+        self.ties = ties
+        self.total = total
+        self.exact = exact
+
+    def equity(self):
+        """(win, tie, equity) fractions."""
+        win, tie = self.wins / self.total, self.ties / self.total
+        return (win, tie, win + tie / 2)
+
+    def standard_error(self):
+        if self.exact:
+            return 0.0
+        win, tie, eq = self.equity()
+        # Per-sample outcome is 1, 0.5 or 0.
+        second = win + tie / 4
+        return math.sqrt(max(second - eq * eq, 0.0) / self.total)
+
+    def precise(self):
+        return self.exact or self.standard_error() <= PRECISE_SE
+
+class ResultStore:
+    def __init__(self, path=STORE_FILE):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS equity_results (
+                key TEXT PRIMARY KEY,
+                wins INTEGER,
+                ties INTEGER,
+                total INTEGER,
+                exact INTEGER,
+                version INTEGER
+            )
+        ''')
+        self.conn.execute("DELETE FROM equity_results WHERE version != ?", (EVALUATOR_VERSION,))
+        self.conn.commit()
+
+    def lookup(self, key):
+        """The StoredResult for a canonical key, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT wins, ties, total, exact FROM equity_results WHERE key=?",
+                                    (key_text(key),)).fetchone()
+        if row is None or row[2] <= 0:
+            return None
+        return StoredResult(row[0], row[1], row[2], bool(row[3]))
+
+    def add_many(self, entries):
+        """
+        Adds (key, wins, ties, total, exact) samples. An exact result
+        replaces the sampled counts; samples are not added to an exact entry.
+        """
+        with self.lock:
+            for key, wins, ties, total, exact in entries:
+                text = key_text(key)
+                if exact:
+                    self.conn.execute("INSERT OR REPLACE INTO equity_results VALUES (?, ?, ?, ?, 1, ?)",
+                                      (text, wins, ties, total, EVALUATOR_VERSION))
+                else:
+                    self.conn.execute('''
+                        INSERT INTO equity_results VALUES (?, ?, ?, ?, 0, ?)
+                        ON CONFLICT(key) DO UPDATE SET
+                            wins = wins + excluded.wins,
+                            ties = ties + excluded.ties,
+                            total = total + excluded.total
+                        WHERE exact = 0
+                    ''', (text, wins, ties, total, EVALUATOR_VERSION))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """The shared ResultStore on STORE_FILE, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+        return _store
@@ -0,0 +1,176 @@
+"""
+Showdown index for complete (5-card) boards.
+
+All live combos on a river board are evaluated once and reduced to dense
+showdown ranks. Alongside the global rank order, each card keeps the
+combos that hold it in rank order, and every combo knows its position in
+those lists. Any weighted query (hand vs hand, hand vs range, range vs
+range) is then a handful of gathers from prefix sums, card removal
+included, with no evaluation and no sorting.
+
+Indexes are built for the canonical (suit isomorphic) board, cached in a
+bounded LRU, and queried in the caller's suits through a combo relabelling.
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+from fast_eval import card_to_int
+from evaluators import evaluate_batch
+from combos import COMBOS, NUM_COMBOS, dead_combo_mask, canonical_board, combo_perm_map
+
+MAX_CACHED_BOARDS = 256
+# Live combos holding a given card on a river: it pairs with 46 unseen cards.
+CARD_ROW = 46
+
+class RiverIndex:
+    def __init__(self, ranks):
+        """
+        ranks: (1326,) dense showdown ranks (higher is better), -1 for
+        combos blocked by the board.
+        """
+        self.ranks = ranks
+        self.live = ranks >= 0
+        live_idx = np.flatnonzero(self.live)
+        self.order = live_idx[np.argsort(ranks[live_idx], kind="stable")]
+        sorted_ranks = ranks[self.order]
+        self.lo_all = np.searchsorted(sorted_ranks, ranks, side="left").astype(np.int16)
+        self.hi_all = np.searchsorted(sorted_ranks, ranks, side="right").astype(np.int16)
+        # Per card, the live combos holding it in rank order (padded with
+        # NUM_COMBOS, which indexes a zero weight in queries).
+        self.card_rows = np.full((52, CARD_ROW), NUM_COMBOS, dtype=np.int16)
+        self.lo_card = np.zeros((NUM_COMBOS, 2), dtype=np.int16)
+        self.hi_card = np.zeros((NUM_COMBOS, 2), dtype=np.int16)
+        for card in range(52):
+            holding = self.order[(COMBOS[self.order, 0] == card) | (COMBOS[self.order, 1] == card)]
+            if len(holding) == 0:
+                continue
+            self.card_rows[card, :len(holding)] = holding
+            row_ranks = ranks[holding]
+            for side in (0, 1):
+                mine = live_idx[COMBOS[live_idx, side] == card]
+                self.lo_card[mine, side] = np.searchsorted(row_ranks, ranks[mine], side="left")
+                self.hi_card[mine, side] = np.searchsorted(row_ranks, ranks[mine], side="right")
+
+    def combo_sums(self, weights):
+        """
+        Per combo, the opposing weight it beats, ties and faces on this
+        river (opposing combos sharing a card are excluded), as three
+        (1326,) arrays; zero for blocked combos.
+        """
+        w = np.where(self.live, np.asarray(weights, dtype=float), 0.0)
+        w_ext = np.append(w, 0.0)
+        cum = np.concatenate([[0.0], np.cumsum(w[self.order])])
+        win = cum[self.lo_all]
+        tie = cum[self.hi_all] - win
+        total = np.full(NUM_COMBOS, cum[-1])
+        row_cum = np.concatenate([np.zeros((52, 1)), np.cumsum(w_ext[self.card_rows], axis=1)], axis=1)
+        for side in (0, 1):
+            cards = COMBOS[:, side]
+            lo = row_cum[cards, self.lo_card[:, side]]
+            hi = row_cum[cards, self.hi_card[:, side]]
+            win -= lo
+            tie -= hi - lo
+            total -= row_cum[cards, -1]
+        tie += w
+        total += w
+        dead = ~self.live
+        win[dead] = tie[dead] = total[dead] = 0.0
+        return win, tie, total
+
+    def hand_vs_hand(self, combo1, combo2):
+        """1 if combo1 wins, -1 if combo2 wins, 0 on a tie."""
+        r1, r2 = self.ranks[combo1], self.ranks[combo2]
+        return 1 if r1 > r2 else -1 if r2 > r1 else 0
+
+    def hand_vs_range(self, combo, weights):
+        """(win, tie, equity) of one combo against a weighted range."""
+        w = np.where(self.live, np.asarray(weights, dtype=float), 0.0)
+        a, b = COMBOS[combo]
+        ok = (COMBOS[:, 0] != a) & (COMBOS[:, 0] != b) & (COMBOS[:, 1] != a) & (COMBOS[:, 1] != b)
+        w = np.where(ok, w, 0.0)
+        total = w.sum()
+        if total <= 0:
+            return (0.0, 0.0, 0.0)
+        r = self.ranks[combo]
+        win = w[self.ranks < r].sum() / total
+        tie = w[self.ranks == r].sum() / total
+        return (float(win), float(tie), float(win + tie / 2))
+
+    def range_vs_range(self, hero_weights, vil_weights):
+        """(win, tie, equity) of the hero range against the villain range."""
+        win, tie, total = self.combo_sums(vil_weights)
+        hw = np.where(self.live, np.asarray(hero_weights, dtype=float), 0.0)
+        denom = (hw * total).sum()
+        if denom <= 0:
+            return (0.0, 0.0, 0.0)
+        w = (hw * win).sum() / denom
+        t = (hw * tie).sum() / denom
+        return (float(w), float(t), float(w + t / 2))
+
+class BoardView:
+    """
+    A cached RiverIndex for the canonical board seen in the caller's suits:
+    combo indices and weight vectors are relabelled on the way in and
+    per-combo results on the way out.
+    """
+    def __init__(self, index, mapping):
+        self.index = index
+        self.mapping = mapping
+        self.ranks = index.ranks[mapping]
+        self.live = self.ranks >= 0
+
+    def _canon(self, weights):
+        out = np.empty(NUM_COMBOS)
+        out[self.mapping] = weights
+        return out
+
+    def combo_sums(self, weights):
+        win, tie, total = self.index.combo_sums(self._canon(weights))
+        return win[self.mapping], tie[self.mapping], total[self.mapping]
+
+    def hand_vs_hand(self, combo1, combo2):
+        return self.index.hand_vs_hand(self.mapping[combo1], self.mapping[combo2])
+
+    def hand_vs_range(self, combo, weights):
+        return self.index.hand_vs_range(self.mapping[combo], self._canon(weights))
+
+    def range_vs_range(self, hero_weights, vil_weights):
+        return self.index.range_vs_range(self._canon(hero_weights), self._canon(vil_weights))
+
+def build_river_index(board_ints):
+    """Evaluates every live combo on a complete integer board once."""
+    ranks = np.full(NUM_COMBOS, -1, dtype=np.int16)
+    live = np.flatnonzero(~dead_combo_mask(board_ints))
+    hands = np.concatenate([COMBOS[live], np.tile(np.array(board_ints, dtype=np.int64), (len(live), 1))], axis=1)
+    _, dense = np.unique(evaluate_batch(hands), return_inverse=True)
+    ranks[live] = dense.ravel()
+    return RiverIndex(ranks)
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def river_index(board):
+    """
+    Showdown lookups for a complete board, given as (rank, suit) cards or
+    integer cards. Indexes are shared across suit-isomorphic boards.
+    """
+    board_ints = [c if isinstance(c, (int, np.integer)) else card_to_int(c) for c in board]
+    if len(board_ints) != 5:
+        raise ValueError("River index needs a complete 5-card board")
+    key, perm = canonical_board(board_ints)
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+    if index is None:
+        index = build_river_index(list(key))
+        with _cache_lock:
+            _cache[key] = index
+            while len(_cache) > MAX_CACHED_BOARDS:
+                _cache.popitem(last=False)
+    return BoardView(index, combo_perm_map(tuple(perm)))
+
+def clear_river_indexes():
+    with _cache_lock:
+        _cache.clear()
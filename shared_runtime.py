@@ -0,0 +1,179 @@
+"""
+Shared-memory runtime for equity worker processes.
+
+The evaluator's rank-mask tables are published once into a shared memory
+block; every worker maps them read-only at start-up instead of building its
+own copy. Results go the other way through a preallocated shared buffer
+indexed by grid cell (row * 13 + col): a task writes its rows in place and
+returns only the cell indices, so neither the tables nor the results are
+pickled per task and per-worker memory stays flat as workers are added.
+"""
+
+import os
+import math
+import itertools
+import random
+import atexit
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import fast_eval
+from evaluators import evaluate_batch
+
+GRID_CELLS = 169
+# Result columns: win, tie, equity.
+RESULT_COLUMNS = 3
+# Tasks per worker for one grid; a few per worker balance uneven cells.
+CHUNKS_PER_WORKER = 4
+_ALIGN = 64
+
+class SharedArrays:
+    """
+    Named NumPy arrays packed into one shared memory block. The owner
+    creates it with publish(); other processes rebuild the views from
+    .spec with attach().
+    """
+    def __init__(self, shm, layout, owner):
+        self.shm = shm
+        self.layout = layout
+        self.owner = owner
+        self.arrays = {key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                       for key, (offset, dtype, shape) in layout.items()}
+
+    @property
+    def spec(self):
+        return (self.shm.name, self.layout)
+
+    @classmethod
+    def publish(cls, arrays):
+        layout = {}
+        size = 0
+        for key, arr in arrays.items():
+            arr = np.asarray(arr)
+            size = -(-size // _ALIGN) * _ALIGN
+            layout[key] = (size, arr.dtype.str, arr.shape)
+            size += arr.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        shared = cls(shm, layout, True)
+        for key, arr in arrays.items():
+            shared.arrays[key][...] = arr
+        return shared
+
+    @classmethod
+    def attach(cls, spec, writeable=False):
+        name, layout = spec
+        # Pool workers share the owner's resource tracker, so the block is
+        # still unlinked exactly once, by the owner.
+        shm = shared_memory.SharedMemory(name=name)
+        shared = cls(shm, layout, False)
+        if not writeable:
+            for arr in shared.arrays.values():
+                arr.flags.writeable = False
+        return shared
+
+    def close(self):
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# -------------- Worker side --------------
+
+_worker_tables = None
+_worker_results = None
+
+def _init_worker(table_spec, result_spec):
+    global _worker_tables, _worker_results
+    _worker_tables = SharedArrays.attach(table_spec)
+    t = _worker_tables.arrays
+    fast_eval.install_tables(t["high"], t["straight"], t["top"])
+    _worker_results = SharedArrays.attach(result_spec, writeable=True)
+
+def runout_plan(board_size, num_simulations):
+    """
+    (runouts, exact): how many runouts matchup_equity scores for a
+    heads-up hand on a board of board_size cards, and whether that is all.
+    """
+    possible = math.comb(52 - 4 - board_size, 5 - board_size)
+    return (possible, True) if possible <= num_simulations else (num_simulations, False)
+
+def matchup_equity(hero, opp, board, num_simulations, rng=random):
+    """
+    (win, tie, equity) of integer hole cards hero vs opp on the integer
+    board, like poker.compute_equity: every runout when there are at most
+    num_simulations of them, else num_simulations sampled ones.
+    """
+    used = set(hero) | set(opp) | set(board)
+    remaining = [c for c in range(52) if c not in used]
+    needed = 5 - len(board)
+    if math.comb(len(remaining), needed) <= num_simulations:
+        runout_list = list(itertools.combinations(remaining, needed))
+    else:
+        runout_list = [rng.sample(remaining, needed) for _ in range(num_simulations)]
+    boards = np.array([list(board) + list(r) for r in runout_list], dtype=np.int64).reshape(len(runout_list), 5)
+    n = len(boards)
+    hero_scores = evaluate_batch(np.concatenate([np.tile(np.array(hero, dtype=np.int64), (n, 1)), boards], axis=1))
+    opp_scores = evaluate_batch(np.concatenate([np.tile(np.array(opp, dtype=np.int64), (n, 1)), boards], axis=1))
+    win = float((hero_scores > opp_scores).mean())
+    tie = float((hero_scores == opp_scores).mean())
+    return (win, tie, win + tie / 2)
+
+def _cell_task(hero, board, cells, num_simulations):
+    out = _worker_results.arrays["results"]
+    for cell, opp in cells:
+        out[cell] = matchup_equity(hero, opp, board, num_simulations)
+    return [cell for cell, _ in cells]
+
+# -------------- Owner side --------------
+
+class EquityPool:
+    """
+    Process pool sharing one copy of the evaluator tables and one result
+    buffer. Grids are run one at a time.
+    """
+    def __init__(self, workers=None, cells=GRID_CELLS):
+        self.workers = workers or os.cpu_count() or 1
+        high, straight, top = fast_eval.tables()
+        self.tables = SharedArrays.publish({"high": high, "straight": straight, "top": top})
+        self.results = SharedArrays.publish({"results": np.zeros((cells, RESULT_COLUMNS))})
+        # spawn: forking a process that runs Tk threads is unsafe.
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp.get_context("spawn"),
+                                            initializer=_init_worker,
+                                            initargs=(self.tables.spec, self.results.spec))
+        self.lock = threading.Lock()
+
+    def cell_equities(self, hero, tasks, board, num_simulations):
+        """
+        tasks: list of (cell, opponent integer hole cards). Returns
+        {cell: (win, tie, equity)} read from the shared result buffer.
+        """
+        with self.lock:
+            buf = self.results.arrays["results"]
+            buf[:] = np.nan
+            size = max(1, -(-len(tasks) // (self.workers * CHUNKS_PER_WORKER)))
+            futures = [self.executor.submit(_cell_task, tuple(hero), tuple(board),
+                                            [(cell, tuple(opp)) for cell, opp in tasks[i:i + size]],
+                                            num_simulations)
+                       for i in range(0, len(tasks), size)]
+            for future in futures:
+                future.result()
+            return {cell: tuple(float(x) for x in buf[cell]) for cell, _ in tasks}
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.tables.close()
+        self.results.close()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """The shared EquityPool, started on first use and closed at exit."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = EquityPool()
+            atexit.register(_pool.close)
+        return _pool
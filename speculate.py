@@ -0,0 +1,101 @@
+"""
+Speculative background computation keyed by input.
+
+The GUI hands the scheduler the computation for whatever the user has
+typed so far, plus a few likely next inputs to prefetch. One low-priority
+worker thread runs them in order; a newer request drops everything still
+queued from older ones, and finished results are kept by key so pressing
+the button usually just picks one up. Work that is already running is not
+interrupted, but its result is kept in case the user comes back to it.
+"""
+
+import os
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+
+MAX_RESULTS = 128
+PRIMARY, PREFETCH = 0, 1
+# Added niceness of the worker thread where per-thread priorities exist.
+WORKER_NICENESS = 10
+
+class SpeculativeScheduler:
+    def __init__(self, max_results=MAX_RESULTS):
+        self.max_results = max_results
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._results = OrderedDict()
+        # Keys queued or running -> Event set when they finish or are dropped.
+        self._events = {}
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def speculate(self, key, fn, prefetch=()):
+        """
+        Replaces all queued work with fn() for key, followed by the
+        (key, fn) pairs in prefetch. Keys already cached or running are
+        skipped.
+        """
+        with self._cond:
+            for _, _, old_key, _ in self._queue:
+                self._events.pop(old_key).set()
+            self._queue = []
+            for priority, (k, f) in [(PRIMARY, (key, fn))] + [(PREFETCH, p) for p in prefetch]:
+                if k in self._results or k in self._events:
+                    continue
+                self._events[k] = threading.Event()
+                heapq.heappush(self._queue, (priority, next(self._seq), k, f))
+            self._cond.notify()
+
+    def cached(self, key):
+        with self._cond:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+            return None
+
+    def result(self, key, fn):
+        """
+        The value for key: cached, awaited if it is queued or running, and
+        otherwise computed by fn() in the calling thread.
+        """
+        with self._cond:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+            event = self._events.get(key)
+        if event is not None:
+            event.wait()
+            value = self.cached(key)
+            if value is not None:
+                return value
+        value = fn()
+        self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        with self._cond:
+            self._results[key] = value
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def _run(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), WORKER_NICENESS)
+        except (AttributeError, OSError):
+            pass
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                _, _, key, fn = heapq.heappop(self._queue)
+            try:
+                self._store(key, fn())
+            except Exception as e:
+                print("Speculative computation failed:", e)
+            with self._cond:
+                event = self._events.pop(key, None)
+            if event is not None:
+                event.set()
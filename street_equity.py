@@ -0,0 +1,132 @@
+"""
+Street-by-street equity of one hand against every combo.
+
+For a flop or turn, every runout is evaluated once for the hero hand and
+all 1,326 combos, and the showdown outcome per (runout, combo) is kept.
+The street equity is the roll-up of those outcomes; grouping them by the
+next card gives the equity after each possible turn (or river) card for
+free, and moving to the next street just selects the matching runouts,
+so entering the real turn card is a lookup instead of a recompute.
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+import numpy as np
+from evaluators import evaluate_batch
+from combos import COMBOS, NUM_COMBOS, dead_combo_mask
+
+# Room for a flop plus the ~47 turns prefetched after it, so the
+# speculative turns don't evict the flop on screen.
+MAX_CACHED = 64
+# Runouts evaluated per evaluate_batch call; bounds the temporary arrays.
+RUNOUT_CHUNK = 64
+# Outcome codes, from the hero's point of view.
+BLOCKED, LOSS, TIE, WIN = -1, 0, 1, 2
+
+def runout_outcomes(hero, board, runout_list):
+    """
+    (len(runout_list), 1326) int8 outcomes of the integer hero hand against
+    every combo on each runout; BLOCKED where a combo shares a card with
+    the hero, the board or the runout.
+    """
+    out = np.empty((len(runout_list), NUM_COMBOS), dtype=np.int8)
+    base_dead = dead_combo_mask(list(board) + list(hero))
+    for start in range(0, len(runout_list), RUNOUT_CHUNK):
+        chunk = runout_list[start:start + RUNOUT_CHUNK]
+        k = len(chunk)
+        boards = np.array([list(board) + list(r) for r in chunk], dtype=np.int64).reshape(k, 5)
+        hands = np.concatenate([np.broadcast_to(COMBOS, (k, NUM_COMBOS, 2)),
+                                np.broadcast_to(boards[:, None, :], (k, NUM_COMBOS, 5))], axis=2)
+        scores = evaluate_batch(hands.reshape(-1, 7)).reshape(k, NUM_COMBOS)
+        hero_scores = evaluate_batch(np.concatenate([np.tile(np.array(hero, dtype=np.int64), (k, 1)), boards], axis=1))
+        o = np.where(scores < hero_scores[:, None], WIN,
+                     np.where(scores == hero_scores[:, None], TIE, LOSS)).astype(np.int8)
+        run_dead = np.zeros((k, 52), dtype=bool)
+        for i, r in enumerate(chunk):
+            run_dead[i, list(r)] = True
+        o[base_dead[None, :] | run_dead[:, COMBOS[:, 0]] | run_dead[:, COMBOS[:, 1]]] = BLOCKED
+        out[start:start + k] = o
+    return out
+
+class StreetEquity:
+    def __init__(self, hero, board, runout_list, outcomes):
+        """
+        hero / board: integer cards; runout_list: the remaining cards of
+        each runout (aligned with the rows of outcomes).
+        """
+        self.hero = tuple(hero)
+        self.board = tuple(board)
+        self.runouts = runout_list
+        self.outcomes = outcomes
+
+    def combo_sums(self):
+        """(win, tie, total) runout counts per combo for this street."""
+        o = self.outcomes
+        return ((o == WIN).sum(axis=0).astype(float), (o == TIE).sum(axis=0).astype(float),
+                (o >= LOSS).sum(axis=0).astype(float))
+
+    def next_cards(self):
+        """The cards that can come next, in increasing order."""
+        return sorted({c for r in self.runouts for c in r})
+
+    def after(self, card):
+        """The StreetEquity once card is dealt, from the stored runouts."""
+        rows = [i for i, r in enumerate(self.runouts) if card in r]
+        runout_list = [tuple(c for c in self.runouts[i] if c != card) for i in rows]
+        return StreetEquity(self.hero, self.board + (card,), runout_list, self.outcomes[rows])
+
+    def next_card_equity(self, weights):
+        """
+        Equity against the weighted combos after each possible next card,
+        as a list of (card, equity) sorted from best to worst.
+        """
+        cards = self.next_cards()
+        member = np.zeros((len(self.runouts), 52))
+        for i, r in enumerate(self.runouts):
+            member[i, list(r)] = 1.0
+        member = member[:, cards]
+        w = np.asarray(weights, dtype=float)
+        o = self.outcomes
+        won = member.T @ ((o == WIN) @ w + (o == TIE) @ w / 2)
+        faced = member.T @ ((o >= LOSS) @ w)
+        equity = np.divide(won, faced, out=np.zeros_like(won), where=faced > 0)
+        ranked = [(c, float(e)) for c, e, f in zip(cards, equity, faced) if f > 0]
+        ranked.sort(key=lambda x: -x[1])
+        return ranked
+
+def compute_street_equity(hero, board):
+    """Evaluates every runout of a flop or turn for the integer hero hand."""
+    used = set(hero) | set(board)
+    remaining = [c for c in range(52) if c not in used]
+    runout_list = list(itertools.combinations(remaining, 5 - len(board)))
+    return StreetEquity(hero, board, runout_list, runout_outcomes(hero, board, runout_list))
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+def street_equity(hero, board):
+    """
+    Cached StreetEquity for integer hero cards on an integer board (3-5
+    cards). A later street of a cached board is derived from it without
+    evaluating anything.
+    """
+    key = (tuple(sorted(hero)), tuple(sorted(board)))
+    with _lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+        earlier = [v for (h, b), v in _cache.items() if h == key[0] and set(b) < set(key[1])]
+    if earlier:
+        result = max(earlier, key=lambda v: len(v.board))
+        for card in board:
+            if card not in result.board:
+                result = result.after(card)
+    else:
+        result = compute_street_equity(hero, board)
+    with _lock:
+        _cache[key] = result
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+    return result
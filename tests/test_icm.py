@@ -0,0 +1,58 @@
+"""ICM against a brute force over every finishing order."""
+
+import itertools
+import numpy as np
+import pytest
+import icm
+from icm import (place_probabilities_exact, place_probabilities_sampled, icm_equity,
+                 call_decision)
+
+@pytest.fixture
+def disk_cache(tmp_path, monkeypatch):
+    """Keeps the decision tests' cache out of the working directory."""
+    monkeypatch.setattr(icm, "_disk", icm.ICMCache(str(tmp_path / "icm_cache.db")))
+
+def brute_force(stacks, places):
+    """Sums the Malmuth-Harville probability of every finishing order."""
+    n = len(stacks)
+    probs = np.zeros((n, places))
+    for order in itertools.permutations(range(n)):
+        p, left = 1.0, float(sum(stacks))
+        for i in order:
+            p *= stacks[i] / left
+            left -= stacks[i]
+        for place, i in enumerate(order[:places]):
+            probs[i, place] += p
+    return probs
+
+def test_place_probabilities_match_brute_force():
+    rng = np.random.default_rng(3)
+    for n in range(2, 8):
+        stacks = list(rng.integers(1, 100, n))
+        for places in range(1, n + 1):
+            assert np.allclose(place_probabilities_exact(stacks, places), brute_force(stacks, places))
+
+def test_equity_matches_brute_force():
+    stacks, payouts = [5000, 3000, 2000, 1500, 800, 700], [50, 30, 20]
+    expected = brute_force(stacks, 3) @ np.array(payouts)
+    assert np.allclose(icm_equity(stacks, payouts, cache=False), expected)
+
+def test_busted_players_share_the_remaining_places():
+    equity = icm_equity([6000, 4000, 0, 0], [50, 30, 15, 5], cache=False)
+    live = brute_force([6000, 4000], 2) @ np.array([50, 30])
+    assert np.allclose(equity[:2], live)
+    assert np.allclose(equity[2:], 10.0)
+    assert np.isclose(equity.sum(), 100.0)
+
+def test_sampling_is_unbiased():
+    stacks = [40, 25, 15, 10, 6, 4]
+    exact = place_probabilities_exact(stacks, 3)
+    sampled = place_probabilities_sampled(stacks, 3, samples=200000, rng=np.random.default_rng(5))
+    assert np.abs(sampled - exact).max() < 0.01
+
+def test_call_breaks_even_at_required_equity(disk_cache):
+    stacks, payouts = [20, 15, 10, 5], [50, 30, 20]
+    d = call_decision(stacks, payouts, 0, 1, 1.5, 0.5)
+    # The ICM risk premium: calling needs more equity than in chips.
+    assert d.required > d.chip_required
+    assert abs(call_decision(stacks, payouts, 0, 1, 1.5, d.required).gain()) < 1e-9
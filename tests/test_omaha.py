@@ -0,0 +1,47 @@
+"""omaha_scores against a brute force over the 60 two-plus-three hands."""
+
+import itertools
+import numpy as np
+from evaluators import evaluate_batch
+from omaha import omaha_scores, omaha_equity
+
+HANDS = 3000
+
+def brute_force(hole, board):
+    fives = [list(pair) + list(triple) for pair in itertools.combinations(hole, 2)
+             for triple in itertools.combinations(board, 3)]
+    return evaluate_batch(np.array(fives)).max()
+
+def deal(rng, n):
+    return rng.random((n, 52)).argsort(axis=1)[:, :9]
+
+def test_scores_match_brute_force():
+    cards = deal(np.random.default_rng(42), HANDS)
+    scores = omaha_scores(cards[:, :4], cards[:, 4:])
+    expected = [brute_force(row[:4], row[4:]) for row in cards]
+    assert np.array_equal(scores, expected)
+
+def test_flushes_match_brute_force():
+    # Monotone boards, so suited hole pairs make flushes often.
+    rng = np.random.default_rng(7)
+    cards = deal(rng, HANDS)
+    suit = rng.integers(0, 4)
+    for row in cards:
+        row[4:] = rng.choice(13, 5, replace=False) * 4 + suit
+        row[:4] = rng.choice(np.setdiff1d(np.arange(52), row[4:]), 4, replace=False)
+    scores = omaha_scores(cards[:, :4], cards[:, 4:])
+    expected = [brute_force(row[:4], row[4:]) for row in cards]
+    assert np.array_equal(scores, expected)
+
+def test_board_cards_need_two_hole_cards():
+    # A board flush does not count without two hole cards of the suit.
+    hole = [(14, 's'), (13, 'd'), (2, 'c'), (3, 'c')]
+    board = [(10, 'h'), (8, 'h'), (6, 'h'), (4, 'h'), (12, 'h')]
+    win, tie, _ = omaha_equity(hole, [(5, 's'), (5, 'd'), (7, 'c'), (9, 'd')], board)
+    assert (win, tie) == (0.0, 0.0)
+
+def test_river_equity_is_exact():
+    hole1 = [(14, 'h'), (14, 'd'), (13, 'h'), (13, 'd')]
+    hole2 = [(2, 'c'), (3, 'c'), (7, 's'), (8, 's')]
+    board = [(14, 'c'), (9, 'd'), (5, 's'), (2, 'h'), (11, 'c')]
+    assert omaha_equity(hole1, hole2, board) == (1.0, 0.0, 1.0)
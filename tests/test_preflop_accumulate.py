@@ -0,0 +1,76 @@
+"""The vectorised accumulate against the original per-board pair loop."""
+
+import numpy as np
+import preflop_db_2 as db
+from evaluators import evaluate_seven
+from fast_eval import int_to_card
+
+BOARDS = 12
+
+def loop_counters(canonical, boards):
+    """Counts exactly like the generator's loop before it was vectorised."""
+    n = len(canonical)
+    index = {h: k for k, h in enumerate(canonical)}
+    wins, ties, total = (np.zeros((n, n), dtype=np.int64) for _ in range(3))
+    assignments = {h: db.get_valid_hand(h, set()) for h in canonical}
+    for board in boards:
+        board = [int_to_card(c) for c in board]
+        values = {h: evaluate_seven(assignments[h] + board) for h in canonical
+                  if not any(card in board for card in assignments[h])}
+        hands = list(values)
+        for a in range(len(hands)):
+            for b in range(a + 1, len(hands)):
+                i, j = index[hands[a]], index[hands[b]]
+                total[i, j] += 1
+                total[j, i] += 1
+                if values[hands[a]] > values[hands[b]]:
+                    wins[i, j] += 1
+                elif values[hands[a]] < values[hands[b]]:
+                    wins[j, i] += 1
+                else:
+                    ties[i, j] += 1
+                    ties[j, i] += 1
+        for h, value in values.items():
+            second = db.get_second_valid_hand(h)
+            if any(card in board for card in second):
+                continue
+            i = index[h]
+            total[i, i] += 1
+            if value != evaluate_seven(second + board):
+                wins[i, i] += 1
+            else:
+                ties[i, i] += 1
+    return wins, ties, total
+
+def batch_counters(canonical, boards, active=None):
+    n = len(canonical)
+    counters = tuple(np.zeros((n, n), dtype=np.int64) for _ in range(3))
+    hands = canonical if active is None else [canonical[k] for k in active]
+    holes = db.hole_array([db.get_valid_hand(h, set()) for h in hands])
+    second = db.hole_array([db.get_second_valid_hand(h) for h in hands])
+    scores, valid = db.score_boards(holes, boards)
+    self_scores, self_valid = db.score_boards(second, boards)
+    db.accumulate(counters, scores, valid, self_scores, self_valid, active)
+    return counters
+
+def random_boards(seed):
+    return np.random.default_rng(seed).random((BOARDS, 52)).argsort(axis=1)[:, :5]
+
+def test_accumulate_matches_loop():
+    canonical = db.generate_canonical_hands()
+    boards = random_boards(11)
+    for got, expected in zip(batch_counters(canonical, boards), loop_counters(canonical, boards)):
+        assert np.array_equal(got, expected)
+
+def test_active_hands_only_update_their_pairs():
+    canonical = db.generate_canonical_hands()
+    boards = random_boards(12)
+    active = np.array([0, 5, 13, 40, 90, 168])
+    full = batch_counters(canonical, boards)
+    partial = batch_counters(canonical, boards, active)
+    cells = np.ix_(active, active)
+    mask = np.zeros(full[0].shape, dtype=bool)
+    mask[cells] = True
+    for got, expected in zip(partial, full):
+        assert np.array_equal(got[cells], expected[cells])
+        assert not got[~mask].any()
@@ -6,17 +6,24 @@ class ToolTip:
         self.text = text
         self.tipwindow = None
 
-    def showtip(self, text):
+    def showtip(self, text, x=None, y=None):
+        """
+        Shows the tip. x/y place it relative to the widget (e.g. next to a
+        canvas cell); by default it sits just below the widget's corner.
+        """
         self.text = text
         if self.tipwindow or not text:
             return
-        bbox = self.widget.bbox("insert")
-        if bbox:
-            x, y, _, _ = bbox
-        else:
-            x = y = 0
-        x += self.widget.winfo_rootx() + 25
-        y += self.widget.winfo_rooty() + 20
+        if x is None or y is None:
+            bbox = self.widget.bbox("insert")
+            if bbox:
+                x, y, _, _ = bbox
+            else:
+                x = y = 0
+            x += 25
+            y += 20
+        x += self.widget.winfo_rootx()
+        y += self.widget.winfo_rooty()
         self.tipwindow = tw = tk.Toplevel(self.widget)
         tw.wm_overrideredirect(True)
         tw.wm_geometry(f"+{x}+{y}")
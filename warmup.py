@@ -0,0 +1,72 @@
+"""
+Background warm-up of the lookup tables the GUI needs.
+
+The preflop tables, the preflop range index and the evaluator/combo tables
+are loaded, and the evaluator backends selected, on a daemon thread so the
+window can appear immediately. Code that needs them still loads them
+lazily on demand; warm-up only makes sure that usually happens before the
+user asks. `ready` is set once everything is loaded, or once a step has
+failed; `error` then holds the exception.
+"""
+
+import threading
+import time
+
+ready = threading.Event()
+error = None
+timings = {}
+_callbacks = []
+_lock = threading.Lock()
+_started = False
+
+def _warm():
+    global error
+    try:
+        _load()
+    except Exception as e:
+        # Callers load lazily anyway; don't leave anyone waiting on ready.
+        print("Warm-up failed:", e)
+        error = e
+    finally:
+        with _lock:
+            ready.set()
+            callbacks = list(_callbacks)
+            _callbacks.clear()
+        for callback in callbacks:
+            callback()
+
+def _load():
+    start = time.perf_counter()
+    from hand_helpers import load_static_hand_rankings, load_preflop_table
+    load_static_hand_rankings()
+    load_preflop_table()
+    timings["preflop_tables"] = time.perf_counter() - start
+    from range_index import get_range_index
+    get_range_index("preflop")
+    timings["range_index"] = time.perf_counter() - start
+    import board_rank  # builds the combo lookup tables
+    from fast_eval import tables
+    tables()
+    timings["evaluator_tables"] = time.perf_counter() - start
+    from evaluators import get_backend
+    get_backend("single")
+    get_backend("batch")
+    timings["evaluator_backends"] = time.perf_counter() - start
+
+def start_warmup(on_ready=None):
+    """
+    Starts the warm-up thread (once). on_ready() is called from that thread
+    when everything is loaded or warm-up failed, or straight away if that
+    already happened.
+    """
+    global _started
+    with _lock:
+        if not ready.is_set():
+            if on_ready is not None:
+                _callbacks.append(on_ready)
+            on_ready = None
+            if not _started:
+                _started = True
+                threading.Thread(target=_warm, daemon=True).start()
+    if on_ready is not None:
+        on_ready()